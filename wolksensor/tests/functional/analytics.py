@@ -0,0 +1,104 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Connection phase analytics (harness/phases.py).
+       SYSTEM items found in given traces and sessions are added to the
+       store, which keeps items of all previous runs and stations, and
+       p50/p95/p99 of every connection phase is reported per firmware
+       version, access point or device, with the phase which takes most of
+       online time. With --baseline every other version is compared against
+       baseline version, overall and per access point, and exit code is 1
+       when any phase got slower or cycles failed more often.
+
+       python analytics.py logs/*.trace.jsonl sessions/*.jsonl
+       python analytics.py --by ap
+       python analytics.py --baseline 4.3.5 --threshold 0.3
+'''
+#!/Python27/python
+import os
+import sys
+import harness         # puts initialisation, tests, harness and WolkSensor-python-lib on sys.path
+
+import argparse
+
+from phases import PhaseStore
+from phases import PHASES
+from phases import GROUPS
+from phases import PHASE_THRESHOLD
+from phases import compare
+from phases import dominant
+
+LOG_DIRECTORY = 'logs'
+STORE_FILE = os.path.join(LOG_DIRECTORY, 'phases.json')
+
+# report columns, connection_time is total online time
+LABELS = {'access_point_time': 'AP', 'dhcp_time': 'DHCP', 'server_time': 'server',
+          'data_exchange_time': 'exchange', 'disconnect_time': 'disconnect', 'connection_time': 'online'}
+
+
+def group_name(group):
+    return '/'.join(str(value) for value in group)
+
+def report(statistics, by):
+    print '\n\r==========================================================='
+    print " Connection phases per %s, p50/p95 of successful cycles" %by
+    print " %-28s %6s %6s  %s  %s" %('', 'cycles', 'failed', ' '.join("%-11s" %LABELS[column] for column in PHASES), 'dominant')
+    for group, result in sorted(statistics.items()):
+        columns = ' '.join("%5s/%-5s" %(result[column]['p50'] if result[column]['p50'] is not None else '-',
+                                        result[column]['p95'] if result[column]['p95'] is not None else '-')
+                           for column in PHASES)
+        print " %-28s %6d %6d  %s  %s" %(group_name(group), result['cycles'], result['failed'], columns,
+                                         LABELS.get(dominant(result), '-'))
+        for error, count in sorted(result['errors'].items()):
+            print " %-28s %13d  E:%s" %('', count, error)
+    print '==========================================================='
+
+def regressions(store, baseline, threshold):
+    '''
+    Compares every version against baseline, overall and per access point. Returns number of regressions
+    '''
+    found = 0
+    for key_columns in (['version'], ['version', 'ssid', 'auth']):
+        statistics = store.statistics(key_columns)
+        for group, result in sorted(statistics.items()):
+            reference = (baseline,) + group[1:]
+            if group[0] == baseline or reference not in statistics:
+                continue
+            for phase, old, new in compare(result, statistics[reference], threshold):
+                found += 1
+                print " %s: %s p95 %s, baseline %s %s" %(group_name(group), LABELS.get(phase, phase), new, group_name(reference), old)
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description = "WolkSensor connection phase analytics")
+    parser.add_argument('files', nargs = '*', help = "traces (recorder.py) and sessions (replay.py) to add to the store")
+    parser.add_argument('--store', default = STORE_FILE, help = "columnar store, default %(default)s")
+    parser.add_argument('--by', choices = sorted(GROUPS), default = 'version', help = "report grouping, default %(default)s")
+    parser.add_argument('--baseline', help = "firmware version other versions are compared against")
+    parser.add_argument('--threshold', type = float, default = PHASE_THRESHOLD, help = "allowed p95 growth, default %(default)s")
+    arguments = parser.parse_args()
+
+    store = PhaseStore.load(arguments.store)
+    added = sum(store.ingest(path) for path in arguments.files)
+    if arguments.files:
+        if not os.path.isdir(os.path.dirname(arguments.store) or '.'):
+            os.makedirs(os.path.dirname(arguments.store))
+        store.save(arguments.store)
+    print "%d new cycle(s), %d in %s" %(added, len(store), arguments.store)
+
+    if not len(store):
+        return 0
+    report(store.statistics(GROUPS[arguments.by]), arguments.by)
+
+    if arguments.baseline:
+        found = regressions(store, arguments.baseline, arguments.threshold)
+        if found:
+            print "%d regression(s) against %s" %(found, arguments.baseline)
+            return 1
+        print "No regression against %s" %arguments.baseline
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
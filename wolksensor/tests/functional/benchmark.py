@@ -0,0 +1,105 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Latency benchmark mode of functional tests (tests/latency.py).
+       Round trip of every command is measured on one device, results are
+       saved as JSON tagged with firmware version and optionally compared
+       against saved baseline. Exit code is 1 when any command is slower than
+       baseline by more than threshold.
+
+       python benchmark.py                                  - first attached device
+       python benchmark.py COM3 --output latency.json
+       python benchmark.py --baseline latency-4.3.6.json --threshold 0.3
+       python benchmark.py --emulate                        - emulated device (harness/emulator.py)
+'''
+#!/Python27/python
+import os
+import sys
+import harness         # puts initialisation, tests, harness and WolkSensor-python-lib on sys.path
+
+import argparse
+import json
+
+import logging_device
+
+from ports import find_ports
+from transport import Transport
+from latency import latency
+from latency import compare
+from latency import LATENCY_REPEAT
+from latency import LATENCY_THRESHOLD
+from latency import METRICS
+
+LOG_DIRECTORY = 'logs'
+
+
+def report(results):
+    print '\n\r==========================================================='
+    print " Firmware %s, %d round trips per command, %d per write form (ms)" %(results['version'], results['repeat'],
+                                                                            results.get('write_repeat', results['repeat']))
+    print " %-24s %s" %('', '   '.join("%-20s" %metric for metric in METRICS))
+    print " %-24s %s" %('command', '   '.join("%6s %6s %6s" %('p50', 'p95', 'p99') for metric in METRICS))
+    for command, result in sorted(results['commands'].items()):
+        columns = []
+        for metric in METRICS:
+            columns.append(' '.join("%6.1f" %(result[metric][p] * 1000) if result[metric][p] is not None else "     -"
+                                    for p in ('p50', 'p95', 'p99')))
+        print " %-24s %s%s" %(command, '   '.join(columns), "  timeouts: %d" %result['timeouts'] if result['timeouts'] else '')
+    print '==========================================================='
+
+def main():
+    parser = argparse.ArgumentParser(description = "WolkSensor per-command latency benchmark")
+    parser.add_argument('port', nargs = '?', help = "serial port, first attached device by default")
+    parser.add_argument('--repeat', type = int, default = LATENCY_REPEAT, help = "round trips per command, default %(default)s")
+    parser.add_argument('--output', help = "results file, default logs/latency-<version>.json")
+    parser.add_argument('--baseline', help = "results file to compare with")
+    parser.add_argument('--threshold', type = float, default = LATENCY_THRESHOLD, help = "allowed p95 slowdown, default %(default)s")
+    parser.add_argument('--emulate', action = 'store_true', help = "benchmark emulated device")
+    arguments = parser.parse_args()
+
+    emulator = None
+    if arguments.emulate:
+        from emulator import Emulator
+        emulator = Emulator()
+        port = emulator.start()
+    else:
+        ports = [arguments.port] if arguments.port else find_ports()
+        if not ports:
+            print "No WolkSensor device found"
+            return 1
+        port = ports[0]
+
+    logging_device.set_level(logging_device._info_)
+    transport = Transport.open(port)
+    try:
+        results = latency(transport, arguments.repeat)
+    finally:
+        transport.close()
+        if emulator:
+            emulator.stop()
+    results['port'] = port
+    report(results)
+
+    output = arguments.output
+    if not output:
+        if not os.path.isdir(LOG_DIRECTORY):
+            os.makedirs(LOG_DIRECTORY)
+        output = os.path.join(LOG_DIRECTORY, "latency-%s.json" %results['version'])
+    with open(output, 'w') as f:
+        json.dump(results, f, indent = 2, sort_keys = True)
+    print "Results saved to %s" %output
+
+    if arguments.baseline:
+        with open(arguments.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, arguments.threshold)
+        if regressions:
+            print "%d command(s) slower than baseline %s" %(len(regressions), arguments.baseline)
+            return 1
+        print "No command slower than baseline %s" %arguments.baseline
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
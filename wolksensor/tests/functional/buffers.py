@@ -0,0 +1,109 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Buffer wrap and overflow verification (harness/ringbuffer.py).
+       READINGS buffer is filled with ACQUISITIONs and SYSTEM buffer with
+       failing NOW cycles beyond capacity, read back and checked for
+       capacity, eviction order, timestamp order and framing of the split
+       response. Fill and drain rates are printed and saved as JSON. Exit
+       code is 1 when any buffer misbehaved.
+
+       For SYSTEM buffer Wi-Fi of the device is set to unreachable access
+       point and restored to constants.SSID/AUTH/PASS afterwards. One NOW
+       cycle takes up to a minute on a device.
+
+       python buffers.py                                    - READINGS of first attached device
+       python buffers.py COM3 --buffer all --output buffers.json
+       python buffers.py --emulate --buffer system          - emulated device (harness/emulator.py)
+'''
+#!/Python27/python
+import sys
+import harness         # puts initialisation, tests, harness and WolkSensor-python-lib on sys.path
+
+import argparse
+import json
+
+import constants
+import logging_device
+
+from ports import find_ports
+from serial_func import open_serial
+from serial_func import close_serial
+from ringbuffer import check_buffer
+from ringbuffer import BUFFERS
+from ringbuffer import OVERFILL
+from retry import retry
+from shadow import apply
+from shadow import wifi_profile
+
+UNREACHABLE_PROFILE = wifi_profile('fakeargumentssid', 'NONE', 'fakeargumentpass')
+
+
+def report(results):
+    print '\n\r==========================================================='
+    print " %-9s %5s %5s %6s %6s %9s %9s  %s" %('buffer', 'size', 'sent', 'added', 'items', 'fill/s', 'drain B/s', 'result')
+    for result in results:
+        print " %-9s %5d %5d %6d %6d %9.1f %9.0f  %s" %(result['buffer'], result['size'], result['sent'], result['added'],
+                                                        result['items'], result['fill_rate'] or 0, result['drain_rate'] or 0,
+                                                        'FAIL' if result['problems'] else 'PASS')
+        for problem in result['problems']:
+            print " %-9s %s" %('', problem)
+    print '==========================================================='
+
+def run(names, overfill):
+    results = []
+    for name in names:
+        spec = BUFFERS[name]
+        if spec.wrap:
+            # successful cycle would send and remove SYSTEM items
+            retry(apply, UNREACHABLE_PROFILE)
+        try:
+            results.append(check_buffer(spec, overfill))
+        finally:
+            if spec.wrap:
+                retry(apply, wifi_profile(constants.SSID, constants.AUTH, constants.PASS))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description = "WolkSensor buffer wrap and overflow verification")
+    parser.add_argument('port', nargs = '?', help = "serial port, first attached device by default")
+    parser.add_argument('--buffer', choices = sorted(BUFFERS) + ['all'], default = 'readings', help = "default %(default)s")
+    parser.add_argument('--overfill', type = int, default = OVERFILL, help = "entries beyond capacity, default %(default)s")
+    parser.add_argument('--output', help = "results file")
+    parser.add_argument('--emulate', action = 'store_true', help = "verify emulated device")
+    arguments = parser.parse_args()
+
+    emulator = None
+    if arguments.emulate:
+        from emulator import Emulator
+        emulator = Emulator()
+        port = emulator.start()
+    else:
+        ports = [arguments.port] if arguments.port else find_ports()
+        if not ports:
+            print "No WolkSensor device found"
+            return 1
+        port = ports[0]
+
+    logging_device.set_level(logging_device._info_)
+    if open_serial(port) != True:
+        print "Unable to open serial port %s" %port
+        return 1
+    try:
+        results = run(sorted(BUFFERS) if arguments.buffer == 'all' else [arguments.buffer], arguments.overfill)
+    finally:
+        close_serial()
+        if emulator:
+            emulator.stop()
+    report(results)
+
+    if arguments.output:
+        with open(arguments.output, 'w') as f:
+            json.dump(results, f, indent = 2, sort_keys = True)
+        print "Results saved to %s" %arguments.output
+
+    return 1 if any(result['problems'] for result in results) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
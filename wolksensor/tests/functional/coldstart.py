@@ -0,0 +1,100 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Cold start measurement of the harness.
+       Harness is started once per device and run, so the time from process
+       start to the first command written to the device is paid many
+       thousands of times. Every repeat is a new Python process which loads
+       the suites as a station does, finds the device, opens its port and
+       writes the first command; time is counted from interpreter start
+       (harness.elapsed()). p50/p95/max are reported and exit code is 1 when
+       p95 is over the limit.
+
+       python coldstart.py                          - first attached device
+       python coldstart.py COM3 --repeat 50 --limit 0.5
+       python coldstart.py --emulate                - emulated device (harness/emulator.py)
+'''
+#!/Python27/python
+import os
+import sys
+import harness         # puts initialisation, tests, harness and WolkSensor-python-lib on sys.path
+
+import argparse
+import subprocess
+
+COLD_START_REPEAT = 20
+COLD_START_LIMIT = 1.0          # seconds, p95 from process start to first command
+
+
+def first_command(port):
+    '''
+    Measured process, prints seconds from its start until first command was written
+    '''
+    from ports import find_ports
+    from serial_func import open_serial
+    from serial_func import close_serial
+    from serial_func import send_string_serial_wait
+    # station loads suites before it opens the port
+    from functional import run_suites
+
+    ports = [port] if port else find_ports()
+    if not ports or open_serial(ports[0]) != True:
+        return 1
+    send_string_serial_wait('VERSION;')
+    print "%.4f" %harness.elapsed()
+    close_serial()
+    return 0
+
+def cold_start(port, repeat):
+    '''
+    Returns sorted list of cold start times, one per process which reached the device
+    '''
+    command = [sys.executable, os.path.abspath(__file__), '--child'] + ([port] if port else [])
+    samples = []
+    for index in range(repeat):
+        process = subprocess.Popen(command, stdout = subprocess.PIPE)
+        output = process.communicate()[0].split()
+        if process.returncode == 0 and output:
+            samples.append(float(output[-1]))
+    return sorted(samples)
+
+def main():
+    if sys.argv[1:2] == ['--child']:
+        return first_command(sys.argv[2] if len(sys.argv) > 2 else None)
+
+    parser = argparse.ArgumentParser(description = "WolkSensor harness cold start measurement")
+    parser.add_argument('port', nargs = '?', help = "serial port, first attached device by default")
+    parser.add_argument('--repeat', type = int, default = COLD_START_REPEAT, help = "processes started, default %(default)s")
+    parser.add_argument('--limit', type = float, default = COLD_START_LIMIT, help = "allowed p95 in seconds, default %(default)s")
+    parser.add_argument('--emulate', action = 'store_true', help = "first command goes to emulated device")
+    arguments = parser.parse_args()
+
+    from streaming import percentile
+
+    emulator = None
+    port = arguments.port
+    if arguments.emulate:
+        from emulator import Emulator
+        emulator = Emulator()
+        port = emulator.start()
+    try:
+        samples = cold_start(port, arguments.repeat)
+    finally:
+        if emulator:
+            emulator.stop()
+
+    if not samples:
+        print "No process reached the device"
+        return 1
+    p95 = percentile(samples, 0.95)
+    print "Cold start to first command, %d of %d processes: p50 %.3fs, p95 %.3fs, max %.3fs" \
+    %(len(samples), arguments.repeat, percentile(samples, 0.50), p95, samples[-1])
+    if p95 > arguments.limit:
+        print "p95 over limit of %.3fs" %arguments.limit
+        return 1
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Fleet planning with discrete-event simulation (harness/simulation.py).
+       Every heartbeat/MOVEMENT/ATMO configuration is simulated for a fleet
+       of sensors over days of virtual time and battery life, data latency
+       and readings buffer overflow risk are reported per configuration.
+       Online time of connections and share of failed ones come from SYSTEM
+       items collected by analytics.py, default model follows the emulator
+       when there are none. Results are printed and saved as JSON.
+
+       python fleet.py                                      - HB5/HB10/HB30/HB60, 1000 sensors, 90 days
+       python fleet.py --heartbeat 10 60 --movement OFF ON --movement-interval 15
+       python fleet.py --failure-rate 0.3 --usb 0.2 --output fleet.json
+'''
+#!/Python27/python
+import sys
+import harness         # puts initialisation, tests, harness and WolkSensor-python-lib on sys.path
+
+import argparse
+import functools
+import json
+import multiprocessing
+import os
+
+import constants
+
+from analytics import STORE_FILE
+from phases import PhaseStore
+from simulation import Configuration
+from simulation import DEFAULT_FAILURE_RATE
+from simulation import DEFAULT_POWER
+from simulation import MOVEMENT_INTERVAL
+from simulation import PhaseModel
+from simulation import PowerModel
+from simulation import simulate
+
+FLEET_DEVICES = 1000
+FLEET_DAYS = 90
+HEARTBEATS = [int(constants.HB5), int(constants.HB10), int(constants.HB30), int(constants.HB60)]
+
+
+def phase_model(path, version, failure_rate):
+    store = PhaseStore.load(path) if os.path.exists(path) else None
+    model = PhaseModel.from_store(store, version, failure_rate) if store is not None else None
+    if model is None:
+        print "No SYSTEM items in %s, connection times of the emulator are used" %path
+        return PhaseModel.default(DEFAULT_FAILURE_RATE if failure_rate is None else failure_rate)
+    print "%d successful and %d failed connection times from %s" %(len(model.successful), len(model.failed), path)
+    return model
+
+def value(number, form):
+    return form %number if number is not None else '-'
+
+def report(results):
+    print '\n\r==========================================================='
+    print " %-28s %7s %6s %9s %9s %7s %7s %7s %7s %8s %7s" %('configuration', 'conn/d', 'failed', 'battery', 'battery',
+                                                            'lat p50', 'lat p95', 'lat max', 'lost', 'overflow', 'fill')
+    print " %-28s %7s %6s %9s %9s %7s %7s %7s %7s %8s %7s" %('', '', '', 'p5 days', 'p50 days', 'min', 'min', 'min',
+                                                            '', 'devices', 'p95')
+    for result in results:
+        print " %-28s %7.1f %5.1f%% %9s %9s %7s %7s %7s %6.2f%% %8d %6.0f%%" \
+        %(result['configuration'], result['connections_per_day'], 100 * (result['failed_share'] or 0),
+          value(result['battery_days_p5'], "%.0f"), value(result['battery_days_p50'], "%.0f"),
+          value(result['latency_p50'], "%d"), value(result['latency_p95'], "%d"), value(result['latency_max'], "%d"),
+          100 * result['lost_share'], result['overflow_devices'], 100 * result['peak_fill_p95'])
+        if result['stalled_heartbeat']:
+            print " %-28s heartbeat timer passed heartbeat on %d device(s)" %('', result['stalled_heartbeat'])
+    print '==========================================================='
+
+def main():
+    parser = argparse.ArgumentParser(description = "WolkSensor fleet heartbeat and power management simulation")
+    parser.add_argument('--heartbeat', type = int, nargs = '+', default = HEARTBEATS, help = "minutes, default %(default)s")
+    parser.add_argument('--movement', nargs = '+', choices = ['ON', 'OFF'], default = ['OFF'], help = "default %(default)s")
+    parser.add_argument('--atmo', nargs = '+', choices = ['ON', 'OFF'], default = ['ON'], help = "default %(default)s")
+    parser.add_argument('--devices', type = int, default = FLEET_DEVICES, help = "sensors per configuration, default %(default)s")
+    parser.add_argument('--days', type = float, default = FLEET_DAYS, help = "virtual time, default %(default)s")
+    parser.add_argument('--movement-interval', type = float, default = MOVEMENT_INTERVAL,
+                        help = "mean minutes between movements, default %(default)s")
+    parser.add_argument('--usb', type = float, default = 0.0, help = "share of sensors powered over USB, default %(default)s")
+    parser.add_argument('--failure-rate', type = float, help = "share of failed connections, default from SYSTEM items")
+    parser.add_argument('--store', default = STORE_FILE, help = "SYSTEM items of analytics.py, default %(default)s")
+    parser.add_argument('--version', help = "use SYSTEM items of this firmware version only")
+    parser.add_argument('--capacity', type = float, default = DEFAULT_POWER.capacity, help = "battery mAh, default %(default)s")
+    parser.add_argument('--online-current', type = float, default = DEFAULT_POWER.online_current,
+                        help = "mA while connected, default %(default)s")
+    parser.add_argument('--processes', type = int, default = multiprocessing.cpu_count(),
+                        help = "configurations simulated in parallel, default %(default)s")
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--output', help = "results file")
+    arguments = parser.parse_args()
+
+    model = phase_model(arguments.store, arguments.version, arguments.failure_rate)
+    power = PowerModel(arguments.capacity, DEFAULT_POWER.sleep_current, DEFAULT_POWER.movement_current,
+                       DEFAULT_POWER.acquisition_charge, arguments.online_current)
+    configurations = [Configuration(heartbeat, movement == 'ON', atmo == 'ON') for atmo in arguments.atmo
+                      for movement in arguments.movement for heartbeat in arguments.heartbeat]
+    run = functools.partial(simulate, devices = arguments.devices, days = arguments.days, model = model, power = power,
+                            usb = arguments.usb, movement_interval = arguments.movement_interval, seed = arguments.seed)
+
+    if arguments.processes > 1:
+        pool = multiprocessing.Pool(arguments.processes)
+        try:
+            results = pool.map(run, configurations, chunksize = 1)
+            pool.close()
+        except KeyboardInterrupt:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+    else:
+        results = [run(configuration) for configuration in configurations]
+    report(results)
+
+    if arguments.output:
+        with open(arguments.output, 'w') as f:
+            json.dump(results, f, indent = 2, sort_keys = True)
+        print "Results saved to %s" %arguments.output
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
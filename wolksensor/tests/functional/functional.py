@@ -1,7 +1,7 @@
 '''
 Created on July 29th 2016
 @author: srdjan.stankovic@wolkabout.com
-Last Modified on July 29th 2016
+Last Modified on October 18th 2026
 @author: srdjan.stankovic@wolkabout.com
 
 brief: Set of functional test for WolkSensor device.
@@ -10,46 +10,80 @@ brief: Set of functional test for WolkSensor device.
             * Data Driven tests
             * Flow test
             * Robustness test
+       Every suite is a list of named steps with results saved to
+       checkpoint.json, interrupted run can be continued:
+
+       python functional.py             - full run
+       python functional.py --resume    - continue from first step which did not finish
+       python functional.py --failed    - run only steps which failed or did not finish
+       python functional.py --profile   - time spent in harness helpers per suite and step,
+                                          top functions at the end, flame graph in profile.folded
 '''
 #!/Python27/python
-import os
 import sys
-sys.path.append(os.path.dirname(os.path.realpath("functional.py")) + "/../../../WolkSensor-python-lib/core")
-sys.path.append(os.path.dirname(os.path.realpath("functional.py")) + "/initialisation")
-sys.path.append(os.path.dirname(os.path.realpath("functional.py")) + "/tests")
+import harness         # puts initialisation, tests, harness and WolkSensor-python-lib on sys.path
 
 import logging_device
 import constants
+import checkpoint
+import profiler
+import recorder
 
 from serial_func import open_serial
 from serial_func import close_serial
+from ports import find_ports
+from phases import snapshot
 from initialisation import initialisation
 from data_driven import data_driven
 from flow_states import flow_states
 from robustness import robustness
 
+SUITES = [('data_driven', data_driven), ('flow_states', flow_states), ('robustness', robustness)]
+TRACE_FILE = 'trace.jsonl'       # every serial exchange, harness/recorder.py
+CHECKPOINT_FILE = 'checkpoint.json'
+PROFILE_FILE = 'profile.folded'     # harness/profiler.py, flamegraph.pl or speedscope
+MODES = {'--resume': checkpoint.RESUME, '--failed': checkpoint.FAILED}
+
+
+def run_suites(suites = SUITES):
+    results = []
+    for name, suite in suites:
+        with profiler.section(name):
+            passed = suite()
+        if passed:
+            logging_device.info(constants.PASSED)
+            results.append((name, True))
+        else:
+            logging_device.error(constants.FAIL)
+            results.append((name, False))
+        # SYSTEM items of the suite go to trace for analytics.py
+        snapshot()
+
+    return results
+
 
-def main():
+def main(mode = None, profile = False):
     initialisation()
+    if profile:
+        profiler.install()
 
+    # attached devices by VID/PID, open_serial('auto') scans ports by manufacturer name
+    ports = find_ports()
     while 1:
-        serial = open_serial('auto')
+        serial = open_serial(ports.pop(0) if ports else 'auto')
         if serial == True:
 
-            if data_driven():
-                logging_device.info(constants.PASSED)
-            else:
-                logging_device.error(constants.FAIL)
-
-            if flow_states():
-                logging_device.info(constants.PASSED)
-            else:
-                logging_device.error(constants.FAIL)
-
-            if robustness():
-                logging_device.info(constants.PASSED)
-            else:
-                logging_device.error(constants.FAIL)
+            recorder.start(TRACE_FILE)
+            checkpoint.start(CHECKPOINT_FILE, mode)
+            try:
+                run_suites()
+            finally:
+                checkpoint.stop()
+                recorder.stop()
+                if profile:
+                    profiler.summary()
+                    profiler.write_folded(PROFILE_FILE)
+                    print "Profile saved to %s" %PROFILE_FILE
 
             close_serial()
             return True
@@ -64,4 +98,5 @@ def main():
     return True
 
 if __name__ == '__main__':
-    sys.exit(main())
+    modes = [MODES[argument] for argument in sys.argv[1:] if argument in MODES]
+    sys.exit(main(modes[0] if modes else None, '--profile' in sys.argv[1:]))
@@ -0,0 +1,67 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Functional test harness package.
+       Importing it puts initialisation, tests, harness and the
+       WolkSensor-python-lib core and API folders on sys.path, found from
+       this file instead of the current directory, so scripts can be started
+       from any folder:
+
+           import harness
+           from serial_func import open_serial
+
+       Tools in this folder are started as modules of the package from the
+       functional folder, which imports it first:
+
+           python -m harness.identity WolkSensorUnits.db --lookup 0013A2000001
+
+       Nothing else is imported here. Modules are imported by their own name
+       ('import recorder', never 'harness.recorder', which would be a second
+       copy of module state) and only when a script needs them; modules with
+       heavy or platform dependencies (pyserial, colorama) import them inside
+       the functions which use them.
+'''
+import os
+import sys
+import time
+
+START = time.time()
+
+HARNESS_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+FUNCTIONAL_DIRECTORY = os.path.dirname(HARNESS_DIRECTORY)
+LIBRARY_DIRECTORY = os.path.join(FUNCTIONAL_DIRECTORY, '..', '..', '..', 'WolkSensor-python-lib')
+
+PATHS = [os.path.join(LIBRARY_DIRECTORY, 'core'),
+         os.path.join(LIBRARY_DIRECTORY, 'API'),
+         os.path.join(FUNCTIONAL_DIRECTORY, 'initialisation'),
+         os.path.join(FUNCTIONAL_DIRECTORY, 'tests'),
+         HARNESS_DIRECTORY]
+
+for path in PATHS:
+    path = os.path.normpath(path)
+    if path not in sys.path:
+        sys.path.append(path)
+
+
+def process_start():
+    '''
+    Time the interpreter was started, so startup cost includes loading Python itself.
+    Linux only, elsewhere time this package was imported
+    '''
+    try:
+        with open('/proc/self/stat') as f:
+            # fields after '(command)', starttime is field 22 in clock ticks since boot
+            started = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        # both counters tick in 10 ms steps
+        return min(START, time.time() - uptime + float(started) / os.sysconf('SC_CLK_TCK'))
+    except (IOError, OSError, IndexError, ValueError):
+        return START
+
+def elapsed():
+    '''
+    Seconds since process start
+    '''
+    return time.time() - process_start()
@@ -0,0 +1,215 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Batched command API.
+       List of (command, argument) pairs is packed into as few serial writes
+       as device allows (constants.COMMAND_MAX_LENGTH per command,
+       constants.COMMANDS_BUFFER_SIZE commands and constants.COMMAND_STRING_BUFFER_SIZE
+       bytes per write) and response stream is split back into one result
+       per command. After a write which timed out, or left part of a message
+       unread, the port is drained until it is quiet, so late responses are
+       not taken as responses to the next write.
+'''
+import time
+import constants
+import logging_device
+import recorder
+
+from serial_func import send_string_serial_wait
+from serial_func import receive_string_serial
+
+DRAIN_QUIET = 0.2               # seconds without data after which the port is taken to be quiet
+
+# functions called with responses of every batch write, e.g. shadow.ConfigShadow.observe
+response_observers = []
+
+
+def command_string(command, argument = None):
+    if argument is None:
+        return command + constants.COMMAND_TERMINATOR
+    return command + constants.COMMAND_ARGUMENT_SEPARATOR + argument + constants.COMMAND_TERMINATOR
+
+def segments(string):
+    '''
+    Device answers every ';' terminated part of the string, including empty ones
+    '''
+    return string.count(constants.COMMAND_TERMINATOR)
+
+def pack(strings):
+    '''
+    Returns list of writes, each write is a list of indexes into strings
+    '''
+    writes = []
+    current = []
+    current_length = 0
+    current_segments = 0
+
+    for index, string in enumerate(strings):
+        if len(string) > constants.COMMAND_MAX_LENGTH:
+            # oversized command is sent on its own, same as before batching
+            if current:
+                writes.append(current)
+            writes.append([index])
+            current, current_length, current_segments = [], 0, 0
+            continue
+
+        if current and (current_segments + segments(string) > constants.COMMANDS_BUFFER_SIZE or \
+        current_length + len(string) > constants.COMMAND_STRING_BUFFER_SIZE):
+            writes.append(current)
+            current, current_length, current_segments = [], 0, 0
+
+        current.append(index)
+        current_length += len(string)
+        current_segments += segments(string)
+
+    if current:
+        writes.append(current)
+
+    return writes
+
+def frame(data):
+    '''
+    Splits received data on command terminator. Returns (messages, unterminated rest)
+    '''
+    parts = data.split(constants.COMMAND_TERMINATOR)
+    rest = parts.pop()
+    return [part + constants.COMMAND_TERMINATOR for part in parts], rest
+
+def name(string):
+    return string.split(constants.COMMAND_ARGUMENT_SEPARATOR, 1)[0].rstrip(constants.COMMAND_TERMINATOR)
+
+def is_notification(message, expected_name):
+    return message.startswith('STATUS ') and expected_name != 'STATUS'
+
+def receive_responses(expected_names, timeout = constants.RESPONSE_TIMEOUT):
+    '''
+    Collects one response per expected command name, unsolicited STATUS messages are skipped.
+    Returns (responses, unterminated rest of received data)
+    '''
+    responses = []
+    rest = ''
+    deadline = time.time() + timeout
+    while len(responses) < len(expected_names) and time.time() < deadline:
+        received = receive_string_serial()
+        if not received:
+            time.sleep(0.01)
+            continue
+        recorder.received(received, quiet = True)
+
+        messages, rest = frame(rest + received)
+        for message in messages:
+            if len(responses) == len(expected_names):
+                break
+            if is_notification(message, expected_names[len(responses)]):
+                logging_device.debug("Notification during batch: %s" %message)
+                continue
+            responses.append(message)
+
+    return responses, rest
+
+def drain(rest = '', quiet = DRAIN_QUIET, timeout = constants.RESPONSE_TIMEOUT):
+    '''
+    Reads until nothing is received for quiet seconds, rest is unterminated data received before
+    '''
+    deadline = time.time() + timeout
+    last = time.time()
+    while time.time() - last < quiet and time.time() < deadline:
+        received = receive_string_serial()
+        if not received:
+            time.sleep(0.01)
+            continue
+        last = time.time()
+        recorder.received(received, quiet = True)
+
+        messages, rest = frame(rest + received)
+        for message in messages:
+            logging_device.debug("Late response dropped: %s" %message)
+
+    if rest:
+        logging_device.debug("Unterminated response dropped: %s" %rest)
+
+def send_batch(commands, timeout = constants.RESPONSE_TIMEOUT):
+    '''
+    commands: list of (command, argument) pairs, argument None for read
+    Returns list with list of responses for every pair, one response per ';' in command string
+    '''
+    strings = [command_string(command, argument) for command, argument in commands]
+    results = [[] for string in strings]
+
+    for write in pack(strings):
+        data = ''.join(strings[index] for index in write)
+        expected_names = []
+        for index in write:
+            expected_names.extend([name(strings[index])] * segments(strings[index]))
+
+        recorder.sent(data, quiet = True)
+        send_string_serial_wait(data)
+        responses, rest = receive_responses(expected_names, timeout)
+        if len(responses) < len(expected_names) or rest:
+            drain(rest)
+        for observer in response_observers:
+            observer(responses)
+
+        for index in write:
+            count = segments(strings[index])
+            results[index] = responses[:count]
+            responses = responses[count:]
+
+    return results
+
+def accepted(command, responses):
+    if not responses:
+        return False
+    response = responses[0]
+    return response == constants.DONE or response == command + constants.COMMAND_TERMINATOR or \
+    response.startswith(command + constants.COMMAND_ARGUMENT_SEPARATOR)
+
+def rejected(responses):
+    return len(responses) > 0 and responses[0] == constants.BAD_REQUEST
+
+def test_batch(command, valid_arguments, invalid_arguments):
+    '''
+    Batched counterpart of device_test_func.test(), valid arguments have to be accepted and invalid rejected
+    '''
+    arguments = list(valid_arguments) + list(invalid_arguments)
+    if not arguments:
+        arguments = [None]
+        valid_arguments = [None]
+
+    results = send_batch([(command, argument) for argument in arguments])
+
+    response = True
+    for i, argument in enumerate(arguments):
+        if i < len(valid_arguments):
+            if not accepted(command, results[i]):
+                logging_device.error("%s %r not accepted. Received: %s" %(command, argument, ''.join(results[i])))
+                response = False
+        else:
+            if not rejected(results[i]):
+                logging_device.error("%s %r not rejected. Received: %s" %(command, argument, ''.join(results[i])))
+                response = False
+
+    return response
+
+def run_plan(vectors):
+    '''
+    Runs Vector list (vectors.py) in as few writes as device allows, order of vectors is kept so setup
+    vectors apply to the ones following them. Returns (result, list of failed vectors)
+    '''
+    results = send_batch([(vector.command, vector.argument) for vector in vectors])
+
+    failed = []
+    section = None
+    for vector, responses in zip(vectors, results):
+        if vector.section != section:
+            section = vector.section
+            logging_device.info("\n\r\t\t-------- %s --------" %section)
+        if vector.valid and not accepted(vector.command, responses):
+            logging_device.error("%s %r not accepted. Received: %s" %(vector.command, vector.argument, ''.join(responses)))
+            failed.append(vector)
+        elif not vector.valid and not rejected(responses):
+            logging_device.error("%s %r not rejected. Received: %s" %(vector.command, vector.argument, ''.join(responses)))
+            failed.append(vector)
+
+    return len(failed) == 0, failed
@@ -0,0 +1,138 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Checkpoint and resume of functional runs.
+       Suites are lists of named steps, each with device configuration it
+       needs (shadow.apply() profile). Result of every step is saved to
+       checkpoint file as soon as the step ends, so run interrupted by a
+       failure or unplugged device does not have to start over:
+
+           RESUME  - finished steps are skipped, run continues from first unfinished one
+           FAILED  - only steps which failed or did not finish are run
+           None    - fresh run, checkpoint file is started over
+
+       Configuration of a step is applied before it runs, so a resumed step
+       finds device as it would in full run. Data Driven vectors are
+       checkpointed per section, resumed run sends only vectors not covered.
+'''
+import json
+import os
+import time
+import logging_device
+import profiler
+
+from device_test_func import wait_dev_state_idle
+from device_watchdog import kick
+from retry import retry
+from shadow import apply
+from vectors import key
+
+RESUME = 'resume'
+FAILED = 'failed'
+
+
+class Checkpoint(object):
+    def __init__(self):
+        self.path = None
+        self.mode = None
+        self.steps = {}
+        self.vectors = {}
+
+    def start(self, path, mode = None):
+        self.path = path
+        self.mode = mode
+        self.steps = {}
+        self.vectors = {}
+        if mode and os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            self.steps = data['steps']
+            self.vectors = dict((tuple(vector[:3]), vector[3]) for vector in data['vectors'])
+        self.save()
+
+    def stop(self):
+        self.path = None
+        self.mode = None
+
+    def save(self):
+        if not self.path:
+            return
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w') as f:
+            json.dump({'steps': self.steps, 'vectors': [list(vector) + [result] for vector, result in sorted(self.vectors.items())]},
+                      f, indent = 2, sort_keys = True)
+        # checkpoint is replaced at once, run interrupted while saving keeps the previous one
+        if os.name == 'nt' and os.path.exists(self.path):
+            os.remove(self.path)
+        os.rename(temporary, self.path)
+
+    def done(self, name):
+        '''
+        Result of step which does not have to run again, None when step has to run
+        '''
+        step = self.steps.get(name)
+        if not step or step['result'] is None:
+            return None
+        if self.mode == RESUME or (self.mode == FAILED and step['result']):
+            return step['result']
+        return None
+
+    def record(self, name, result, state, duration = None):
+        '''
+        result None marks step which started and did not finish
+        '''
+        self.steps[name] = {'result': result, 'state': state, 'duration': duration}
+        self.save()
+
+    def covered(self):
+        '''
+        (section, command, argument) keys of vectors which do not have to run again
+        '''
+        return [vector for vector, result in self.vectors.items() if self.mode == RESUME or (self.mode == FAILED and result)]
+
+    def cover(self, vectors, failed):
+        for vector in vectors:
+            if not vector.setup:
+                self.vectors[key(vector)] = vector not in failed
+        self.save()
+
+
+checkpoint = Checkpoint()
+
+def start(path, mode = None):
+    checkpoint.start(path, mode)
+
+def stop():
+    checkpoint.stop()
+
+def run_steps(suite, steps):
+    '''
+    steps: [(name, function, state)], function returns True on success and state is configuration
+    which has to be applied before it. Returns True if all steps passed
+    '''
+    return_value = True
+    for step, function, state in steps:
+        name = suite + '/' + step
+        result = checkpoint.done(name)
+        if result is not None:
+            logging_device.info("\n\r\t\t-------- %s skipped, %s in checkpoint --------" %(name, 'passed' if result else 'failed'))
+            if not result:
+                return_value = False
+            continue
+
+        kick()
+        checkpoint.record(name, None, state)
+        start = time.time()
+        with profiler.section(step):
+            if state:
+                # configuration writes are refused with BUSY while device is not idle
+                wait_dev_state_idle()
+                if not retry(apply, state):
+                    logging_device.error("Configuration of step %s not applied" %name)
+            result = bool(function())
+        checkpoint.record(name, result, state, time.time() - start)
+        if not result:
+            return_value = False
+
+    return return_value
@@ -0,0 +1,192 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Table-driven decoder of device responses.
+       Field tables are built once from the protocol.c grammar and the
+       field prefixes in constants.py:
+
+           READINGS R:..,P:..,T:..,H:..,M:..|...;
+           SYSTEM R:..,E:..,A:..,D:..,S:..,Q:..,L:..,C:..,B:..,V:..|...;
+           OFFSET_FACTORY P:..,T:..,H:..;
+
+       Every response is decoded in a single pass into records with
+       __slots__, callers keep the records instead of splitting the same
+       string again.
+
+       python -m harness.codec [readings]    - micro-benchmark, parse cost per reading
+'''
+#!/Python27/python
+import sys
+
+import constants
+
+
+class Record(object):
+    __slots__ = ()
+
+    def __init__(self, *values):
+        values = values + (None,) * (len(self.__slots__) - len(values))
+        for slot, value in zip(self.__slots__, values):
+            setattr(self, slot, value)
+
+    def values(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.values() == other.values()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "%s(%s)" %(type(self).__name__, ', '.join("%s=%r" %(slot, getattr(self, slot)) for slot in self.__slots__))
+
+
+class Reading(Record):
+    __slots__ = ('timestamp', 'pressure', 'temperature', 'humidity', 'movement')
+
+
+class SystemItem(Record):
+    __slots__ = ('timestamp', 'error', 'access_point_time', 'dhcp_time', 'server_time', 'data_exchange_time',
+                 'disconnect_time', 'connection_time', 'battery', 'version')
+
+
+class Offsets(Record):
+    __slots__ = ('pressure', 'temperature', 'humidity')
+
+
+def key(field_string):
+    # 'P:' -> 'P'
+    return field_string.rstrip(':')
+
+def compile_fields(fields):
+    '''
+    [(field string, slot, converter)] -> {key: (slot, converter)}
+    '''
+    return dict((key(field_string), (slot, converter)) for field_string, slot, converter in fields)
+
+READING_FIELDS = compile_fields([
+    (constants.TIMESTAMPSTRING,   'timestamp',   int),
+    (constants.PRESSURESTRING,    'pressure',    float),
+    (constants.TEMPERATURESTRING, 'temperature', float),
+    (constants.HUMIDITYSTRING,    'humidity',    float),
+    (constants.MOVEMENT,          'movement',    float)])
+
+SYSTEM_FIELDS = compile_fields([
+    (constants.TIMESTAMPSTRING,  'timestamp',          int),
+    (constants.ERROR,            'error',              str),
+    (constants.ACCESSPOINTTIME,  'access_point_time',  int),
+    (constants.DHCPTIME,         'dhcp_time',          int),
+    (constants.SERVER,           'server_time',        int),
+    (constants.DATAEXCHANGETIME, 'data_exchange_time', int),
+    (constants.DISCONNECTTIME,   'disconnect_time',    int),
+    (constants.CONNECTIONTIME,   'connection_time',    int),
+    (constants.BATTERY,          'battery',            int),
+    ('V:',                       'version',            str)])
+
+OFFSET_FIELDS = compile_fields([
+    (constants.PRESSURESTRING,    'pressure',    float),
+    (constants.TEMPERATURESTRING, 'temperature', float),
+    (constants.HUMIDITYSTRING,    'humidity',    float)])
+
+
+def decode_item(item, record_class, fields):
+    '''
+    'R:1514824768,P:1013.2,T:23.1,H:45.0' -> record_class with fields set, missing fields are None
+    '''
+    record = record_class()
+    for field in item.split(','):
+        name, separator, value = field.partition(':')
+        try:
+            slot, converter = fields[name]
+            setattr(record, slot, converter(value))
+        except (KeyError, ValueError):
+            raise ValueError("Invalid field %r in %r" %(field, item))
+    return record
+
+def item_list_decoder(record_class, fields):
+    def decode_items(argument):
+        if not argument:
+            return []
+        return [decode_item(item, record_class, fields) for item in argument.split('|')]
+    return decode_items
+
+def decode_offset_factory(argument):
+    if argument == 'RESET':
+        return argument
+    return decode_item(argument, Offsets, OFFSET_FIELDS)
+
+DECODERS = {
+    'READINGS':        item_list_decoder(Reading, READING_FIELDS),
+    'SYSTEM':          item_list_decoder(SystemItem, SYSTEM_FIELDS),
+    'OFFSET_FACTORY':  decode_offset_factory,
+    'TEMP_OFFSET':     float,
+    'HUMIDITY_OFFSET': float,
+    'PRESSURE_OFFSET': float,
+    'RTC':             int,
+    'HEARTBEAT':       int,
+    'PORT':            int}
+
+
+def split(message):
+    '''
+    'NAME argument;' -> ('NAME', 'argument'), argument is '' when there is none
+    '''
+    message = message.strip()
+    if not message.endswith(constants.COMMAND_TERMINATOR):
+        raise ValueError("Response %r is not terminated" %message)
+    name, separator, argument = message[:-1].partition(constants.COMMAND_ARGUMENT_SEPARATOR)
+    return name, argument
+
+def decode(message):
+    '''
+    decode('READINGS R:..,P:..|R:..;') -> [Reading, Reading]
+    decode('TEMP_OFFSET 1.5;')          -> 1.5
+    decode('SSID wolkabout;')           -> 'wolkabout'
+    Raises ValueError for malformed response
+    '''
+    name, argument = split(message)
+    decoder = DECODERS.get(name)
+    if decoder is None:
+        return argument
+    if name not in ('READINGS', 'SYSTEM') and not argument:
+        return None
+    try:
+        return decoder(argument)
+    except ValueError:
+        raise ValueError("Invalid %s response %r" %(name, message))
+
+
+def benchmark_message(count):
+    items = ["R:%d,P:%.1f,T:%.1f,H:%.1f" %(1514824768 + 60 * i, 1013.2 + i % 7, 23.1 + i % 3, 45.0 + i % 5) for i in range(count)]
+    return "READINGS " + '|'.join(items) + ';'
+
+def split_parse(message):
+    '''
+    Old way, kept for comparison: split on ' ', '|' and ',' with re for every value
+    '''
+    import re
+    readings = []
+    for item in re.split("\|", re.split(" |;", message)[1]):
+        values = {}
+        for field in re.split(",", item):
+            name, value = re.split(":", field)
+            values[name] = value
+        readings.append((int(values['R']), float(values['P']), float(values['T']), float(values['H'])))
+    return readings
+
+def benchmark(count = constants.SENSOR_READINGS_BUFFER_SIZE, repeat = 200):
+    import timeit
+    message = benchmark_message(count)
+    for label, function in (('codec.decode', decode), ('re.split', split_parse)):
+        seconds = min(timeit.repeat(lambda: function(message), number = repeat, repeat = 3))
+        print " %-14s %8.2f us/reading  (%d readings, %d bytes)" %(label, seconds / repeat / count * 1e6, count, len(message))
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else constants.SENSOR_READINGS_BUFFER_SIZE
+    benchmark(count)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
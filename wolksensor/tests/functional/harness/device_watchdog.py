@@ -0,0 +1,84 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Station watchdog.
+       Every serial exchange (recorder.py), retry attempt (retry.py) and
+       suite step (checkpoint.py) kicks the watchdog. When nothing happens
+       for constants.WATCHDOG_TIMEOUT seconds device is power cycled with
+       RELOAD; when it is still stuck after constants.WATCHDOG_RELOADS
+       reloads, device is marked failed and main thread is interrupted
+       (KeyboardInterrupt with watchdog.failed set), so the station is freed
+       for the rest of the rig.
+'''
+import thread
+import threading
+import time
+import constants
+import logging_device
+
+
+class Watchdog(object):
+    def __init__(self):
+        self.timeout = constants.WATCHDOG_TIMEOUT
+        self.reload = None
+        self.last_kick = time.time()
+        self.reloads = 0
+        self.failed = False
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self, reload, timeout = constants.WATCHDOG_TIMEOUT):
+        '''
+        reload: function which sends RELOAD to the device
+        '''
+        self.stop()
+        self.reload = reload
+        self.timeout = timeout
+        self.reloads = 0
+        self.failed = False
+        self.last_kick = time.time()
+        self.stopped.clear()
+        self.thread = threading.Thread(target = self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        if self.thread:
+            self.stopped.set()
+            self.thread.join()
+            self.thread = None
+
+    def kick(self):
+        self.last_kick = time.time()
+
+    def run(self):
+        while not self.stopped.wait(min(1.0, self.timeout)):
+            if time.time() - self.last_kick < self.timeout:
+                continue
+            if self.reloads < constants.WATCHDOG_RELOADS:
+                self.reloads += 1
+                logging_device.error("Watchdog: no progress in %d seconds, reloading device (%d)" %(self.timeout, self.reloads))
+                self.kick()
+                try:
+                    self.reload()
+                except Exception as e:
+                    logging_device.error("Watchdog: RELOAD failed: %s" %e)
+                continue
+            logging_device.error("Watchdog: device still stuck after %d reload(s), marked failed" %self.reloads)
+            self.failed = True
+            # raises KeyboardInterrupt in main thread once it returns from current call
+            thread.interrupt_main()
+            return
+
+
+watchdog = Watchdog()
+
+def start(reload, timeout = constants.WATCHDOG_TIMEOUT):
+    watchdog.start(reload, timeout)
+
+def stop():
+    watchdog.stop()
+
+def kick():
+    watchdog.kick()
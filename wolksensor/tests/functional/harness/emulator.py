@@ -0,0 +1,821 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Pure-Python WolkSensor device emulator on a pseudo-terminal.
+       Command set, parser rules and responses follow SDK/core/commands.c,
+       command_parser.c and protocol.c, validation limits follow config.h.
+       Sensor readings buffer (constants.SENSOR_READINGS_BUFFER_SIZE, new
+       readings are rejected when full) and system buffer
+       (constants.SYSTEM_BUFFER_SIZE, oldest item is dropped) are modelled,
+       as are the minute acquisition, heartbeat and connection sequence.
+
+       Time is virtual: clock runs 'speed' times faster than wall clock and
+       advance() fast-forwards it, so acquisition period and heartbeat do
+       not take real minutes. Each emulator listens on pty slave which is
+       passed to open_serial like any COM port (Linux and macOS only).
+
+       python -m harness.emulator                      - one emulator in real time
+       python -m harness.emulator -n 20 --speed 60     - 20 emulators, one virtual minute per second
+'''
+#!/Python27/python
+import os
+import sys
+
+import argparse
+import errno
+import heapq
+import random
+import select
+import threading
+import time
+import tty
+import constants
+
+COMMAND_TABLE = ["MAC", "NOW", "RELOAD", "HEARTBEAT", "RTC", "VERSION", "STATUS", "READINGS", "ID",
+                 "SIGNATURE", "URL", "PORT", "SSID", "PASS", "AUTH", "MOVEMENT", "ATMO", "SYSTEM",
+                 "STATIC_IP", "STATIC_MASK", "STATIC_GATEWAY", "STATIC_DNS", "ALARM", "SET", "LOCATION",
+                 "SSL", "TEMP_OFFSET", "HUMIDITY_OFFSET", "PRESSURE_OFFSET", "OFFSET_FACTORY", "ACQUISITION"]
+
+AUTH_TYPES = ["NONE", "WEP", "WPA2", "WPA"]   # WIFI_SECURITY_UNSECURED, _WEP, _WPA2, _WPA
+
+SENSORS = ['P', 'T', 'H', 'M']
+
+# connection phase: (SYSTEM item key, wifi module state name reported on STATUS request)
+PHASES = {"CONNECTING_TO_AP":     ('A', "STARTED-CONNECTING-CONNECTING_TO_AP"),
+          "ACQUIRING_IP_ADDRESS": ('D', "STARTED-CONNECTING-ACQUIRING_IP_ADDRESS"),
+          "SEND":                 ('S', "STARTED-CONNECTED-SEND"),
+          "RECEIVE":              ('Q', "STARTED-CONNECTED-RECEIVE"),
+          "DISCONNECTING":        ('L', "STARTED-DISCONNECTING")}
+
+ULONG_MAX = 2 ** 32 - 1
+
+# wifi_communication_module_error_type_t
+WIFI_SUCCESS = 0x00
+WIFI_TIMEOUT = 0x20
+WIFI_PARAMETERS_MISSING = 0x50
+
+COMMUNICATION_PROTOCOL_DATA = 1
+COMMUNICATION_MODULE_WIFI = 0
+
+WIFI_CONNECTING_TIMEOUT = 20
+RESET_TIME = 2
+MAX_IDLE = 1.0
+BATTERY_VOLTAGE = 3000
+
+
+def is_string_numeric(string):
+    if string.startswith('-'):
+        string = string[1:]
+    return string.isdigit()
+
+def is_string_decimal_numeric(string):
+    if string.startswith('-'):
+        string = string[1:]
+    if not string or string.endswith('.') or string.count('.') > 1:
+        return False
+    return string.replace('.', '').isdigit()
+
+def is_string_hex(string):
+    return all(character in "0123456789ABCDEF" for character in string)
+
+def strtoul(string):
+    value = int(string)
+    if value < 0:
+        return (ULONG_MAX + 1 + value) & ULONG_MAX
+    return min(value, ULONG_MAX)
+
+def inet_pton_ipv4(string):
+    octets = string.split('.')
+    if len(octets) != 4:
+        return False
+    for octet in octets:
+        if not octet.isdigit() or (len(octet) > 1 and octet[0] == '0') or int(octet) > 255:
+            return False
+    return True
+
+def check_hostname_constraints(string):
+    '''
+    Same checks as command_parser.c, last character is not checked for allowed characters there either
+    '''
+    if len(string) > 63 or '.' not in string or string[0] == '-':
+        return False
+    for character in string[:-1]:
+        if not (character.isalnum() or character in '.-'):
+            return False
+    if string[-1] == '-':
+        return False
+    for character in string[string.index('.'):-1]:
+        if not (character == '.' or character.isalpha()):
+            return False
+    return True
+
+def parse_argument(name, argument):
+    '''
+    Mirrors parse_commad_argument(). Returns parsed argument or None when argument is invalid
+    '''
+    if name in ("MOVEMENT", "ATMO", "LOCATION", "SSL"):
+        return {"ON": True, "OFF": False}.get(argument)
+    if name in ("HEARTBEAT", "PORT"):
+        if len(argument) > constants.MAX_INT_LENGTH or not is_string_numeric(argument):
+            return None
+        return strtoul(argument)
+    if name in ("TEMP_OFFSET", "HUMIDITY_OFFSET", "PRESSURE_OFFSET"):
+        if len(argument) > constants.MAX_INT_LENGTH or not is_string_decimal_numeric(argument):
+            return None
+        return float(argument)
+    if name == "RTC":
+        if not is_string_numeric(argument) or '-' in argument or len(argument) > 10:
+            return None
+        return strtoul(argument)
+    if name in ("ID", "SIGNATURE", "SSID", "PASS", "OFFSET_FACTORY"):
+        return argument[:constants.COMMAND_ARGUMENT_MAX_LENGTH]
+    if name == "URL":
+        if not inet_pton_ipv4(argument) and not check_hostname_constraints(argument):
+            return None
+        return argument[:constants.COMMAND_ARGUMENT_MAX_LENGTH]
+    if name in ("STATIC_IP", "STATIC_MASK", "STATIC_GATEWAY", "STATIC_DNS"):
+        if not inet_pton_ipv4(argument) and argument != "OFF":
+            return None
+        return argument
+    if name == "AUTH":
+        if argument not in AUTH_TYPES:
+            return None
+        return AUTH_TYPES.index(argument)
+    if name in ("READINGS", "SYSTEM"):
+        return True if argument == "CLEAR" else None
+    # ALARM is not modelled, emulated device has no actuators for SET
+    return None
+
+def parse_command(string):
+    '''
+    Mirrors parse_command(): table order prefix match, token has to be followed by terminator or
+    argument separator. Returns (name, argument), argument None for command without it,
+    or None if command is not recognised
+    '''
+    if len(string) > constants.COMMAND_MAX_LENGTH or not string.endswith(constants.COMMAND_TERMINATOR):
+        # device would overflow command_string[COMMAND_MAX_LENGTH], emulator rejects it
+        return None
+
+    for name in COMMAND_TABLE:
+        if not string.startswith(name):
+            continue
+        separator = string[len(name)]
+        if separator == constants.COMMAND_TERMINATOR:
+            return (name, None)
+        if separator == constants.COMMAND_ARGUMENT_SEPARATOR:
+            argument = parse_argument(name, string[len(name) + 1:-1])
+            if argument is not None:
+                return (name, argument)
+
+    return None
+
+
+class VirtualClock(object):
+    '''
+    Virtual seconds since start, running 'speed' times faster than wall clock
+    '''
+    def __init__(self, speed = 1.0):
+        self.speed = float(speed)
+        self.start = time.time()
+        self.offset = 0.0
+
+    def now(self):
+        return self.offset + (time.time() - self.start) * self.speed
+
+    def advance(self, seconds):
+        self.offset += seconds
+
+    def real_delay(self, virtual_time):
+        return max(0.0, (virtual_time - self.now()) / self.speed)
+
+
+class RingBuffer(object):
+    '''
+    circular_buffer_t: wrap=True drops oldest element when full, wrap=False rejects new one
+    '''
+    def __init__(self, size, wrap):
+        self.size = size
+        self.wrap = wrap
+        self.items = []
+
+    def add(self, item):
+        if len(self.items) == self.size:
+            if not self.wrap:
+                return False
+            self.items.pop(0)
+        self.items.append(item)
+        return True
+
+    def full(self):
+        return len(self.items) == self.size
+
+    def remove(self, count):
+        del self.items[:count]
+
+    def clear(self):
+        del self.items[:]
+
+    def __len__(self):
+        return len(self.items)
+
+
+class Emulator(object):
+    def __init__(self, index = 0, speed = 1.0, networks = None, movement_period = None, device_id = None, seed = None):
+        '''
+        networks: {ssid: (auth, password)} of access points device can connect to,
+                  default is constants.SSID/AUTH/PASS
+        movement_period: virtual seconds between simulated movements, None for no movement
+        '''
+        self.index = index
+        self.clock = VirtualClock(speed)
+        self.networks = networks if networks is not None else {constants.SSID: (constants.AUTH, constants.PASS)}
+        self.movement_period = movement_period
+        self.random = random.Random(index if seed is None else seed)
+
+        self.device_id = device_id if device_id is not None else "EMU%013d" %index
+        self.signature = constants.SIGNATURE
+        self.mac = "%012X" %(0x0013A2000000 + index)
+
+        self.readings = RingBuffer(constants.SENSOR_READINGS_BUFFER_SIZE, False)
+        self.system = RingBuffer(constants.SYSTEM_BUFFER_SIZE, True)
+
+        self.lock = threading.RLock()
+        self.events = []
+        self.sequence = 0
+        self.current_time = None
+        self.running = False
+        self.thread = None
+        self.master = None
+        self.slave = None
+        self.port = None
+        self.wakeup = None
+
+        self.power_on()
+
+    # ------------------------------------------------------------------ configuration
+
+    def power_on(self):
+        self.rtc_base = 0
+        self.system_heartbeat = constants.DEFAULT_SYSTEM_HEARTBEAT
+        self.atmo_status = True
+        self.movement_status = False
+        self.location = False
+        self.ssl = True
+        self.hostname = constants.HOSTNAME
+        self.server_port = int(constants.PORT)
+        self.wifi_ssid = ''
+        self.wifi_password = ''
+        self.wifi_auth_type = 0
+        self.wifi_static_ip = ''
+        self.wifi_static_mask = ''
+        self.wifi_static_gateway = ''
+        self.wifi_static_dns = ''
+        self.atmo_offset = [0.0, 0.0, 0.0]
+        # same layout as firmware, flags of first write are at [3..5]
+        self.atmo_offset_factory = [0.0] * 6
+        self.readings.clear()
+        self.system.clear()
+        self.init()
+
+    def init(self):
+        '''
+        wolksensor init() on reset: configuration and buffers are kept
+        '''
+        self.state = 'IDLE'
+        self.phase = None
+        self.pending_acquire = False
+        self.pending_exchange = False
+        self.current_heartbeat = 0
+        self.heartbeat_timer = 0
+        self.no_connection_count = 0
+        self.no_connection_heartbeat = self.system_heartbeat
+        self.usb = True
+        self.command_string = ''
+        self.generation = getattr(self, 'generation', 0) + 1
+
+    # ------------------------------------------------------------------ pty and event loop
+
+    def start(self):
+        '''
+        Opens pty and starts emulator thread. Returns port name for open_serial
+        '''
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        # nobody reading the port must not block emulator, data is lost as on unread UART
+        import fcntl
+        fcntl.fcntl(self.master, fcntl.F_SETFL, fcntl.fcntl(self.master, fcntl.F_GETFL) | os.O_NONBLOCK)
+        self.port = os.ttyname(self.slave)
+        self.wakeup = os.pipe()
+
+        with self.lock:
+            self.start_timers()
+            self.enter_idle()
+            self.acquire()
+
+        self.running = True
+        self.thread = threading.Thread(target = self.run)
+        self.thread.daemon = True
+        self.thread.start()
+        return self.port
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            os.write(self.wakeup[1], 'x')
+            self.thread.join()
+        for fd in (self.master, self.slave) + tuple(self.wakeup or ()):
+            if fd is not None:
+                os.close(fd)
+        self.master = self.slave = self.wakeup = None
+
+    def run(self):
+        while self.running:
+            with self.lock:
+                timeout = MAX_IDLE
+                if self.events:
+                    timeout = min(timeout, self.clock.real_delay(self.events[0][0]))
+
+            readable = select.select([self.master, self.wakeup[0]], [], [], timeout)[0]
+            if self.wakeup[0] in readable:
+                os.read(self.wakeup[0], 512)
+            if self.master in readable:
+                try:
+                    data = os.read(self.master, 1024)
+                except OSError:
+                    data = ''
+                if data:
+                    with self.lock:
+                        self.receive(data)
+
+            with self.lock:
+                self.run_due_events()
+
+    def advance(self, seconds):
+        '''
+        Fast-forwards virtual time, everything scheduled in between is executed before return
+        '''
+        with self.lock:
+            self.clock.advance(seconds)
+            self.run_due_events()
+        if self.wakeup:
+            os.write(self.wakeup[1], 'x')
+
+    def time(self):
+        return self.current_time if self.current_time is not None else self.clock.now()
+
+    def rtc(self):
+        return int(self.rtc_base + self.time()) & ULONG_MAX
+
+    def schedule(self, delay, function):
+        self.sequence += 1
+        heapq.heappush(self.events, (self.time() + delay, self.sequence, function))
+
+    def schedule_once(self, delay, function):
+        '''
+        Event which is dropped if device is reset before it fires
+        '''
+        generation = self.generation
+        def event():
+            if generation == self.generation:
+                function()
+        self.schedule(delay, event)
+
+    def run_due_events(self):
+        now = self.clock.now()
+        while self.events and self.events[0][0] <= now:
+            self.current_time, sequence, function = heapq.heappop(self.events)
+            function()
+        self.current_time = None
+
+    def write(self, string):
+        if self.master is None:
+            return
+        try:
+            os.write(self.master, string)
+        except OSError as e:
+            if e.errno not in (errno.EAGAIN, errno.EIO):
+                raise
+
+    # ------------------------------------------------------------------ timers
+
+    def start_timers(self):
+        self.start_heartbeat(self.system_heartbeat)
+        self.schedule(constants.ACQUISITION_PERIOD, self.minute_expired)
+        if self.movement_period:
+            self.schedule(self.movement_period, self.periodic_movement)
+
+    def minute_expired(self):
+        self.schedule(constants.ACQUISITION_PERIOD, self.minute_expired)
+        self.acquire()
+
+        if self.current_heartbeat:
+            self.heartbeat_timer += 1
+            if self.heartbeat_timer == self.current_heartbeat:
+                self.heartbeat_timer = 0
+                self.exchange_data()
+
+    def start_heartbeat(self, period):
+        if self.current_heartbeat != period:
+            if self.heartbeat_timer != 0 and period:
+                self.heartbeat_timer = period - self.heartbeat_timer % period
+            self.current_heartbeat = period
+
+    def periodic_movement(self):
+        self.schedule(self.movement_period, self.periodic_movement)
+        self.move()
+
+    # ------------------------------------------------------------------ state machine
+
+    def enter_idle(self):
+        self.state = 'IDLE'
+        self.phase = None
+        self.write("STATUS IDLE;")
+
+        if self.pending_acquire:
+            self.pending_acquire = False
+            self.acquire()
+        if self.pending_exchange:
+            self.pending_exchange = False
+            self.exchange_data()
+
+    def acquire(self):
+        if self.state != 'IDLE':
+            self.pending_acquire = True
+            return
+        if not self.atmo_status or self.readings.full():
+            return
+
+        self.write("STATUS ACQUISITION;")
+        values = {'P': 1013.0 + self.random.uniform(-5, 5) + self.atmo_offset[1],
+                  'T': 23.0 + self.random.uniform(-1, 1) + self.atmo_offset[0],
+                  'H': 45.0 + self.random.uniform(-5, 5) + self.atmo_offset[2]}
+        self.readings.add((self.rtc(), values))
+        self.enter_idle()
+
+    def move(self):
+        '''
+        Movement detected by accelerometer, stored as M:1.0 and sounded as alarm
+        '''
+        with self.lock:
+            if not self.movement_status:
+                return
+            self.readings.add((self.rtc(), {'M': 1.0}))
+            self.exchange_data()
+
+    def exchange_data(self):
+        if self.state != 'IDLE':
+            self.pending_exchange = True
+            return
+
+        self.state = 'DATA_EXCHANGE'
+        self.sent_readings = len(self.readings)
+        self.sent_system_items = len(self.system)
+        self.connection_times = {}
+        self.run_phases(self.connection_plan())
+
+    def connection_plan(self):
+        '''
+        List of (status, virtual duration, error) phases of connection sequence
+        '''
+        if not self.wifi_ssid:
+            return [(None, 0, WIFI_PARAMETERS_MISSING)]
+
+        network = self.networks.get(self.wifi_ssid)
+        auth = AUTH_TYPES[self.wifi_auth_type]
+        if network is None or network[0] != auth or (auth != "NONE" and network[1] != self.wifi_password):
+            return [("CONNECTING_TO_AP", WIFI_CONNECTING_TIMEOUT, WIFI_TIMEOUT)]
+
+        plan = [("CONNECTING_TO_AP", self.random.randint(1, 4), WIFI_SUCCESS)]
+        if self.wifi_static_ip == '0.0.0.0':
+            plan.append(("ACQUIRING_IP_ADDRESS", WIFI_CONNECTING_TIMEOUT, WIFI_TIMEOUT))
+            return plan
+
+        plan.append(("ACQUIRING_IP_ADDRESS", 1 if self.wifi_static_ip else self.random.randint(1, 3), WIFI_SUCCESS))
+        plan.append(("SEND", self.random.randint(1, 3), WIFI_SUCCESS))
+        plan.append(("RECEIVE", 1, WIFI_SUCCESS))
+        return plan
+
+    def run_phases(self, plan):
+        if not plan:
+            self.disconnect(WIFI_SUCCESS)
+            return
+
+        status, duration, error = plan[0]
+        self.phase = status
+        if status in ("CONNECTING_TO_AP", "ACQUIRING_IP_ADDRESS"):
+            self.write("STATUS %s;" %status)
+
+        def done():
+            if status:
+                self.connection_times[PHASES[status][0]] = duration
+            if error != WIFI_SUCCESS:
+                self.disconnect(error)
+            else:
+                self.run_phases(plan[1:])
+
+        self.schedule_once(duration, done)
+
+    def disconnect(self, error):
+        self.phase = "DISCONNECTING"
+        self.write("STATUS DISCONNECTING;")
+
+        def done():
+            self.connection_times['L'] = 1
+            self.leave_data_exchange(error)
+
+        self.schedule_once(1, done)
+
+    def leave_data_exchange(self, error):
+        if error == WIFI_SUCCESS:
+            self.readings.remove(self.sent_readings)
+            self.system.remove(self.sent_system_items)
+
+        self.system.add(self.system_item(error))
+
+        if error == WIFI_SUCCESS:
+            self.no_connection_count = 0
+            self.no_connection_heartbeat = self.system_heartbeat
+            self.start_heartbeat(self.system_heartbeat)
+        else:
+            self.write("STATUS ERROR:" + self.communication_error(error) + ";")
+            self.adjust_heartbeat_on_error()
+
+        self.enter_idle()
+
+    def adjust_heartbeat_on_error(self):
+        if self.usb:
+            self.start_heartbeat(self.system_heartbeat)
+            return
+
+        if self.no_connection_count == 0:
+            self.no_connection_heartbeat = self.system_heartbeat
+        self.no_connection_count += 1
+
+        if self.no_connection_count % 2 == 0 and self.no_connection_heartbeat < constants.MAX_NO_CONNECTION_HEARTBEAT:
+            self.no_connection_heartbeat = min(self.no_connection_heartbeat * 2, constants.MAX_NO_CONNECTION_HEARTBEAT)
+            self.start_heartbeat(self.no_connection_heartbeat)
+
+    def communication_error(self, error):
+        return "%01X%01X%02X" %(COMMUNICATION_PROTOCOL_DATA, COMMUNICATION_MODULE_WIFI, error)
+
+    def system_item(self, error):
+        item = "R:%lu" %self.rtc()
+        if error != WIFI_SUCCESS:
+            item += ",E:%01X%01X%02X" %(COMMUNICATION_PROTOCOL_DATA, COMMUNICATION_MODULE_WIFI, error)
+        # zero times are omitted by firmware
+        for key in "ADSQL":
+            if self.connection_times.get(key):
+                item += ",%s:%u" %(key, self.connection_times[key])
+        if self.connection_times:
+            item += ",C:%u" %sum(self.connection_times.values())
+        return item + ",B:%u,V:%s" %(BATTERY_VOLTAGE, constants.FIRMWARE_VERSION)
+
+    def reset(self):
+        self.init()
+        self.write("STATUS IDLE;")
+        self.start_heartbeat(self.system_heartbeat)
+        self.acquire()
+
+    # ------------------------------------------------------------------ commands
+
+    def receive(self, data):
+        self.command_string = (self.command_string + data)[-constants.COMMAND_STRING_BUFFER_SIZE:]
+        while constants.COMMAND_TERMINATOR in self.command_string:
+            string, self.command_string = self.command_string.split(constants.COMMAND_TERMINATOR, 1)
+            self.write(self.execute(string + constants.COMMAND_TERMINATOR))
+
+    def execute(self, string):
+        command = parse_command(string)
+        if command is None:
+            return constants.BAD_REQUEST
+
+        name, argument = command
+        if self.state != 'IDLE' and (argument is not None or name == "RELOAD"):
+            return constants.BUSY
+
+        return getattr(self, "cmd_" + name.lower())(argument)
+
+    def cmd_mac(self, argument):
+        return "MAC %s;" %self.mac
+
+    def cmd_now(self, argument):
+        # exchange starts after DONE is sent
+        self.schedule_once(0, self.exchange_data)
+        return constants.DONE
+
+    def cmd_reload(self, argument):
+        self.schedule_once(RESET_TIME, self.reset)
+        return constants.DONE
+
+    def cmd_heartbeat(self, argument):
+        if argument is not None and argument != self.system_heartbeat:
+            if argument > constants.MAX_NO_CONNECTION_HEARTBEAT:
+                return constants.BAD_REQUEST
+            self.system_heartbeat = argument
+            self.start_heartbeat(argument)
+        return "HEARTBEAT %u;" %self.system_heartbeat
+
+    def cmd_rtc(self, argument):
+        if argument is not None:
+            self.rtc_base = argument - int(self.time())
+        return "RTC %lu;" %self.rtc()
+
+    def cmd_version(self, argument):
+        return "VERSION %s;" %constants.FIRMWARE_VERSION
+
+    def cmd_status(self, argument):
+        if self.state == 'DATA_EXCHANGE':
+            return "STATUS %s;" %PHASES.get(self.phase, (None, "STARTED-DISCONNECTED"))[1]
+        return "STATUS IDLE;"
+
+    def cmd_readings(self, argument):
+        if argument:
+            self.readings.clear()
+        items = []
+        for timestamp, values in self.readings.items:
+            items.append("R:%lu," %timestamp + "".join("%s:%.1f," %(sensor, values[sensor]) for sensor in SENSORS if sensor in values))
+        return "READINGS " + "|".join(item[:-1] for item in items) + ";" if items else "READINGS;"
+
+    def cmd_system(self, argument):
+        if argument:
+            self.system.clear()
+        return "SYSTEM " + "|".join(self.system.items) + ";" if len(self.system) else "SYSTEM;"
+
+    def cmd_id(self, argument):
+        if argument is not None:
+            if self.device_id:
+                return constants.BAD_REQUEST
+            self.device_id = argument
+        return "ID %s;" %self.device_id
+
+    def cmd_signature(self, argument):
+        if argument is not None:
+            if self.signature:
+                return constants.BAD_REQUEST
+            self.signature = argument
+        return "SIGNATURE %s;" %("****" if self.signature else "")
+
+    def cmd_url(self, argument):
+        if argument is not None:
+            if len(argument) > constants.MAX_HOSTNAME_SIZE:
+                return constants.BAD_REQUEST
+            self.hostname = argument
+        return "URL %s;" %self.hostname
+
+    def cmd_port(self, argument):
+        if argument is not None:
+            if argument > constants.MAX_PORT_NUMBER:
+                return constants.BAD_REQUEST
+            self.server_port = argument
+        return "PORT %u;" %self.server_port
+
+    def cmd_ssid(self, argument):
+        if argument is not None:
+            if argument == "NULL":
+                argument = ''
+            elif len(argument) > constants.MAX_WIFI_SSID_SIZE:
+                return constants.BAD_REQUEST
+            self.wifi_ssid = argument
+        return "SSID %s;" %self.wifi_ssid
+
+    def cmd_pass(self, argument):
+        if argument is not None:
+            if argument == "NULL":
+                argument = ''
+            elif len(argument) > constants.MAX_WIFI_PASSWORD_SIZE:
+                return constants.BAD_REQUEST
+            elif AUTH_TYPES[self.wifi_auth_type] == "WEP" and \
+            (not constants.MIN_WIFI_PASSWORD_SIZE_WEP <= len(argument) <= constants.MAX_WIFI_PASSWORD_SIZE_WEP or not is_string_hex(argument)):
+                return constants.BAD_REQUEST
+            self.wifi_password = argument
+        return "PASS %s;" %self.wifi_password
+
+    def cmd_auth(self, argument):
+        if argument is not None:
+            self.wifi_auth_type = argument
+        return "AUTH %s;" %AUTH_TYPES[self.wifi_auth_type]
+
+    def cmd_movement(self, argument):
+        if argument is not None:
+            self.movement_status = argument
+        return "MOVEMENT %s;" %("ON" if self.movement_status else "OFF")
+
+    def cmd_atmo(self, argument):
+        if argument is not None:
+            self.atmo_status = argument
+        return "ATMO %s;" %("ON" if self.atmo_status else "OFF")
+
+    def cmd_static_ip(self, argument):
+        if argument == "OFF":
+            self.wifi_static_ip = self.wifi_static_mask = self.wifi_static_gateway = self.wifi_static_dns = ''
+        elif argument is not None:
+            self.wifi_static_ip = argument
+        return "STATIC_IP %s;" %(self.wifi_static_ip or "OFF")
+
+    def cmd_static_mask(self, argument):
+        if argument is not None:
+            self.wifi_static_mask = argument
+        return "STATIC_MASK %s;" %self.wifi_static_mask
+
+    def cmd_static_gateway(self, argument):
+        if argument is not None:
+            self.wifi_static_gateway = argument
+        return "STATIC_GATEWAY %s;" %self.wifi_static_gateway
+
+    def cmd_static_dns(self, argument):
+        if argument is not None:
+            self.wifi_static_dns = argument
+        return "STATIC_DNS %s;" %self.wifi_static_dns
+
+    def cmd_alarm(self, argument):
+        return "ALARM P:OFF,OFF|T:OFF,OFF|H:OFF,OFF|M:OFF,1;"
+
+    def cmd_set(self, argument):
+        return constants.DONE
+
+    def cmd_location(self, argument):
+        if argument is not None:
+            self.location = argument
+        return "LOCATION %s;" %("ON" if self.location else "OFF")
+
+    def cmd_ssl(self, argument):
+        if argument is not None:
+            self.ssl = argument
+        return "SSL %s;" %("ON" if self.ssl else "OFF")
+
+    def set_offset(self, index, factory_index, argument, minimum, maximum):
+        '''
+        index into atmo_offset (T, P, H), first written value becomes factory offset
+        '''
+        if argument is not None:
+            if argument > maximum or argument < minimum:
+                return False
+            if not self.atmo_offset_factory[index] and not self.atmo_offset_factory[factory_index]:
+                self.atmo_offset_factory[factory_index] = 1
+                self.atmo_offset_factory[index] = argument
+            self.atmo_offset[index] = argument
+        return True
+
+    def cmd_temp_offset(self, argument):
+        if not self.set_offset(0, 3, argument, constants.TEMPERATURE_OFFSET_MIN, constants.TEMPERATURE_OFFSET_MAX):
+            return constants.BAD_REQUEST
+        return "TEMP_OFFSET %.1f;" %self.atmo_offset[0]
+
+    def cmd_humidity_offset(self, argument):
+        if not self.set_offset(2, 4, argument, constants.HUMIDITY_OFFSET_MIN, constants.HUMIDITY_OFFSET_MAX):
+            return constants.BAD_REQUEST
+        return "HUMIDITY_OFFSET %.1f;" %self.atmo_offset[2]
+
+    def cmd_pressure_offset(self, argument):
+        if not self.set_offset(1, 5, argument, constants.PRESSURE_OFFSET_MIN, constants.PRESSURE_OFFSET_MAX):
+            return constants.BAD_REQUEST
+        return "PRESSURE_OFFSET %.1f;" %self.atmo_offset[1]
+
+    def cmd_offset_factory(self, argument):
+        if argument is not None:
+            if argument != "RESET":
+                return constants.BAD_REQUEST
+            self.atmo_offset = self.atmo_offset_factory[:3]
+            return "OFFSET_FACTORY RESET;"
+        return "OFFSET_FACTORY P:%.1f,T:%.1f,H:%.1f;" %(self.atmo_offset_factory[1], self.atmo_offset_factory[0], self.atmo_offset_factory[2])
+
+    def cmd_acquisition(self, argument):
+        # acquisition event is processed after response is sent
+        self.schedule_once(0, self.acquire)
+        return constants.DONE
+
+
+def start_emulators(count, **kwargs):
+    emulators = []
+    for index in range(count):
+        emulator = Emulator(index, **kwargs)
+        emulator.start()
+        emulators.append(emulator)
+    return emulators
+
+def main():
+    parser = argparse.ArgumentParser(description = "WolkSensor emulator on pseudo-terminals")
+    parser.add_argument('-n', '--count', type = int, default = 1, help = "number of emulated devices")
+    parser.add_argument('--speed', type = float, default = 1.0, help = "virtual seconds per wall clock second")
+    parser.add_argument('--movement', type = float, default = None, help = "virtual seconds between movements")
+    args = parser.parse_args()
+
+    emulators = start_emulators(args.count, speed = args.speed, movement_period = args.movement)
+    for emulator in emulators:
+        print emulator.port
+    sys.stdout.flush()
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for emulator in emulators:
+            emulator.stop()
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,201 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Content addressed cache of firmware images.
+       Images are kept under their SHA-256 digest with the firmware
+       version they report on VERSION request:
+
+           firmware_cache/index.json
+           firmware_cache/<sha256>.bin
+
+       Firmware reports only VERSION (FW_VERSION_MAJOR.MINOR.PATCH), it has
+       no command which returns digest of the running image. Device is
+       taken to run the exact image when it reports the version the image
+       was added with and no other cached image has the same version; two
+       builds with the same version can not be told apart, so the image is
+       flashed then.
+
+       Stations flashing the same image read it from one staged copy in
+       shared memory (/dev/shm where there is one), mapped read only, so
+       the image is read from disk once per rig and every station shares
+       the same pages.
+
+       python -m harness.firmware add bin/wolksensor_cc3100_sensors.bin 4.3.6
+       python -m harness.firmware list
+       python -m harness.firmware check COM3 bin/wolksensor_cc3100_sensors.bin
+'''
+#!/Python27/python
+import os
+import sys
+
+import hashlib
+import json
+import mmap
+import shutil
+import time
+import constants
+
+HASH_BLOCK = 1 << 20
+INDEX_FILE = 'index.json'
+SHARED_MEMORY = '/dev/shm'
+
+
+def digest(path):
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), ''):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+def replace(temporary, path):
+    # file is replaced at once, reader never sees part of it
+    if os.name == 'nt' and os.path.exists(path):
+        os.remove(path)
+    os.rename(temporary, path)
+
+def copy(source, path):
+    temporary = "%s.%d.tmp" %(path, os.getpid())
+    shutil.copyfile(source, temporary)
+    replace(temporary, path)
+
+
+class FirmwareCache(object):
+    def __init__(self, directory = constants.FIRMWARECACHE):
+        self.directory = directory
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def index(self):
+        '''
+        {digest: {'version', 'size', 'name', 'added'}}
+        '''
+        path = os.path.join(self.directory, INDEX_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def save_index(self, index):
+        path = os.path.join(self.directory, INDEX_FILE)
+        temporary = "%s.%d.tmp" %(path, os.getpid())
+        with open(temporary, 'w') as f:
+            json.dump(index, f, indent = 2, sort_keys = True)
+        replace(temporary, path)
+
+    def path(self, image_digest):
+        return os.path.join(self.directory, image_digest + '.bin')
+
+    def add(self, path, version):
+        '''
+        Returns digest of the image, image already in the cache is not copied again
+        '''
+        image_digest = digest(path)
+        if not os.path.exists(self.path(image_digest)):
+            copy(path, self.path(image_digest))
+        index = self.index()
+        index[image_digest] = {'version': version, 'size': os.path.getsize(path),
+                               'name': os.path.basename(path), 'added': time.time()}
+        self.save_index(index)
+        return image_digest
+
+    def find(self, path):
+        '''
+        Digest of image file when it is in the cache, None otherwise
+        '''
+        image_digest = digest(path)
+        return image_digest if image_digest in self.index() else None
+
+    def version(self, image_digest):
+        entry = self.index().get(image_digest)
+        return entry['version'] if entry else None
+
+    def needs_flash(self, image_digest, device_version):
+        '''
+        False only when device runs the image as far as VERSION can tell
+        '''
+        index = self.index()
+        if image_digest not in index or index[image_digest]['version'] != device_version:
+            return True
+        same_version = [other for other, entry in index.items() if entry['version'] == device_version]
+        return len(same_version) > 1
+
+    def stage(self, image_digest):
+        '''
+        Returns path of image copy in shared memory, cache path where there is no shared memory
+        '''
+        if not os.path.isdir(SHARED_MEMORY):
+            return self.path(image_digest)
+        staged = os.path.join(SHARED_MEMORY, 'wolksensor-%s.bin' %image_digest)
+        if not os.path.exists(staged) or os.path.getsize(staged) != os.path.getsize(self.path(image_digest)):
+            copy(self.path(image_digest), staged)
+        return staged
+
+    def image(self, image_digest):
+        '''
+        Read only map of staged image, pages are shared by every station mapping it
+        '''
+        with open(self.stage(image_digest), 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+
+
+def device_version():
+    '''
+    VERSION of device on open serial port, None when it does not answer
+    '''
+    from batch import send_batch
+    from codec import split
+    responses = send_batch([('VERSION', None)])[0]
+    try:
+        return split(responses[0])[1] if responses else None
+    except ValueError:
+        return None
+
+def flash_if_needed(cache, image_digest, flash):
+    '''
+    flash: function which writes the image (read only map) to the device and returns True on success.
+    Returns True when device runs the image, flashed or not
+    '''
+    import logging_device
+    version = device_version()
+    if not cache.needs_flash(image_digest, version):
+        logging_device.info("Device runs %s (%s), flashing skipped" %(version, image_digest[:12]))
+        return True
+
+    logging_device.info("Device runs %s, flashing %s (%s)" %(version, cache.version(image_digest), image_digest[:12]))
+    image = cache.image(image_digest)
+    try:
+        return flash(image)
+    finally:
+        image.close()
+
+def main():
+    cache = FirmwareCache()
+    if sys.argv[1:2] == ['add'] and len(sys.argv) == 4:
+        print "%s %s" %(cache.add(sys.argv[2], sys.argv[3]), sys.argv[3])
+    elif sys.argv[1:2] == ['list']:
+        for image_digest, entry in sorted(cache.index().items(), key = lambda item: item[1]['added']):
+            print "%s %-8s %8d %s" %(image_digest, entry['version'], entry['size'], entry['name'])
+    elif sys.argv[1:2] == ['check'] and len(sys.argv) == 4:
+        from serial_func import open_serial
+        from serial_func import close_serial
+        image_digest = cache.find(sys.argv[3])
+        if image_digest is None:
+            print "%s is not in the cache, add it with its version first" %sys.argv[3]
+            return 1
+        if open_serial(sys.argv[2]) != True:
+            print "Unable to open serial port %s" %sys.argv[2]
+            return 1
+        try:
+            version = device_version()
+        finally:
+            close_serial()
+        print "Device runs %s, %s" %(version, 'flashing needed' if cache.needs_flash(image_digest, version) else 'image already on it')
+    else:
+        print __doc__
+        return 1
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
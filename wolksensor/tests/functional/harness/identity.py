@@ -0,0 +1,237 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Device identity and blessing store.
+       Serial numbers (ID with its SIGNATURE) and the units they were given
+       to are kept in one SQLite file instead of constants.FILESERIALNUMBERS
+       and constants.FILEBLESSED, together with the firmware and suite
+       results of every run of every unit:
+
+           units - id (constants.IDLENGTH), signature, mac (constants.MACLENGTH),
+                   blessed time and station, one row per serial number
+           runs  - mac, id, firmware version, suite, result, station, time
+
+       ID and MAC are unique indexes, lookups do not scan. allocate() takes
+       first free serial number for MAC in one write transaction, so
+       stations sharing the file never hand out the same ID; MAC which
+       already got one gets the same one again.
+
+       Legacy CSV rows are 'ID,SIGNATURE' in the serial numbers file and
+       'ID,SIGNATURE,MAC' in the blessed devices file, rows which do not
+       start with ID of constants.IDLENGTH characters (headers) are skipped.
+
+       python -m harness.identity units.db --import-serials 0116WS10Series.csv --import-blessed BlessedDevices.csv
+       python -m harness.identity units.db --export-blessed BlessedDevices.csv
+       python -m harness.identity units.db --lookup 0013A2000001
+'''
+#!/Python27/python
+import sys
+
+import argparse
+import csv
+import sqlite3
+import time
+import constants
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS units (id TEXT PRIMARY KEY, signature TEXT NOT NULL, mac TEXT UNIQUE,
+                                  blessed REAL, station TEXT);
+CREATE TABLE IF NOT EXISTS runs (mac TEXT NOT NULL, id TEXT, firmware TEXT, suite TEXT, result INTEGER,
+                                 station TEXT, time REAL);
+CREATE INDEX IF NOT EXISTS runs_mac ON runs (mac);
+CREATE INDEX IF NOT EXISTS runs_id ON runs (id);
+'''
+
+LOCK_TIMEOUT = 30       # seconds station waits for another one's write transaction
+
+
+def valid_id(unit_id):
+    return len(unit_id) == constants.IDLENGTH
+
+def valid_mac(mac):
+    return len(mac) == constants.MACLENGTH
+
+def csv_rows(path):
+    with open(path, 'rb') as f:
+        for row in csv.reader(f):
+            row = [value.strip() for value in row]
+            if row and valid_id(row[0]):
+                yield row
+
+
+class IdentityStore(object):
+    def __init__(self, path):
+        self.path = path
+        # autocommit, transactions are started explicitly
+        self.connection = sqlite3.connect(path, timeout = LOCK_TIMEOUT, isolation_level = None)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.text_factory = str
+        # readers are not blocked by the station which writes
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def write(self, statements):
+        '''
+        Runs [(sql, parameters)] in one write transaction
+        '''
+        cursor = self.connection.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            for sql, parameters in statements:
+                cursor.execute(sql, parameters)
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+
+    def add_serials(self, serials):
+        '''
+        serials: [(id, signature)], serial numbers already in the store are kept. Returns number added
+        '''
+        before = self.count()
+        self.write(('INSERT OR IGNORE INTO units (id, signature) VALUES (?, ?)', serial) for serial in serials)
+        return self.count() - before
+
+    def allocate(self, mac, station = None):
+        '''
+        Returns (id, signature) given to MAC, None when there is no free serial number
+        '''
+        if not valid_mac(mac):
+            raise ValueError("Invalid MAC %r" %mac)
+        cursor = self.connection.cursor()
+        # write lock is taken before the free row is read, another station waits for it
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            row = cursor.execute('SELECT id, signature FROM units WHERE mac = ?', (mac,)).fetchone()
+            if row is None:
+                row = cursor.execute('SELECT id, signature FROM units WHERE mac IS NULL ORDER BY rowid LIMIT 1').fetchone()
+                if row is not None:
+                    cursor.execute('UPDATE units SET mac = ?, blessed = ?, station = ? WHERE id = ?',
+                                   (mac, time.time(), station, row['id']))
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+        return (row['id'], row['signature']) if row is not None else None
+
+    def bless(self, unit_id, signature, mac, station = None):
+        '''
+        Records ID written to the unit outside allocate(), e.g. legacy blessed devices
+        '''
+        self.write([('INSERT OR IGNORE INTO units (id, signature) VALUES (?, ?)', (unit_id, signature)),
+                    ('UPDATE units SET mac = ?, blessed = ?, station = ? WHERE id = ?', (mac, time.time(), station, unit_id))])
+
+    def unit(self, unit_id = None, mac = None):
+        '''
+        Row of the unit as dict, looked up by ID or MAC. None when there is none
+        '''
+        if unit_id is not None:
+            row = self.connection.execute('SELECT * FROM units WHERE id = ?', (unit_id,)).fetchone()
+        else:
+            row = self.connection.execute('SELECT * FROM units WHERE mac = ?', (mac,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def count(self, free = False):
+        sql = 'SELECT COUNT(*) FROM units' + (' WHERE mac IS NULL' if free else '')
+        return self.connection.execute(sql).fetchone()[0]
+
+    def record_run(self, mac, unit_id, firmware, results, station = None):
+        '''
+        results: [(suite, result)] of one run
+        '''
+        now = time.time()
+        self.write(('INSERT INTO runs (mac, id, firmware, suite, result, station, time) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (mac, unit_id or None, firmware, suite, int(bool(result)), station, now)) for suite, result in results)
+
+    def runs(self, mac):
+        return [dict(row) for row in self.connection.execute('SELECT * FROM runs WHERE mac = ? ORDER BY time', (mac,))]
+
+    def import_serials(self, path):
+        return self.add_serials((row[0], row[1]) for row in csv_rows(path) if len(row) > 1)
+
+    def import_blessed(self, path):
+        '''
+        Rows with MAC which is already blessed with another ID are skipped, their ID is not added
+        as a free serial number. Returns (number of units blessed, [(id, mac)] of skipped rows)
+        '''
+        before = self.count() - self.count(free = True)
+        rows = [row for row in csv_rows(path) if len(row) > 2 and valid_mac(row[2])]
+        statements = []
+        now = time.time()
+        for row in rows:
+            statements.append(('INSERT OR IGNORE INTO units (id, signature) SELECT ?, ? '
+                               'WHERE NOT EXISTS (SELECT 1 FROM units WHERE mac = ?)', (row[0], row[1], row[2])))
+            statements.append(('UPDATE OR IGNORE units SET mac = ?, blessed = ? WHERE id = ? AND mac IS NULL', (row[2], now, row[0])))
+        self.write(statements)
+        skipped = [(row[0], row[2]) for row in rows if (self.unit(unit_id = row[0]) or {}).get('mac') != row[2]]
+        return self.count() - self.count(free = True) - before, skipped
+
+    def export_serials(self, path):
+        '''
+        Serial numbers which were not given to any unit
+        '''
+        with open(path, 'wb') as f:
+            writer = csv.writer(f)
+            for row in self.connection.execute('SELECT id, signature FROM units WHERE mac IS NULL ORDER BY rowid'):
+                writer.writerow([row['id'], row['signature']])
+
+    def export_blessed(self, path):
+        with open(path, 'wb') as f:
+            writer = csv.writer(f)
+            for row in self.connection.execute('SELECT id, signature, mac FROM units WHERE mac IS NOT NULL ORDER BY blessed'):
+                writer.writerow([row['id'], row['signature'], row['mac']])
+
+
+def identify():
+    '''
+    Reads (MAC, ID, VERSION) of the device on the open serial port, ID is '' for unit which is not blessed
+    '''
+    from batch import send_batch
+    from codec import split
+    values = []
+    for responses in send_batch([('MAC', None), ('ID', None), ('VERSION', None)]):
+        try:
+            values.append(split(responses[0])[1] if responses else None)
+        except ValueError:
+            values.append(None)
+    return tuple(values)
+
+def main():
+    parser = argparse.ArgumentParser(description = "WolkSensor identity store")
+    parser.add_argument('store', help = "SQLite file, created when it does not exist")
+    parser.add_argument('--import-serials', help = "CSV of serial numbers, ID,SIGNATURE")
+    parser.add_argument('--import-blessed', help = "CSV of blessed devices, ID,SIGNATURE,MAC")
+    parser.add_argument('--export-serials', help = "CSV of serial numbers not given to any unit")
+    parser.add_argument('--export-blessed', help = "CSV of blessed devices")
+    parser.add_argument('--lookup', help = "unit and its runs by ID or MAC")
+    arguments = parser.parse_args()
+
+    store = IdentityStore(arguments.store)
+    if arguments.import_serials:
+        print "%d serial number(s) imported" %store.import_serials(arguments.import_serials)
+    if arguments.import_blessed:
+        blessed, skipped = store.import_blessed(arguments.import_blessed)
+        print "%d blessed device(s) imported" %blessed
+        for unit_id, mac in skipped:
+            print " skipped %s %s, ID or MAC is blessed with another unit" %(unit_id, mac)
+    if arguments.export_serials:
+        store.export_serials(arguments.export_serials)
+    if arguments.export_blessed:
+        store.export_blessed(arguments.export_blessed)
+    if arguments.lookup:
+        unit = store.unit(unit_id = arguments.lookup) or store.unit(mac = arguments.lookup)
+        mac = unit['mac'] if unit else arguments.lookup
+        print unit
+        for run in store.runs(mac):
+            print " %s %-8s %-14s %s" %(time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run['time'])), run['firmware'],
+                                        run['suite'], 'PASS' if run['result'] else 'FAIL')
+    print "%d unit(s), %d free serial number(s)" %(store.count(), store.count(free = True))
+    store.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,589 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: MQTT load generation with virtual WolkSensor devices.
+       Every virtual sensor keeps readings buffer (150, new readings are
+       rejected when full) and system buffer (60, oldest item is dropped),
+       acquires a reading every virtual minute while ATMO is ON, and on
+       heartbeat or movement goes through the connection cycle of
+       SDK/core/mqtt_communication_protocol.c on its own TCP connection:
+
+           CONNECT (will/<id>/001, username <id>, keep alive 60) - CONNACK
+           SUBSCRIBE config/<id> - SUBACK
+           PUBLISH sensors/<id> - PUBLISH on config/<id> within 3 seconds,
+                                  PINGREQ - PINGRESP when there is none
+           DISCONNECT
+
+       Payload is built like state_mqtt_publish(): append_rtc(),
+       append_system_info() and append_sensor_readings() into message buffer
+       of MQTT_BUFFER_SIZE less PUBLISH header, items which do not fit stay
+       for next publish. Sent readings and system items are removed only
+       when commands are received on config/<id>, as wolksensor.c does, so
+       Platform client publishes ACKNOWLEDGEMENT for every payload it
+       receives on sensors/#. Payload is not encrypted, it is the plain text
+       which goes over SSL. Values are kept as float (float32 on AVR) with
+       one decimal, so '%.1f' never rounds half way value.
+
+       Heartbeat and movement run on virtual time, 'speed' times faster
+       than wall clock; connection cycles run in real time against the
+       broker. Two failed connections in a row double the heartbeat up to
+       MAX_NO_CONNECTION_HEARTBEAT and successful one restores it, like
+       adjust_heartbeat_on_error(). Movements come in bursts: 'burst'
+       movements 'burst_spacing' virtual seconds apart, bursts are
+       'movement_interval' virtual minutes apart on average.
+
+       Each sent payload is recorded as (topic, CRC-32 of payload, connect
+       time, publish time) and each payload Platform receives as (topic,
+       CRC-32, receive time); summarize() pairs them for end-to-end latency.
+'''
+import hashlib
+import random
+import struct
+import time
+import zlib
+import constants
+
+from codec import Record
+from streaming import percentile
+from mqtt import CONNACK
+from mqtt import Connection
+from mqtt import Loop
+from mqtt import PINGRESP
+from mqtt import PUBLISH
+from mqtt import SUBACK
+from mqtt import connect_packet
+from mqtt import disconnect_packet
+from mqtt import parse_publish
+from mqtt import pingreq_packet
+from mqtt import publish_packet
+from mqtt import standard_publish_packet
+from mqtt import subscribe_packet
+
+MINUTE = 60
+SENSORS = ['P', 'T', 'H', 'M']          # sensors[] order of main.c
+
+MAX_BUFFER_SIZE = 768                   # platform_specific.h
+MAX_DEVICE_ID_SIZE = 30                 # config.h
+MQTT_BUFFER_SIZE = MAX_BUFFER_SIZE + 3 + MAX_DEVICE_ID_SIZE + 2
+MQTT_MAX_FIXED_HEADER_SIZE = 3
+MQTT_PACKAGE_ID_LENGTH = 2
+MQTT_KEEP_ALIVE_PERIOD = 60
+WILL_MESSAGE = "Connection break with WolkSensor"
+SUBSCRIBE_MESSAGE_ID = 1                # mqttlib_init() on every connect starts message ids from 1
+RECEIVE_TIMEOUT = 3                     # tcp_communication_module.c
+CONNECT_TIMEOUT = 20                    # wifi_communication_module.c
+ACKNOWLEDGEMENT = 'STATUS;'             # read command, device configuration is not changed
+BATTERY_VOLTAGE = 3000
+
+# system.h
+COMMUNICATION_PROTOCOL_DATA = 1
+COMMUNICATION_PROTOCOL_MQTT = 0
+COMMUNICATION_MODULE_WIFI = 0
+WIFI_OPERATION_FAILED = 0x40
+WIFI_SOCKET_CLOSED = 0x60
+ERROR_RECEIVING_MQTT_MESSAGE = 0x20
+ERROR_INCORRECT_MQTT_MESSAGE_RECEIVED = 0x30
+STATE_MQTT_RECEIVE_CONNACK = 3          # mqtt_communication_protocol_states_t
+STATE_MQTT_RECEIVE_SUBACK = 5
+STATE_MQTT_RECEIVE_PINGRESP = 15
+
+PLATFORM_ID = 'wolksensor-load-platform'
+
+
+def float32(value):
+    return struct.unpack('f', struct.pack('f', value))[0]
+
+def mqtt_error(error, state):
+    return "%01X%02X" %(COMMUNICATION_PROTOCOL_MQTT, error | state)
+
+def module_error(error):
+    return "%01X%02X" %(COMMUNICATION_MODULE_WIFI, error)
+
+
+class MessageBuffer(object):
+    '''
+    circular_buffer_t without wrap, array which does not fit is not added at all
+    '''
+    def __init__(self, size):
+        self.size = size
+        self.data = ''
+
+    def add_array(self, string):
+        if len(string) > self.size - len(self.data):
+            return False
+        self.data += string
+        return True
+
+    def add(self, character):
+        return self.add_array(character)
+
+    def drop_from_end(self, count):
+        self.data = self.data[:len(self.data) - count]
+
+
+def serialize_sensor_reading(timestamp, values):
+    '''
+    values: {sensor id: value}, last ',' is overwritten with '|'
+    '''
+    item = "R:%lu," %timestamp + ''.join("%c:%.1f," %(sensor, values[sensor]) for sensor in SENSORS if sensor in values)
+    return item[:-1] + '|'
+
+def append_rtc(rtc, message_buffer):
+    message_buffer.add_array("RTC %lu;" %rtc)
+
+def append_detected_wifi_networks(networks, message_buffer):
+    '''
+    networks: [(bssid bytes, rssi)], header without ';' is left when there are none
+    '''
+    message_buffer.add_array("READINGS ")
+    for index, (bssid, rssi) in enumerate(networks):
+        message_buffer.add_array("MAC:%s,RSSI:%d%c" %(''.join("%02X" %ord(byte) for byte in bssid), rssi,
+                                                      ';' if index == len(networks) - 1 else '|'))
+
+def append_system_info(system_items, message_buffer):
+    '''
+    system_items: serialized items. Returns number of items which fit
+    '''
+    if not message_buffer.add_array("SYSTEM "):
+        return 0
+    serialized = 0
+    for item in system_items:
+        if not message_buffer.add_array(item):
+            break
+        serialized += 1
+        message_buffer.add('|')
+    message_buffer.drop_from_end(1)
+    message_buffer.add(';')
+    return serialized
+
+def append_sensor_readings(readings, message_buffer):
+    '''
+    readings: [(timestamp, values)]. Returns number of readings which fit
+    '''
+    if not message_buffer.add_array("READINGS "):
+        return 0
+    serialized = 0
+    for timestamp, values in readings:
+        if not message_buffer.add_array(serialize_sensor_reading(timestamp, values)):
+            break
+        serialized += 1
+    message_buffer.drop_from_end(1)
+    message_buffer.add(';')
+    return serialized
+
+def sensors_topic(device_id):
+    return "sensors/%s" %device_id
+
+def publish_payload(device_id, rtc, system_items, readings, networks = None):
+    '''
+    Returns (payload, system items sent, readings sent)
+    '''
+    header_size = MQTT_MAX_FIXED_HEADER_SIZE + len(sensors_topic(device_id)) + MQTT_PACKAGE_ID_LENGTH
+    message_buffer = MessageBuffer(MQTT_BUFFER_SIZE - header_size)
+    append_rtc(rtc, message_buffer)
+    if networks is not None:
+        append_detected_wifi_networks(networks, message_buffer)
+    sent_system_items = append_system_info(system_items, message_buffer)
+    sent_readings = append_sensor_readings(readings, message_buffer)
+    return message_buffer.data, sent_system_items, sent_readings
+
+def payload_key(topic, payload):
+    return topic, zlib.crc32(payload) & 0xFFFFFFFF
+
+
+class LoadProfile(Record):
+    '''
+    heartbeat and movement_interval in minutes, burst_spacing in seconds, all virtual.
+    movement_interval None turns MOVEMENT OFF
+    '''
+    __slots__ = ('heartbeat', 'movement_interval', 'burst', 'burst_spacing', 'atmo', 'speed', 'timeout')
+
+
+DEFAULT_PROFILE = LoadProfile(constants.DEFAULT_SYSTEM_HEARTBEAT, None, 1, 10, True, 1.0, RECEIVE_TIMEOUT)
+
+
+class VirtualSensor(Connection):
+    def __init__(self, generator, index):
+        Connection.__init__(self, generator.loop)
+        self.generator = generator
+        self.profile = generator.profile
+        self.random = generator.random
+        self.device_id = "LOAD%012d" %index
+        self.key = hashlib.md5(self.device_id).hexdigest()[:16]
+        self.topic = sensors_topic(self.device_id)
+
+        self.readings = []
+        self.system = []
+        self.acquisition_phase = generator.virtual_now() - self.random.uniform(0, MINUTE)
+        self.acquired = self.acquisition_minute(generator.virtual_now())
+
+        self.heartbeat = self.profile.heartbeat
+        self.no_connection_count = 0
+        self.no_connection_heartbeat = self.heartbeat
+        self.heartbeat_timer = None
+
+        self.state = None
+        self.timer = None
+        self.busy = False
+        self.pending = False
+        self.times = {}
+        self.sent = (0, 0)
+
+    # ------------------------------------------------------------------ virtual time
+
+    def acquisition_minute(self, now):
+        return int((now - self.acquisition_phase) // MINUTE)
+
+    def acquire_until(self, now):
+        minute = self.acquisition_minute(now)
+        if self.profile.atmo:
+            for acquisition in range(self.acquired + 1, minute + 1):
+                if len(self.readings) >= constants.SENSOR_READINGS_BUFFER_SIZE:
+                    self.generator.stats['lost_readings'] += minute - acquisition + 1
+                    break
+                self.readings.append((int(self.acquisition_phase + acquisition * MINUTE), self.generator.values()))
+        self.acquired = max(self.acquired, minute)
+
+    def start(self):
+        self.start_heartbeat(self.heartbeat, self.random.uniform(0, self.heartbeat))
+        if self.profile.movement_interval:
+            self.schedule_burst()
+
+    def start_heartbeat(self, period, first = None):
+        Loop.cancel(self.heartbeat_timer)
+        self.heartbeat = period
+        minutes = period if first is None else first
+        self.heartbeat_timer = self.generator.call_virtual(minutes * MINUTE, self.heartbeat_expired)
+
+    def heartbeat_expired(self):
+        self.heartbeat_timer = self.generator.call_virtual(self.heartbeat * MINUTE, self.heartbeat_expired)
+        self.exchange()
+
+    def schedule_burst(self):
+        delay = self.random.expovariate(1.0 / self.profile.movement_interval) * MINUTE
+        for movement in range(self.profile.burst):
+            self.generator.call_virtual(delay + movement * self.profile.burst_spacing, self.move)
+        self.generator.call_virtual(delay + (self.profile.burst - 1) * self.profile.burst_spacing, self.schedule_burst)
+
+    def move(self):
+        '''
+        Movement is stored as M:1.0 and sounded as alarm
+        '''
+        self.generator.stats['movements'] += 1
+        self.acquire_until(self.generator.virtual_now())
+        if len(self.readings) < constants.SENSOR_READINGS_BUFFER_SIZE:
+            self.readings.append((int(self.generator.virtual_now()), {'M': 1.0}))
+        else:
+            self.generator.stats['lost_readings'] += 1
+        self.exchange()
+
+    # ------------------------------------------------------------------ connection cycle
+
+    def exchange(self):
+        if not self.generator.running:
+            return
+        if self.busy:
+            self.pending = True
+            return
+        self.busy = True
+        self.times = {'start': time.time()}
+        error = self.open(self.generator.address)
+        if error:
+            self.finish(module_error(WIFI_OPERATION_FAILED))
+            return
+        self.state = 'CONNECT'
+        self.wait(CONNECT_TIMEOUT, module_error(WIFI_OPERATION_FAILED))
+
+    def wait(self, timeout, error, expired = None):
+        Loop.cancel(self.timer)
+        self.timer = self.generator.loop.call_later(timeout, expired or (lambda: self.end(error)))
+
+    def on_connected(self):
+        self.write(connect_packet(self.device_id, self.device_id, self.key, "will/%s/001" %self.device_id, WILL_MESSAGE,
+                                  MQTT_KEEP_ALIVE_PERIOD))
+        self.state = 'CONNACK'
+        self.wait(self.profile.timeout, mqtt_error(ERROR_RECEIVING_MQTT_MESSAGE, STATE_MQTT_RECEIVE_CONNACK))
+
+    def on_packet(self, packet_type, body):
+        kind = packet_type & 0xF0
+        if self.state == 'CONNACK' and kind == CONNACK:
+            if body[1:2] != '\x00':
+                self.end(mqtt_error(ERROR_INCORRECT_MQTT_MESSAGE_RECEIVED, STATE_MQTT_RECEIVE_CONNACK))
+                return
+            self.write(subscribe_packet("config/%s" %self.device_id, SUBSCRIBE_MESSAGE_ID))
+            self.state = 'SUBACK'
+            self.wait(self.profile.timeout, mqtt_error(ERROR_RECEIVING_MQTT_MESSAGE, STATE_MQTT_RECEIVE_SUBACK))
+        elif self.state == 'SUBACK' and kind == SUBACK and struct.unpack('>H', body[:2])[0] == SUBSCRIBE_MESSAGE_ID:
+            self.times['connected'] = time.time()
+            self.publish()
+        elif self.state == 'RECEIVE' and kind == PUBLISH:
+            self.generator.stats['acknowledged'] += 1
+            sent_system_items, sent_readings = self.sent
+            del self.system[:sent_system_items]
+            del self.readings[:sent_readings]
+            self.sent = (0, 0)
+            self.acquire_until(self.generator.virtual_now())
+            if self.readings:
+                self.publish()
+            else:
+                self.disconnect()
+        elif self.state == 'PINGRESP' and kind == PINGRESP:
+            self.disconnect()
+
+    def publish(self):
+        self.acquire_until(self.generator.virtual_now())
+        payload, sent_system_items, sent_readings = publish_payload(self.device_id, int(self.generator.virtual_now()),
+                                                                    self.system, self.readings)
+        self.sent = (sent_system_items, sent_readings)
+        publish_time = time.time()
+        self.write(publish_packet(self.topic, payload))
+
+        stats = self.generator.stats
+        stats['publishes'] += 1
+        stats['payload_bytes'] += len(payload)
+        if sent_system_items < len(self.system) or sent_readings < len(self.readings):
+            stats['split'] += 1
+        self.generator.records.append(payload_key(self.topic, payload) + (self.times['start'], publish_time))
+
+        self.state = 'RECEIVE'
+        self.wait(self.profile.timeout, None, self.ping)
+
+    def ping(self):
+        self.write(pingreq_packet())
+        self.state = 'PINGRESP'
+        self.wait(self.profile.timeout, mqtt_error(ERROR_RECEIVING_MQTT_MESSAGE, STATE_MQTT_RECEIVE_PINGRESP))
+
+    def disconnect(self):
+        self.times['exchanged'] = time.time()
+        self.write(disconnect_packet())
+        self.state = 'DISCONNECTING'
+        # broker closes connection on DISCONNECT, TIME_WAIT is left on its side
+        self.wait(self.profile.timeout, None, lambda: self.end(None))
+
+    def end(self, error):
+        self.timer = None
+        self.state = None
+        self.close()
+        self.finish(error)
+
+    def on_close(self, error):
+        if self.state is None:
+            return
+        Loop.cancel(self.timer)
+        self.timer = None
+        state, self.state = self.state, None
+        self.finish(None if state == 'DISCONNECTING' else module_error(WIFI_SOCKET_CLOSED))
+
+    def finish(self, error):
+        Loop.cancel(self.timer)
+        self.timer = None
+        now = time.time()
+        self.system.append(self.system_item(error, now))
+        del self.system[:-constants.SYSTEM_BUFFER_SIZE]
+
+        stats = self.generator.stats
+        stats['cycles'] += 1
+        self.generator.cycle_times.append(now - self.times['start'])
+        if error is None:
+            self.no_connection_count = 0
+            self.no_connection_heartbeat = self.profile.heartbeat
+            if self.heartbeat != self.profile.heartbeat:
+                self.start_heartbeat(self.profile.heartbeat)
+        else:
+            stats['failed'] += 1
+            self.adjust_heartbeat_on_error()
+
+        self.busy = False
+        if self.pending:
+            self.pending = False
+            self.exchange()
+
+    def adjust_heartbeat_on_error(self):
+        if self.no_connection_count == 0:
+            self.no_connection_heartbeat = self.profile.heartbeat
+        self.no_connection_count += 1
+
+        if self.no_connection_count % 2 == 0 and self.no_connection_heartbeat < constants.MAX_NO_CONNECTION_HEARTBEAT:
+            self.no_connection_heartbeat = min(self.no_connection_heartbeat * 2, constants.MAX_NO_CONNECTION_HEARTBEAT)
+            self.start_heartbeat(self.no_connection_heartbeat)
+
+    def system_item(self, error, now):
+        '''
+        Connection to server (S), data exchange (Q) and disconnect (L) seconds, zero times are omitted
+        '''
+        item = "R:%lu" %int(self.generator.virtual_now())
+        if error is not None:
+            item += ",E:%01X%s" %(COMMUNICATION_PROTOCOL_DATA, error)
+        times = self.times
+        phases = [('S', times['start'], times.get('connected')),
+                  ('Q', times.get('connected'), times.get('exchanged')),
+                  ('L', times.get('exchanged'), now if error is None else None)]
+        total = 0
+        for key, begin, end in phases:
+            seconds = int(end - begin) if begin is not None and end is not None else 0
+            if seconds:
+                total += seconds
+                item += ",%s:%u" %(key, seconds)
+        if total:
+            item += ",C:%u" %total
+        return item + ",B:%u,V:%s" %(BATTERY_VOLTAGE, constants.FIRMWARE_VERSION)
+
+
+class LoadGenerator(object):
+    def __init__(self, address, profile = DEFAULT_PROFILE, seed = None):
+        self.address = address
+        self.profile = profile
+        self.random = random.Random(seed)
+        self.loop = Loop()
+        self.start_time = time.time()
+        self.running = False
+        self.stats = dict.fromkeys(['cycles', 'failed', 'publishes', 'acknowledged', 'split', 'payload_bytes',
+                                    'movements', 'lost_readings'], 0)
+        self.records = []
+        self.cycle_times = []
+
+    def virtual_now(self):
+        return self.start_time + (time.time() - self.start_time) * self.profile.speed
+
+    def call_virtual(self, seconds, callback):
+        '''
+        Calls back after virtual seconds
+        '''
+        return self.loop.call_later(seconds / float(self.profile.speed), callback)
+
+    def values(self):
+        return {'P': float32(round(1013.0 + self.random.uniform(-5, 5), 1)),
+                'T': float32(round(23.0 + self.random.uniform(-1, 1), 1)),
+                'H': float32(round(45.0 + self.random.uniform(-5, 5), 1))}
+
+    def run(self, first, count, duration):
+        '''
+        Runs sensors first..first + count - 1 for duration seconds, cycles in progress are abandoned
+        '''
+        self.start_time = time.time()
+        self.running = True
+        sensors = [VirtualSensor(self, index) for index in range(first, first + count)]
+        for sensor in sensors:
+            sensor.start()
+        self.loop.run(self.start_time + duration)
+        self.running = False
+        for sensor in sensors:
+            if sensor.state is not None:
+                sensor.state = None
+                sensor.close()
+
+        result = dict(self.stats)
+        result.update({'sensors': count, 'records': self.records, 'cycle_times': self.cycle_times,
+                       'start': self.start_time, 'duration': duration})
+        return result
+
+
+def generate(task, address, profile, duration):
+    '''
+    Worker process. task: (first sensor, sensors, seed)
+    '''
+    first, count, seed = task
+    return LoadGenerator(address, profile, seed).run(first, count, duration)
+
+
+class Platform(Connection):
+    '''
+    Server side client: subscribed to sensors/#, records every payload and acknowledges it on config/<id>
+    '''
+    def __init__(self, address, acknowledge = True):
+        Connection.__init__(self, Loop())
+        self.address = address
+        self.acknowledge = acknowledge
+        self.subscribed = False
+        self.received = []
+        self.error = None
+
+    def start(self, timeout = RECEIVE_TIMEOUT):
+        '''
+        Returns True when subscription is in place
+        '''
+        error = self.open(self.address)
+        if error:
+            self.error = error
+            return False
+        deadline = time.time() + timeout
+        while not self.subscribed and self.sock is not None and time.time() < deadline:
+            self.loop.run(min(deadline, time.time() + 0.05))
+        return self.subscribed
+
+    def on_connected(self):
+        self.write(connect_packet(PLATFORM_ID, None, None, None, None, 0))
+
+    def on_packet(self, packet_type, body):
+        kind = packet_type & 0xF0
+        if kind == CONNACK:
+            self.write(subscribe_packet('sensors/#', SUBSCRIBE_MESSAGE_ID))
+        elif kind == SUBACK:
+            self.subscribed = True
+        elif kind == PUBLISH:
+            topic, payload = parse_publish(packet_type, body)
+            self.received.append(payload_key(topic, payload) + (time.time(),))
+            if self.acknowledge:
+                self.write(standard_publish_packet("config/%s" %topic.split('/', 1)[1], ACKNOWLEDGEMENT))
+
+    def on_close(self, error):
+        self.error = error
+
+    def run(self, until):
+        self.loop.run(until)
+        self.close()
+
+
+def summarize(results, received):
+    '''
+    results: generate() results, received: Platform.received. Returns report dict
+    '''
+    totals = dict.fromkeys(['sensors', 'cycles', 'failed', 'publishes', 'acknowledged', 'split', 'payload_bytes',
+                            'movements', 'lost_readings'], 0)
+    for result in results:
+        for name in totals:
+            totals[name] += result[name]
+    start = min(result['start'] for result in results)
+    duration = max(result['start'] + result['duration'] for result in results) - start
+
+    arrivals = {}
+    for topic, crc, received_time in received:
+        arrivals.setdefault((topic, crc), []).append(received_time)
+    publish_latency = []
+    connect_latency = []
+    delivered = []
+    for result in results:
+        for topic, crc, connect_time, publish_time in result['records']:
+            times = arrivals.get((topic, crc))
+            if times:
+                received_time = times.pop(0)
+                publish_latency.append(received_time - publish_time)
+                connect_latency.append(received_time - connect_time)
+                delivered.append(received_time)
+    publish_latency.sort()
+    connect_latency.sort()
+
+    # publishes delivered in every whole second of the run, first and last one are ramps
+    per_second = [0] * max(1, int(duration))
+    for received_time in delivered:
+        second = int(received_time - start)
+        if 0 <= second < len(per_second):
+            per_second[second] += 1
+    steady = sorted(per_second[1:-1] or per_second)
+    cycle_times = sorted(time_ for result in results for time_ in result['cycle_times'])
+
+    totals.update({'duration': duration,
+                   'delivered': len(delivered),
+                   'publish_rate': totals['publishes'] / duration if duration else 0.0,
+                   'delivered_rate': len(delivered) / duration if duration else 0.0,
+                   'sustained_rate_p5': percentile(steady, 0.05),
+                   'sustained_rate_p50': percentile(steady, 0.50),
+                   'payload_mean': totals['payload_bytes'] / float(totals['publishes']) if totals['publishes'] else None,
+                   'cycle_p50': percentile(cycle_times, 0.50),
+                   'cycle_p95': percentile(cycle_times, 0.95)})
+    for name, samples in (('publish_latency', publish_latency), ('connect_latency', connect_latency)):
+        for fraction in (0.50, 0.95, 0.99):
+            totals["%s_p%d" %(name, int(fraction * 100))] = percentile(samples, fraction)
+        totals[name + '_max'] = samples[-1] if samples else None
+    return totals
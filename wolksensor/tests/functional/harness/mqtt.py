@@ -0,0 +1,482 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: MQTT 3.1 packets as SDK/core/libemqtt.c builds them, non-blocking
+       socket event loop and stand-in broker for load generation.
+
+       Packets which firmware sends are built byte for byte like libemqtt:
+       CONNECT with 'MQIsdp' protocol name, version 3, clean session, will
+       and username/password, SUBSCRIBE with QoS 1 header and requested
+       QoS 0, PUBLISH with remaining length always in two bytes
+       (mqtt_publish_with_qos), PINGREQ and DISCONNECT.
+
+       Python 2.7 has no asyncio, so Loop is built on select.poll (Linux,
+       macOS) or select.select where there is no poll, with heap of timers
+       like the emulator schedule.
+
+       StandInBroker is enough of a broker for WolkSensor traffic: CONNECT,
+       SUBSCRIBE ('+' and '#' filters), QoS 0 PUBLISH, PINGREQ, DISCONNECT
+       and will message of client which drops connection without it.
+
+       python mqtt.py                          - stand-in broker on port 1883
+       python mqtt.py --port 1884
+'''
+#!/Python27/python
+import argparse
+import errno
+import heapq
+import itertools
+import select
+import socket
+import struct
+import sys
+import time
+
+MQTT_PORT = 1883
+
+CONNECT = 0x10
+CONNACK = 0x20
+PUBLISH = 0x30
+PUBACK = 0x40
+SUBSCRIBE = 0x80
+SUBACK = 0x90
+PINGREQ = 0xC0
+PINGRESP = 0xD0
+DISCONNECT = 0xE0
+
+QOS1_FLAG = 1 << 1
+CLEAN_SESSION = 1 << 1
+WILL_FLAG = 1 << 2
+PASSWORD_FLAG = 1 << 6
+USERNAME_FLAG = 1 << 7
+
+RECEIVE_SIZE = 65536
+LISTEN_BACKLOG = 1024
+DISCONNECTED = (errno.ECONNRESET, errno.ECONNABORTED, errno.EPIPE, errno.ENOTCONN)
+
+
+def utf(string):
+    return struct.pack('>H', len(string)) + string
+
+def encode_length(length):
+    encoded = ''
+    while True:
+        digit, length = length % 128, length // 128
+        encoded += chr(digit | 0x80 if length else digit)
+        if not length:
+            return encoded
+
+def connect_packet(client_id, username, password, will_topic, will_message, keep_alive):
+    '''
+    mqtt_connect(), will QoS 0 and not retained
+    '''
+    flags = CLEAN_SESSION
+    payload = utf(client_id)
+    if will_topic and will_message:
+        flags |= WILL_FLAG
+        payload += utf(will_topic) + utf(will_message)
+    if username:
+        flags |= USERNAME_FLAG
+        payload += utf(username)
+    if password:
+        flags |= PASSWORD_FLAG
+        payload += utf(password)
+    variable_header = utf('MQIsdp') + struct.pack('>BBH', 3, flags, keep_alive)
+    return chr(CONNECT) + encode_length(len(variable_header) + len(payload)) + variable_header + payload
+
+def subscribe_packet(topic, message_id):
+    '''
+    mqtt_subscribe(), one topic with requested QoS 0
+    '''
+    body = struct.pack('>H', message_id) + utf(topic) + '\x00'
+    return chr(SUBSCRIBE | QOS1_FLAG) + chr(len(body)) + body
+
+def publish_packet(topic, payload):
+    '''
+    mqtt_publish_with_qos() with QoS 0, remaining length is written in two bytes even when it fits one
+    '''
+    length = 2 + len(topic) + len(payload)
+    return struct.pack('>BBB', PUBLISH, length % 128 | 0x80, length // 128) + utf(topic) + payload
+
+def standard_publish_packet(topic, payload):
+    return chr(PUBLISH) + encode_length(2 + len(topic) + len(payload)) + utf(topic) + payload
+
+def disconnect_packet():
+    return chr(DISCONNECT) + '\x00'
+
+def pingreq_packet():
+    return chr(PINGREQ) + '\x00'
+
+def parse_publish(flags, body):
+    '''
+    Returns (topic, payload) of PUBLISH packet
+    '''
+    topic_length = struct.unpack('>H', body[:2])[0]
+    start = 2 + topic_length + (2 if flags & 0x06 else 0)
+    return body[2:2 + topic_length], body[start:]
+
+def topic_matches(topic_filter, topic):
+    filter_levels = topic_filter.split('/')
+    levels = topic.split('/')
+    for index, level in enumerate(filter_levels):
+        if level == '#':
+            return True
+        if index >= len(levels) or (level != '+' and level != levels[index]):
+            return False
+    return len(filter_levels) == len(levels)
+
+
+class PacketReader(object):
+    '''
+    Splits received bytes into (type with flags, body) packets
+    '''
+    def __init__(self):
+        self.data = ''
+
+    def feed(self, data):
+        self.data += data
+        packets = []
+        while len(self.data) >= 2:
+            length, multiplier, position = 0, 1, 1
+            while True:
+                if position >= len(self.data):
+                    return packets
+                digit = ord(self.data[position])
+                length += (digit & 0x7F) * multiplier
+                multiplier *= 128
+                position += 1
+                if not digit & 0x80:
+                    break
+            if len(self.data) < position + length:
+                return packets
+            packets.append((ord(self.data[0]), self.data[position:position + length]))
+            self.data = self.data[position + length:]
+        return packets
+
+
+class Loop(object):
+    '''
+    Non-blocking sockets and timers in one thread. Handlers are called with the ready event mask
+    '''
+    READ = select.POLLIN if hasattr(select, 'poll') else 1
+    WRITE = select.POLLOUT if hasattr(select, 'poll') else 4
+    ERROR = (select.POLLERR | select.POLLHUP) if hasattr(select, 'poll') else 8
+
+    def __init__(self):
+        self.handlers = {}
+        self.masks = {}
+        self.timers = []
+        self.sequence = itertools.count()
+        self.poller = select.poll() if hasattr(select, 'poll') else None
+
+    def register(self, fd, mask, handler):
+        self.handlers[fd] = handler
+        self.masks[fd] = mask
+        if self.poller is not None:
+            self.poller.register(fd, mask)
+
+    def modify(self, fd, mask):
+        if self.masks.get(fd) != mask:
+            self.masks[fd] = mask
+            if self.poller is not None:
+                self.poller.modify(fd, mask)
+
+    def unregister(self, fd):
+        if self.handlers.pop(fd, None) is not None:
+            del self.masks[fd]
+            if self.poller is not None:
+                self.poller.unregister(fd)
+
+    def call_at(self, when, callback):
+        '''
+        Returns timer which is stopped with cancel()
+        '''
+        timer = [when, next(self.sequence), callback]
+        heapq.heappush(self.timers, timer)
+        return timer
+
+    def call_later(self, delay, callback):
+        return self.call_at(time.time() + delay, callback)
+
+    @staticmethod
+    def cancel(timer):
+        if timer is not None:
+            timer[2] = None
+
+    def wait(self, timeout):
+        if self.poller is not None:
+            return self.poller.poll(max(0, timeout) * 1000)
+        if not self.masks:
+            time.sleep(max(0, timeout))
+            return []
+        readers = [fd for fd, mask in self.masks.items() if mask & self.READ]
+        writers = [fd for fd, mask in self.masks.items() if mask & self.WRITE]
+        readable, writable, failed = select.select(readers, writers, self.masks.keys(), max(0, timeout))
+        events = {}
+        for fds, mask in ((readable, self.READ), (writable, self.WRITE), (failed, self.ERROR)):
+            for fd in fds:
+                events[fd] = events.get(fd, 0) | mask
+        return events.items()
+
+    def run(self, until = None):
+        '''
+        Runs until there are no handlers and timers, or until wall clock time
+        '''
+        while self.handlers or self.timers:
+            now = time.time()
+            if until is not None and now >= until:
+                return
+            while self.timers and self.timers[0][2] is None:
+                heapq.heappop(self.timers)
+            timeout = self.timers[0][0] - now if self.timers else 1.0
+            if until is not None:
+                timeout = min(timeout, until - now)
+            for fd, mask in self.wait(timeout):
+                handler = self.handlers.get(fd)
+                if handler is not None:
+                    handler(mask)
+            now = time.time()
+            while self.timers and self.timers[0][0] <= now:
+                callback = heapq.heappop(self.timers)[2]
+                if callback is not None:
+                    callback()
+
+
+class Connection(object):
+    '''
+    Non-blocking socket with output buffer. on_packet(type with flags, body) and on_close(error) are overridden
+    '''
+    def __init__(self, loop, sock = None):
+        self.loop = loop
+        self.sock = sock
+        self.reader = PacketReader()
+        self.output = ''
+        self.connecting = False
+
+    def open(self, address):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setblocking(0)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        error = self.sock.connect_ex(address)
+        if error not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK, getattr(errno, 'WSAEWOULDBLOCK', errno.EWOULDBLOCK)):
+            self.sock.close()
+            self.sock = None
+            return error
+        self.connecting = True
+        self.loop.register(self.sock.fileno(), Loop.READ | Loop.WRITE, self.ready)
+        return 0
+
+    def attach(self):
+        self.sock.setblocking(0)
+        self.loop.register(self.sock.fileno(), Loop.READ, self.ready)
+
+    def write(self, data):
+        if self.sock is None:
+            return
+        self.output += data
+        if not self.connecting:
+            self.flush()
+
+    def flush(self):
+        try:
+            sent = self.sock.send(self.output) if self.output else 0
+        except socket.error as e:
+            if e.args[0] in (errno.EAGAIN, errno.EWOULDBLOCK):
+                sent = 0
+            else:
+                self.close(e.args[0])
+                return
+        self.output = self.output[sent:]
+        self.loop.modify(self.sock.fileno(), Loop.READ | Loop.WRITE if self.output else Loop.READ)
+
+    def ready(self, mask):
+        if self.connecting and mask & (Loop.WRITE | Loop.ERROR):
+            error = self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            if error:
+                self.close(error)
+                return
+            self.connecting = False
+            self.on_connected()
+            if self.sock is None:
+                return
+            self.flush()
+        elif mask & Loop.WRITE and self.sock is not None:
+            self.flush()
+        if self.sock is not None and mask & (Loop.READ | Loop.ERROR) and not self.connecting:
+            try:
+                data = self.sock.recv(RECEIVE_SIZE)
+            except socket.error as e:
+                if e.args[0] not in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    self.close(e.args[0])
+                return
+            if not data:
+                self.close(None)
+                return
+            for packet_type, body in self.reader.feed(data):
+                if self.sock is None:
+                    return
+                self.on_packet(packet_type, body)
+
+    def close(self, error = None):
+        if self.sock is None:
+            return
+        self.loop.unregister(self.sock.fileno())
+        self.sock.close()
+        self.sock = None
+        self.connecting = False
+        self.on_close(error)
+
+    def on_connected(self):
+        pass
+
+    def on_packet(self, packet_type, body):
+        pass
+
+    def on_close(self, error):
+        pass
+
+
+class BrokerClient(Connection):
+    def __init__(self, broker, sock):
+        Connection.__init__(self, broker.loop, sock)
+        self.broker = broker
+        self.client_id = None
+        self.will = None
+        self.filters = []
+        self.attach()
+
+    def on_packet(self, packet_type, body):
+        kind = packet_type & 0xF0
+        if kind == CONNECT:
+            self.connect(body)
+        elif kind == PUBLISH:
+            self.broker.publish(*parse_publish(packet_type, body))
+            if packet_type & 0x06:
+                message_id = body[2 + struct.unpack('>H', body[:2])[0]:][:2]
+                self.write(chr(PUBACK) + '\x02' + message_id)
+        elif kind == SUBSCRIBE:
+            self.subscribe(body)
+        elif kind == PINGREQ:
+            self.write(chr(PINGRESP) + '\x00')
+        elif kind == DISCONNECT:
+            self.will = None
+            self.close(None)
+
+    def connect(self, body):
+        position = 2 + struct.unpack('>H', body[:2])[0]
+        flags = ord(body[position + 1])
+        position += 4
+
+        def string():
+            length = struct.unpack('>H', body[position:position + 2])[0]
+            return body[position + 2:position + 2 + length], position + 2 + length
+
+        self.client_id, position = string()
+        if flags & WILL_FLAG:
+            will_topic, position = string()
+            will_message, position = string()
+            self.will = (will_topic, will_message)
+        self.broker.connected(self)
+        self.write(chr(CONNACK) + '\x02\x00\x00')
+
+    def subscribe(self, body):
+        message_id = body[:2]
+        position = 2
+        granted = ''
+        while position < len(body):
+            length = struct.unpack('>H', body[position:position + 2])[0]
+            self.broker.subscribe(self, body[position + 2:position + 2 + length])
+            position += 2 + length + 1
+            granted += '\x00'
+        self.write(chr(SUBACK) + chr(2 + len(granted)) + message_id + granted)
+
+    def on_close(self, error):
+        self.broker.disconnected(self)
+        if self.will:
+            self.broker.publish(*self.will)
+
+
+class StandInBroker(object):
+    '''
+    Broker on its own loop, clients with exact topic filters are found without scanning
+    '''
+    def __init__(self, port = MQTT_PORT, host = '127.0.0.1', loop = None):
+        self.loop = loop or Loop()
+        self.clients = {}
+        self.exact = {}
+        self.wildcards = []
+        self.published = 0
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind((host, port))
+        self.listener.listen(LISTEN_BACKLOG)
+        self.listener.setblocking(0)
+        self.port = self.listener.getsockname()[1]
+        self.loop.register(self.listener.fileno(), Loop.READ, self.accept)
+
+    def accept(self, mask):
+        while True:
+            try:
+                sock = self.listener.accept()[0]
+            except socket.error:
+                return
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            BrokerClient(self, sock)
+
+    def connected(self, client):
+        previous = self.clients.get(client.client_id)
+        if previous is not None and previous is not client:
+            previous.will = None
+            previous.close(None)
+        self.clients[client.client_id] = client
+
+    def disconnected(self, client):
+        if self.clients.get(client.client_id) is client:
+            del self.clients[client.client_id]
+        for topic_filter in client.filters:
+            if '+' in topic_filter or '#' in topic_filter:
+                self.wildcards = [(other, client_filter) for other, client_filter in self.wildcards if other is not client]
+            else:
+                subscribers = self.exact.get(topic_filter)
+                if subscribers is not None:
+                    subscribers.discard(client)
+                    if not subscribers:
+                        del self.exact[topic_filter]
+
+    def subscribe(self, client, topic_filter):
+        client.filters.append(topic_filter)
+        if '+' in topic_filter or '#' in topic_filter:
+            self.wildcards.append((client, topic_filter))
+        else:
+            self.exact.setdefault(topic_filter, set()).add(client)
+
+    def publish(self, topic, payload):
+        self.published += 1
+        subscribers = set(self.exact.get(topic, ()))
+        subscribers.update(client for client, topic_filter in self.wildcards if topic_matches(topic_filter, topic))
+        if subscribers:
+            packet = standard_publish_packet(topic, payload)
+            for client in subscribers:
+                client.write(packet)
+
+    def serve(self, until = None):
+        self.loop.run(until)
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Stand-in MQTT broker for WolkSensor load generation")
+    parser.add_argument('--host', default = '127.0.0.1')
+    parser.add_argument('--port', type = int, default = MQTT_PORT, help = "default %(default)s")
+    arguments = parser.parse_args()
+
+    broker = StandInBroker(arguments.port, arguments.host)
+    print "Stand-in broker listening on %s:%d" %(arguments.host, broker.port)
+    try:
+        broker.serve()
+    except KeyboardInterrupt:
+        print "%d message(s) published" %broker.published
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Calibration offset verification from many samples.
+       Instead of one reading before and one after offsets are written,
+       OFFSET_SAMPLES readings are acquired for each configuration (one
+       ACQUISITION per reading) into NumPy arrays, one column per channel
+       in codec.Offsets order (pressure, temperature, humidity). Offset
+       applied by the device is the shift of the channel mean between two
+       configurations; it passes when commanded offset lies in the
+       confidence interval of the shift (Welch t interval, sensor noise of
+       both sample sets), widened by the 0.1 resolution of READINGS values.
+
+           before = sample_readings()
+           set_offset(1, 2, 3)
+           after = sample_readings()
+           check_shift(before, after, [1, 2, 3])
+'''
+import numpy
+import constants
+import logging_device
+
+from ringbuffer import ACCEPT_TIMEOUT
+from ringbuffer import Link
+from ringbuffer import READINGS_BUFFER
+from ringbuffer import drain
+
+OFFSET_SAMPLES = 10
+OFFSET_RESOLUTION = 0.1         # READINGS values have one decimal
+CHANNELS = ['pressure', 'temperature', 'humidity']
+
+# two sided 95% t quantiles by degrees of freedom, normal quantile above
+T_95 = [None, 12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+        2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+        2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042]
+Z_95 = 1.960
+
+
+def t_quantile(degrees):
+    degrees = int(degrees)
+    if degrees < 1:
+        return T_95[1]
+    return T_95[degrees] if degrees < len(T_95) else Z_95
+
+def sample_readings(count = OFFSET_SAMPLES, link = None):
+    '''
+    Clears readings and acquires count new ones. Returns array of shape (readings, channels)
+    '''
+    if count > READINGS_BUFFER.size:
+        raise ValueError("%d samples do not fit readings buffer of %d" %(count, READINGS_BUFFER.size))
+    link = link or Link()
+    link.request('READINGS CLEAR;')
+    for index in range(count):
+        seen = len(link.notifications)
+        responses, seconds, size = link.request('ACQUISITION;')
+        if responses != [constants.DONE] or not link.wait_notification('STATUS ACQUISITION;', seen, ACCEPT_TIMEOUT) \
+        or not link.wait_notification('STATUS IDLE;', seen, constants.RESPONSE_TIMEOUT):
+            logging_device.error("Sample %d not acquired. Received: %s" %(index, ''.join(responses)))
+
+    readings = drain(link, READINGS_BUFFER)[0]
+    samples = numpy.array([[getattr(reading, channel) for channel in CHANNELS] for reading in readings
+                           if None not in [getattr(reading, channel) for channel in CHANNELS]], dtype = float)
+    link.request('READINGS CLEAR;')
+    return samples.reshape(-1, len(CHANNELS))
+
+def offset_shift(before, after):
+    '''
+    Returns (shift of channel means, half width of 95% confidence interval), arrays per channel
+    '''
+    shift = after.mean(axis = 0) - before.mean(axis = 0)
+    before_error = before.var(axis = 0, ddof = 1) / len(before)
+    after_error = after.var(axis = 0, ddof = 1) / len(after)
+    standard_error = numpy.sqrt(before_error + after_error)
+
+    # Welch-Satterthwaite degrees of freedom, channel without noise has exact shift
+    denominator = before_error ** 2 / (len(before) - 1) + after_error ** 2 / (len(after) - 1)
+    degrees = numpy.where(denominator > 0, (before_error + after_error) ** 2 / numpy.where(denominator > 0, denominator, 1),
+                          len(before) + len(after) - 2)
+    interval = numpy.array([t_quantile(value) for value in degrees]) * standard_error
+    return shift, interval
+
+def check_shift(before, after, expected):
+    '''
+    expected: commanded change of offsets per channel. Returns True when every channel shifted by it
+    '''
+    if len(before) < 2 or len(after) < 2:
+        logging_device.error("Not enough samples, %d before and %d after" %(len(before), len(after)))
+        return False
+
+    expected = numpy.array(expected, dtype = float)
+    shift, interval = offset_shift(before, after)
+    passed = numpy.abs(shift - expected) <= interval + OFFSET_RESOLUTION
+
+    for channel, channel_expected, channel_shift, channel_interval, channel_passed in zip(CHANNELS, expected, shift, interval, passed):
+        message = "%-11s offset %+.2f, shift %+.2f +/- %.2f (%d + %d samples)" \
+                  %(channel, channel_expected, channel_shift, channel_interval, len(before), len(after))
+        if channel_passed:
+            logging_device.log(message)
+        else:
+            logging_device.error(message)
+    return bool(passed.all())
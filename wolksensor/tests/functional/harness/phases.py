@@ -0,0 +1,225 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Connection phase analytics from SYSTEM items.
+       Every NOW/heartbeat cycle leaves SYSTEM item with time spent in each
+       connection phase (A: access point, D: DHCP, S: server, Q: data
+       exchange, L: disconnect, C: total online time). Items are collected
+       from traces (recorder.py) and sessions (replay.py) of all runs and
+       stations into one columnar store, one list per column, and every item
+       is tagged with device, firmware version and access point (SSID, AUTH)
+       which was set on the device when the cycle ran.
+
+       SSID/AUTH of a cycle is found on the trace time line: device RTC seen
+       in 'RTC n;' response maps item timestamp to trace time.
+'''
+import json
+import os
+import constants
+
+from codec import decode
+from codec import split
+from streaming import percentile
+
+# codec.SystemItem slots of constants.ACCESSPOINTTIME, DHCPTIME, SERVER, DATAEXCHANGETIME, DISCONNECTTIME, CONNECTIONTIME
+PHASES = ['access_point_time', 'dhcp_time', 'server_time', 'data_exchange_time', 'disconnect_time', 'connection_time']
+
+COLUMNS = ['device', 'version', 'ssid', 'auth', 'timestamp', 'error', 'battery', 'source'] + PHASES
+
+GROUPS = {'version': ['version'], 'ap': ['ssid', 'auth'], 'device': ['device']}
+
+PHASE_THRESHOLD = 0.2       # allowed p95 growth against baseline
+PHASE_MIN_DELTA = 1         # SYSTEM item units, smaller growth is rounding
+
+
+def value_at(timeline, moment):
+    '''
+    timeline: [(time, value)] in time order. Returns value set at moment, None before first one
+    '''
+    value = None
+    for time, timeline_value in timeline:
+        if time > moment:
+            break
+        value = timeline_value
+    return value
+
+def scan(path):
+    '''
+    Returns list of row dicts, one per SYSTEM item found in trace or session file
+    '''
+    timelines = {'SSID': [], 'AUTH': []}
+    device = None
+    version = None
+    port = None
+    offset = None
+    found = []
+
+    rest = ''
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get('direction') != 'rx':
+                continue
+            port = record.get('port') or port
+
+            messages = (rest + record['raw'].encode('latin-1')).split(constants.COMMAND_TERMINATOR)
+            rest = messages.pop()
+            for message in messages:
+                try:
+                    name, argument = split(message + constants.COMMAND_TERMINATOR)
+                except ValueError:
+                    continue
+                if name in timelines:
+                    timelines[name].append((record['time'], argument))
+                elif name == 'ID' and argument:
+                    device = argument
+                elif name == 'VERSION' and argument:
+                    version = argument
+                elif name == 'RTC' and argument.isdigit():
+                    offset = record['time'] - int(argument)
+                elif name == 'SYSTEM':
+                    try:
+                        items = decode(message + constants.COMMAND_TERMINATOR)
+                    except ValueError:
+                        continue
+                    found.extend((record['time'], offset, item) for item in items)
+
+    rows = []
+    for time, item_offset, item in found:
+        # item of a cycle which ran before device RTC was seen is tagged with state at read time
+        moment = item.timestamp + item_offset if item_offset is not None and item.timestamp else time
+        row = {'device': device or port,
+               'version': item.version or version,
+               'ssid': value_at(timelines['SSID'], moment),
+               'auth': value_at(timelines['AUTH'], moment),
+               'timestamp': item.timestamp,
+               'error': item.error,
+               'battery': item.battery,
+               'source': os.path.basename(path)}
+        for column in PHASES:
+            row[column] = getattr(item, column)
+        rows.append(row)
+    return rows
+
+
+class PhaseStore(object):
+    '''
+    Column store: {column: [value, ..]}, one row per (device, timestamp)
+    '''
+    def __init__(self):
+        self.columns = dict((column, []) for column in COLUMNS)
+        self.keys = set()
+
+    def __len__(self):
+        return len(self.columns['device'])
+
+    def add(self, row):
+        '''
+        Returns False for item which is already stored, SYSTEM is read many times between two CLEARs
+        '''
+        key = (row['device'], row['timestamp'])
+        if key in self.keys:
+            return False
+        self.keys.add(key)
+        for column in COLUMNS:
+            self.columns[column].append(row.get(column))
+        return True
+
+    def extend(self, rows):
+        return sum(1 for row in rows if self.add(row))
+
+    def ingest(self, path):
+        return self.extend(scan(path))
+
+    def rows(self):
+        for index in range(len(self)):
+            yield dict((column, self.columns[column][index]) for column in COLUMNS)
+
+    @classmethod
+    def load(cls, path):
+        store = cls()
+        if os.path.exists(path):
+            with open(path) as f:
+                columns = json.load(f)['columns']
+            store.extend(dict((column, columns[column][index]) for column in COLUMNS)
+                         for index in range(len(columns['device'])))
+        return store
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump({'columns': self.columns}, f)
+
+    def groups(self, key_columns):
+        '''
+        Returns {group key tuple: [row indexes]}
+        '''
+        groups = {}
+        for index in range(len(self)):
+            groups.setdefault(tuple(self.columns[column][index] for column in key_columns), []).append(index)
+        return groups
+
+    def statistics(self, key_columns):
+        '''
+        Returns {group key tuple: {'cycles': .., 'failed': .., 'errors': {code: count},
+                                   phase column: {'p50', 'p95', 'p99', 'mean', 'count', 'share'}}}
+        Phase times are taken from successful cycles only, share is part of total online time.
+        '''
+        statistics = {}
+        for group, indexes in self.groups(key_columns).items():
+            errors = {}
+            for index in indexes:
+                error = self.columns['error'][index]
+                if error:
+                    errors[error] = errors.get(error, 0) + 1
+            succeeded = [index for index in indexes if not self.columns['error'][index]]
+
+            result = {'cycles': len(indexes), 'failed': len(indexes) - len(succeeded), 'errors': errors}
+            online = sum(self.columns['connection_time'][index] or 0 for index in succeeded)
+            for column in PHASES:
+                # zero times are omitted by firmware
+                samples = sorted(self.columns[column][index] or 0 for index in succeeded)
+                result[column] = {'p50': percentile(samples, 0.50),
+                                  'p95': percentile(samples, 0.95),
+                                  'p99': percentile(samples, 0.99),
+                                  'mean': float(sum(samples)) / len(samples) if samples else None,
+                                  'count': len(samples),
+                                  'share': float(sum(samples)) / online if online else None}
+            statistics[group] = result
+        return statistics
+
+
+def dominant(result):
+    '''
+    Phase with largest share of online time, total itself excluded
+    '''
+    shares = [(result[column]['share'], column) for column in PHASES[:-1] if result[column]['share'] is not None]
+    return max(shares)[1] if shares else None
+
+def compare(current, baseline, threshold = PHASE_THRESHOLD, min_delta = PHASE_MIN_DELTA):
+    '''
+    current, baseline: statistics() group results. Returns list of (phase, baseline p95, current p95)
+    for phases which grew by more than threshold, and ('failed', baseline rate, current rate)
+    '''
+    regressions = []
+    for column in PHASES:
+        old = baseline[column]['p95']
+        new = current[column]['p95']
+        if old is None or new is None:
+            continue
+        if new > old * (1 + threshold) and new - old > min_delta:
+            regressions.append((column, old, new))
+
+    old_rate = float(baseline['failed']) / baseline['cycles']
+    new_rate = float(current['failed']) / current['cycles']
+    if new_rate > old_rate * (1 + threshold) and new_rate - old_rate > 1.0 / current['cycles']:
+        regressions.append(('failed', old_rate, new_rate))
+    return regressions
+
+def snapshot():
+    '''
+    Reads what analytics needs in one batch, so it is in the trace of a run even when suites
+    read SYSTEM through device_test_func
+    '''
+    from batch import send_batch
+    send_batch([('ID', None), ('VERSION', None), ('RTC', None), ('SSID', None), ('AUTH', None), ('SYSTEM', None)])
@@ -0,0 +1,120 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Discovery of serial ports with WolkSensor devices attached.
+       Devices are recognised by USB vendor and product id
+       (constants.VID and constants.PID) of the FTDI USB Serial Port.
+
+       On Linux USB serial ports are enumerated from sysfs, idVendor and
+       idProduct are read from the USB device each tty belongs to, without
+       loading pyserial. Result is cached in CACHE_FILE, so it is shared by
+       every launch of the harness, and scanned again only when a USB serial
+       tty appears, disappears or its /dev node is created again, device
+       plugged in or out (hot-plug). Elsewhere pyserial list_ports is used
+       and cached in the process until refresh.
+'''
+import json
+import os
+import tempfile
+import constants
+
+SYSFS_TTY = '/sys/class/tty'
+USB_TTY_PREFIXES = ('ttyUSB', 'ttyACM')
+CACHE_FILE = os.path.join(tempfile.gettempdir(), 'wolksensor_ports.json')
+
+# {'signature': tty_signature() the ports were found from, 'ports': [..]}
+cache = {'signature': None, 'ports': None}
+
+
+def usb_id(id_string):
+    # 'VID_0403' -> 0x0403
+    return int(id_string.split('_')[-1], 16)
+
+def is_wolksensor_port(port):
+    vid = getattr(port, 'vid', None)
+    pid = getattr(port, 'pid', None)
+    if vid is not None and pid is not None:
+        return vid == usb_id(constants.VID) and pid == usb_id(constants.PID)
+
+    # old pyserial returns (device, description, hwid) tuples
+    hwid = port[2].upper()
+    vid_string = "%04X" % usb_id(constants.VID)
+    pid_string = "%04X" % usb_id(constants.PID)
+    return (vid_string in hwid) and (pid_string in hwid)
+
+def usb_ttys():
+    return sorted(name for name in os.listdir(SYSFS_TTY) if name.startswith(USB_TTY_PREFIXES))
+
+def tty_signature():
+    '''
+    [tty, change time of its /dev node] of every USB serial tty, the node is created again on every plug in
+    '''
+    signature = []
+    for tty in usb_ttys():
+        try:
+            signature.append([tty, os.stat('/dev/' + tty).st_ctime])
+        except OSError:
+            signature.append([tty, None])
+    return signature
+
+def load_cache():
+    try:
+        with open(CACHE_FILE) as f:
+            cache.update(json.load(f))
+    except (IOError, ValueError):
+        pass
+
+def save_cache():
+    # harness is launched for many devices at once, others read either the old or the new file
+    temporary = "%s.%d" %(CACHE_FILE, os.getpid())
+    try:
+        with open(temporary, 'w') as f:
+            json.dump(cache, f)
+        os.rename(temporary, CACHE_FILE)
+    except (IOError, OSError):
+        pass
+
+def read_usb_id(directory, name):
+    with open(os.path.join(directory, name)) as f:
+        return int(f.read().strip(), 16)
+
+def sysfs_usb_ids(tty):
+    '''
+    (vid, pid) of USB device tty belongs to, None when there is none
+    '''
+    # .../1-1/1-1:1.0/ttyUSB0 for FTDI, .../1-1/1-1:1.0 for ACM, idVendor is in .../1-1
+    directory = os.path.realpath(os.path.join(SYSFS_TTY, tty, 'device'))
+    while directory != '/':
+        if os.path.exists(os.path.join(directory, 'idVendor')):
+            try:
+                return read_usb_id(directory, 'idVendor'), read_usb_id(directory, 'idProduct')
+            except (IOError, ValueError):
+                return None
+        directory = os.path.dirname(directory)
+    return None
+
+def scan_sysfs(ttys):
+    wolksensor_ids = (usb_id(constants.VID), usb_id(constants.PID))
+    return ['/dev/' + tty for tty in ttys if sysfs_usb_ids(tty) == wolksensor_ids]
+
+def scan_pyserial():
+    from serial.tools import list_ports
+    return [port[0] for port in list_ports.comports() if is_wolksensor_port(port)]
+
+def find_ports(refresh = False):
+    '''
+    Returns sorted list of device names (COMx, /dev/ttyUSBx) of all attached WolkSensor devices
+    '''
+    if os.path.isdir(SYSFS_TTY):
+        signature = tty_signature()
+        if cache['signature'] is None:
+            load_cache()
+        if refresh or signature != cache['signature']:
+            cache['ports'] = scan_sysfs([tty for tty, changed in signature])
+            cache['signature'] = signature
+            save_cache()
+    elif refresh or cache['ports'] is None:
+        cache['ports'] = scan_pyserial()
+
+    return sorted(cache['ports'])
@@ -0,0 +1,193 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Opt-in profiling of the helpers suites spend their time in.
+       install() wraps HOT_PATHS functions of WolkSensor-python-lib
+       (device_test_func, device_wlan_set, serial_func), logging_device and
+       time.sleep, also where suites and harness modules already imported
+       them by name ('from device_test_func import test'). Suites and steps
+       are sections (section()), so every call is recorded under its stack:
+
+           flow_states;offsets;test;send_string_serial_wait;sleep
+
+       For every stack there are call count, inclusive and exclusive wall
+       time and exclusive CPU time; exclusive wall time which is not CPU is
+       I/O wait (serial port, sleeps). CPU time is time.clock() of the
+       process on Linux and macOS, os.times() on Windows (15 ms ticks), so
+       it is exact only summed over many calls.
+
+       write_folded() saves exclusive wall time in microseconds per stack
+       in folded format of flamegraph.pl and speedscope, summary() prints
+       top functions and sections by exclusive time. Calls from other
+       threads (transport reader) are not recorded. Nothing is wrapped and
+       nothing is measured until install() is called.
+
+           profiler.install()
+           with profiler.section('flow_states'):
+               flow_states()
+           profiler.summary()
+           profiler.write_folded('profile.folded')
+'''
+import contextlib
+import functools
+import os
+import sys
+import threading
+import time
+
+HOT_PATHS = [('device_test_func', ['test', 'protocol_parser', 'parse_readings', 'parse_system_reading', 'test_now',
+                                   'wait_dev_state_idle', 'check_argument', 'unwanted_response']),
+             ('device_wlan_set', ['set_wifi_parameters']),
+             ('serial_func', ['send_string_serial_wait', 'receive_string_serial']),
+             ('logging_device', ['log', 'info', 'error', 'debug']),
+             ('time', ['sleep'])]
+SUMMARY_COUNT = 15
+
+# {stack tuple: [calls, inclusive wall, exclusive wall, exclusive cpu]}
+stacks = {}
+sections = set()
+installed = []
+profiled_thread = None
+frames = []
+
+
+if os.name == 'nt':
+    def cpu_time():
+        user, system = os.times()[:2]
+        return user + system
+else:
+    cpu_time = time.clock
+
+
+def harness_modules():
+    '''
+    Modules loaded from the folders harness puts on sys.path
+    '''
+    import harness
+    folders = tuple(os.path.normcase(os.path.normpath(path)) + os.sep for path in harness.PATHS)
+    for module in sys.modules.values():
+        path = getattr(module, '__file__', None)
+        if path and os.path.normcase(os.path.abspath(path)).startswith(folders):
+            yield module
+
+def enter(name):
+    frames.append([name, time.time(), cpu_time(), 0.0, 0.0])
+
+def leave():
+    name, wall_start, cpu_start, child_wall, child_cpu = frames.pop()
+    wall = time.time() - wall_start
+    cpu = cpu_time() - cpu_start
+    stack = tuple(frame[0] for frame in frames) + (name,)
+    entry = stacks.get(stack)
+    if entry is None:
+        entry = stacks[stack] = [0, 0.0, 0.0, 0.0]
+    entry[0] += 1
+    entry[1] += wall
+    entry[2] += wall - child_wall
+    entry[3] += cpu - child_cpu
+    if frames:
+        frames[-1][3] += wall
+        frames[-1][4] += cpu
+
+def wrap(name, function):
+    @functools.wraps(function)
+    def profiled(*args, **kwargs):
+        if threading.current_thread() is not profiled_thread:
+            return function(*args, **kwargs)
+        enter(name)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            leave()
+    profiled.profiled_function = function
+    return profiled
+
+def install(hot_paths = HOT_PATHS):
+    '''
+    Wraps hot path functions, calls from this thread are recorded from now on
+    '''
+    global profiled_thread
+    profiled_thread = threading.current_thread()
+    if installed:
+        return
+    modules = list(harness_modules())
+    for module_name, names in hot_paths:
+        try:
+            source = __import__(module_name)
+        except ImportError:
+            continue
+        for name in names:
+            function = getattr(source, name, None)
+            if function is None or hasattr(function, 'profiled_function'):
+                continue
+            profiled = wrap(name, function)
+            setattr(source, name, profiled)
+            installed.append((source, name, function))
+            # names imported with 'from module import name' before install
+            for module in modules:
+                if module is not source and vars(module).get(name) is function:
+                    setattr(module, name, profiled)
+                    installed.append((module, name, function))
+
+def uninstall():
+    global profiled_thread
+    while installed:
+        module, name, function = installed.pop()
+        setattr(module, name, function)
+    profiled_thread = None
+
+def clear():
+    stacks.clear()
+    sections.clear()
+
+@contextlib.contextmanager
+def section(name):
+    '''
+    Suite or step, time outside wrapped functions is its own exclusive time
+    '''
+    if profiled_thread is None or threading.current_thread() is not profiled_thread:
+        yield
+        return
+    sections.add(name)
+    enter(name)
+    try:
+        yield
+    finally:
+        leave()
+
+def totals():
+    '''
+    {name: [calls, inclusive wall, exclusive wall, exclusive cpu]} summed over stacks,
+    inclusive time of recursive calls is counted once
+    '''
+    result = {}
+    for stack, (calls, inclusive, exclusive, cpu) in stacks.items():
+        name = stack[-1]
+        entry = result.get(name)
+        if entry is None:
+            entry = result[name] = [0, 0.0, 0.0, 0.0]
+        entry[0] += calls
+        if name not in stack[:-1]:
+            entry[1] += inclusive
+        entry[2] += exclusive
+        entry[3] += cpu
+    return result
+
+def write_folded(path):
+    with open(path, 'w') as f:
+        for stack, entry in sorted(stacks.items()):
+            microseconds = int(round(entry[2] * 1e6))
+            if microseconds > 0:
+                f.write("%s %d\n" %(';'.join(stack), microseconds))
+
+def summary(count = SUMMARY_COUNT):
+    rows = totals().items()
+    parts = [('Function', [row for row in rows if row[0] not in sections]),
+             ('Section', [row for row in rows if row[0] in sections])]
+    print '\n\r==========================================================='
+    for title, part in parts:
+        print " %-28s %8s %10s %10s %10s %10s" %(title, 'calls', 'incl s', 'excl s', 'cpu s', 'wait s')
+        for name, (calls, inclusive, exclusive, cpu) in sorted(part, key = lambda row: -row[1][2])[:count]:
+            print " %-28s %8d %10.2f %10.2f %10.2f %10.2f" %(name, calls, inclusive, exclusive, cpu, max(0.0, exclusive - cpu))
+    print '==========================================================='
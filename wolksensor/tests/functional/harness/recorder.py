@@ -0,0 +1,138 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Trace of every serial exchange.
+       Senders and receivers only put (time, direction, raw data, quiet)
+       tuples on a queue, everything else is done later by writer thread:
+       command name, latency since last write, JSONL formatting and console
+       output. Console output is a view over the trace:
+
+           CONSOLE_QUIET  - nothing
+           CONSOLE_SHOWN  - exchanges which are not marked quiet, progress count of quiet ones
+           CONSOLE_ALL    - every exchange
+
+       JSONL record:
+           {"time": 1514824768.123, "port": "COM3", "direction": "tx", "command": "ACQUISITION",
+            "raw": "ACQUISITION;", "latency": null}
+       latency of "rx" record is time since last "tx" record.
+'''
+import json
+import sys
+import threading
+import time
+import Queue
+
+import constants
+
+from device_watchdog import kick
+
+CONSOLE_QUIET = 0
+CONSOLE_SHOWN = 1
+CONSOLE_ALL = 2
+
+TX = 'tx'
+RX = 'rx'
+
+PROGRESS_PERIOD = 0.2
+
+
+def command_name(raw):
+    return raw.strip().split(constants.COMMAND_TERMINATOR, 1)[0].split(constants.COMMAND_ARGUMENT_SEPARATOR, 1)[0]
+
+
+class Trace(object):
+    def __init__(self):
+        self.queue = Queue.Queue()
+        self.thread = None
+        self.port = None
+        self.file = None
+        self.console = CONSOLE_SHOWN
+        self.last_sent = None
+        self.quiet_count = 0
+        self.last_progress = 0
+
+    def start(self, path = None, port = None, console = CONSOLE_SHOWN):
+        '''
+        path None keeps console view only
+        '''
+        self.stop()
+        self.port = port
+        self.console = console
+        self.file = open(path, 'a') if path else None
+        self.thread = threading.Thread(target = self.writer)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        if self.thread:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def sent(self, raw, quiet = False):
+        kick()
+        if self.thread:
+            self.queue.put((time.time(), TX, raw, quiet))
+
+    def received(self, raw, quiet = False):
+        if raw:
+            kick()
+        if raw and self.thread:
+            self.queue.put((time.time(), RX, raw, quiet))
+
+    def writer(self):
+        while True:
+            record = self.queue.get()
+            if record is None:
+                break
+            timestamp, direction, raw, quiet = record
+
+            latency = None
+            if direction == TX:
+                self.last_sent = timestamp
+            elif self.last_sent is not None:
+                latency = timestamp - self.last_sent
+
+            if self.file:
+                self.file.write(json.dumps({'time': timestamp, 'port': self.port, 'direction': direction,
+                                            'command': command_name(raw), 'raw': raw.decode('latin-1'),
+                                            'latency': latency}) + '\n')
+            self.show(timestamp, direction, raw, quiet)
+
+        if self.file:
+            self.file.flush()
+
+    def show(self, timestamp, direction, raw, quiet):
+        if self.console == CONSOLE_QUIET:
+            return
+        if quiet and self.console == CONSOLE_SHOWN:
+            if direction == TX:
+                self.quiet_count += 1
+                if timestamp - self.last_progress >= PROGRESS_PERIOD:
+                    self.last_progress = timestamp
+                    sys.stdout.write("...sending %s %d\r" %(command_name(raw), self.quiet_count))
+            return
+
+        if direction == TX:
+            print "---> Send commands:%s" %raw
+        else:
+            print " <-- Received response: %s" %raw
+
+
+trace = Trace()
+
+def start(path = None, port = None, console = CONSOLE_SHOWN):
+    trace.start(path, port, console)
+
+def stop():
+    trace.stop()
+
+def sent(raw, quiet = False):
+    trace.sent(raw, quiet)
+
+def received(raw, quiet = False):
+    trace.received(raw, quiet)
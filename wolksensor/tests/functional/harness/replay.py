@@ -0,0 +1,248 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Record and replay of serial sessions.
+       Capture sits between device and suites as a pty proxy, so every byte
+       is recorded whichever code path (serial_func, transport, batch) sent
+       or read it. Session file is JSONL in recorder.py format, suite results
+       of the run are appended as last record:
+
+           {"direction": "result", "results": [["data_driven", true], ..], "duration": 812.4}
+
+       Replay plays session back on a pty which is passed to open_serial like
+       any COM port: every command received from the suite is matched to the
+       next recorded command and data recorded after it is written back at
+       once (or after recorded latency with realtime). Commands sent out of
+       recorded order are searched REPLAY_WINDOW commands ahead, commands
+       with different argument (RTC with current time) are answered with
+       response to the same command name. Linux and macOS only.
+'''
+import errno
+import fcntl
+import json
+import os
+import select
+import threading
+import time
+import tty
+import constants
+import recorder
+
+from codec import Record
+
+RESULT = 'result'
+
+REPLAY_WINDOW = 50
+MAX_IDLE = 1.0
+
+
+class Step(Record):
+    __slots__ = ('command', 'chunks')       # chunks: [(latency, data), ..] received after command
+
+
+def load(path):
+    '''
+    Returns (data received before first command, list of Steps, recorded suite results)
+    '''
+    leading = ''
+    steps = []
+    results = None
+    pending = ''
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            if record['direction'] == RESULT:
+                results = [tuple(result) for result in record['results']]
+                continue
+
+            raw = record['raw'].encode('latin-1')
+            if record['direction'] == recorder.TX:
+                commands = (pending + raw).split(constants.COMMAND_TERMINATOR)
+                pending = commands.pop()
+                for command in commands:
+                    steps.append(Step(command.lstrip() + constants.COMMAND_TERMINATOR, []))
+            elif steps:
+                steps[-1].chunks.append((record['latency'] or 0.0, raw))
+            else:
+                leading += raw
+
+    return leading, steps, results
+
+def open_pty():
+    '''
+    Returns (master, slave, port name), master does not block when nobody reads the port
+    '''
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    fcntl.fcntl(master, fcntl.F_SETFL, fcntl.fcntl(master, fcntl.F_GETFL) | os.O_NONBLOCK)
+    return master, slave, os.ttyname(slave)
+
+def write(fd, data):
+    try:
+        os.write(fd, data)
+    except OSError as e:
+        # data is lost as on unread UART
+        if e.errno not in (errno.EAGAIN, errno.EIO):
+            raise
+
+
+class PtyDevice(object):
+    '''
+    Thread serving pty, subclasses implement poll() and receive()
+    '''
+    def __init__(self):
+        self.master = None
+        self.slave = None
+        self.port = None
+        self.wakeup = None
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        '''
+        Returns port name for open_serial
+        '''
+        self.master, self.slave, self.port = open_pty()
+        self.wakeup = os.pipe()
+        self.running = True
+        self.thread = threading.Thread(target = self.run)
+        self.thread.daemon = True
+        self.thread.start()
+        return self.port
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            os.write(self.wakeup[1], 'x')
+            self.thread.join()
+            self.thread = None
+        for fd in (self.master, self.slave) + tuple(self.wakeup or ()):
+            if fd is not None:
+                os.close(fd)
+        self.master = self.slave = self.wakeup = None
+
+    def files(self):
+        return [self.master, self.wakeup[0]]
+
+    def run(self):
+        while self.running:
+            readable = select.select(self.files(), [], [], MAX_IDLE)[0]
+            if self.wakeup[0] in readable:
+                os.read(self.wakeup[0], 512)
+            if self.master in readable:
+                try:
+                    data = os.read(self.master, 1024)
+                except OSError:
+                    data = ''
+                if data:
+                    self.receive(data)
+            self.poll(readable)
+
+    def poll(self, readable):
+        pass
+
+    def receive(self, data):
+        raise NotImplementedError
+
+
+class Capture(PtyDevice):
+    def __init__(self, device_port, path, baudrate = constants.BAUDRATE):
+        PtyDevice.__init__(self)
+        self.device_port = device_port
+        self.path = path
+        self.baudrate = baudrate
+        self.device = None
+        self.trace = recorder.Trace()
+
+    def start(self):
+        import serial
+        self.device = serial.Serial(self.device_port, self.baudrate, timeout = 0)
+        # session file holds one run
+        open(self.path, 'w').close()
+        self.trace.start(self.path, self.device_port, recorder.CONSOLE_QUIET)
+        return PtyDevice.start(self)
+
+    def stop(self, results = None, duration = None):
+        PtyDevice.stop(self)
+        self.trace.stop()
+        self.device.close()
+        if results is not None:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps({'direction': RESULT, 'results': results, 'duration': duration}) + '\n')
+
+    def files(self):
+        return PtyDevice.files(self) + [self.device.fileno()]
+
+    def receive(self, data):
+        self.trace.sent(data)
+        self.device.write(data)
+
+    def poll(self, readable):
+        if self.device.fileno() in readable:
+            waiting = getattr(self.device, 'in_waiting', None)
+            if waiting is None:
+                waiting = self.device.inWaiting()
+            data = self.device.read(waiting or 1)
+            if data:
+                self.trace.received(data)
+                write(self.master, data)
+
+
+class Replay(PtyDevice):
+    def __init__(self, path, realtime = False):
+        PtyDevice.__init__(self)
+        self.path = path
+        self.realtime = realtime
+        self.leading, self.steps, self.results = load(path)
+        self.position = 0
+        self.command_string = ''
+        self.matched = 0
+        self.substituted = 0
+        self.skipped = 0
+        self.unmatched = []
+
+    def start(self):
+        port = PtyDevice.start(self)
+        write(self.master, self.leading)
+        return port
+
+    def receive(self, data):
+        self.command_string += data
+        while constants.COMMAND_TERMINATOR in self.command_string:
+            command, self.command_string = self.command_string.split(constants.COMMAND_TERMINATOR, 1)
+            self.answer(command.lstrip() + constants.COMMAND_TERMINATOR)
+
+    def find(self, match):
+        for index in range(self.position, min(len(self.steps), self.position + REPLAY_WINDOW)):
+            if match(self.steps[index].command):
+                return index
+        return None
+
+    def answer(self, command):
+        index = self.find(lambda recorded: recorded == command)
+        if index is not None:
+            self.matched += 1
+        else:
+            index = self.find(lambda recorded: recorder.command_name(recorded) == recorder.command_name(command))
+            if index is None:
+                self.unmatched.append(command)
+                return
+            self.substituted += 1
+
+        self.skipped += index - self.position
+        self.position = index + 1
+        self.play(self.steps[index])
+
+    def play(self, step):
+        if not self.realtime:
+            write(self.master, ''.join(data for latency, data in step.chunks))
+            return
+        start = time.time()
+        for latency, data in step.chunks:
+            time.sleep(max(0.0, latency - (time.time() - start)))
+            write(self.master, data)
+
+    def summary(self):
+        return {'matched': self.matched, 'substituted': self.substituted, 'skipped': self.skipped,
+                'unmatched': len(self.unmatched), 'not_replayed': len(self.steps) - self.position}
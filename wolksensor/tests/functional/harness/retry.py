@@ -0,0 +1,73 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Bounded retries with exponential backoff.
+       Replaces 'while not command(): pass' loops, which hang the station
+       forever when device is stuck. Function is called until its result
+       is accepted, at most 'attempts' times and not after 'deadline'
+       seconds; delay between attempts starts at 'delay' and is doubled
+       up to 'max_delay'.
+
+           if not retry(apply, profile):
+               ...
+           response = retry(test_now, '', '', accept = lambda response: response == True)
+'''
+import time
+import constants
+import logging_device
+
+from device_watchdog import kick
+
+
+class RetryPolicy(object):
+    def __init__(self, attempts = constants.RETRY_ATTEMPTS, delay = constants.RETRY_DELAY, backoff = 2.0,
+                 max_delay = constants.RETRY_MAX_DELAY, deadline = constants.RETRY_DEADLINE):
+        self.attempts = attempts
+        self.delay = delay
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def delays(self):
+        '''
+        Delays before second, third, .. attempt
+        '''
+        delay = self.delay
+        for attempt in range(self.attempts - 1):
+            yield min(delay, self.max_delay)
+            delay *= self.backoff
+
+    def run(self, function, *args, **kwargs):
+        '''
+        Returns result of first accepted call, or result of last call when attempts or deadline run out
+        '''
+        accept = kwargs.pop('accept', bool)
+        name = getattr(function, '__name__', repr(function))
+        deadline = time.time() + self.deadline
+        delays = self.delays()
+
+        attempts = 0
+        while True:
+            result = function(*args)
+            attempts += 1
+            kick()
+            if accept(result):
+                return result
+            delay = next(delays, None)
+            if delay is None or time.time() + delay > deadline:
+                break
+            logging_device.debug("%s%r not accepted: %r, attempt %d in %.1fs" %(name, args, result, attempts + 1, delay))
+            time.sleep(delay)
+
+        logging_device.error("%s%r not accepted after %d attempt(s): %r" %(name, args, attempts, result))
+        return result
+
+
+DEFAULT_POLICY = RetryPolicy()
+
+def retry(function, *args, **kwargs):
+    '''
+    DEFAULT_POLICY.run(), policy = RetryPolicy(..) keyword argument selects another policy
+    '''
+    return kwargs.pop('policy', DEFAULT_POLICY).run(function, *args, **kwargs)
@@ -0,0 +1,276 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Wrap and overflow verification of device buffers.
+       Buffer is filled with tagged entries, one after another as fast as
+       device takes them, beyond its capacity and read back:
+
+           READINGS - sensor_readings_buffer, 150 readings, ACQUISITION per entry.
+                      Does not wrap, readings acquired while it is full are
+                      rejected and the oldest ones are kept
+           SYSTEM   - system_buffer, 60 items, NOW cycle per entry. Wraps,
+                      oldest item is dropped when a new one is added
+
+       Entry is tagged by device RTC: before entry n RTC is set to
+       TAG_BASE + n * TAG_STEP, so timestamp of the reading or SYSTEM item
+       tells which entry it is. Read back buffer is checked for capacity,
+       eviction order (which entries were kept), timestamp order and framing
+       of the response, which firmware streams in parts from start_position
+       on: header once, items separated by '|' and ';' only at the end.
+       Fill (entries per second) and drain (response bytes per second) rates
+       are reported.
+
+       NOW cycles have to fail, device Wi-Fi has to be set to unreachable AP
+       before SYSTEM buffer is filled, otherwise successful cycle sends and
+       removes the items.
+'''
+import time
+import constants
+import logging_device
+import recorder
+
+from batch import frame
+from codec import Record
+from codec import decode
+from retry import retry
+from serial_func import receive_string_serial
+from serial_func import send_string_serial_wait
+
+TAG_BASE = int(constants.RTC)
+TAG_STEP = 3600                 # seconds, longer than any entry takes
+OVERFILL = 10                   # entries sent beyond buffer capacity
+ACCEPT_TIMEOUT = 1.0            # 'STATUS ACQUISITION;' not seen within it, acquisition was rejected
+
+
+class BufferSpec(Record):
+    __slots__ = ('name', 'size', 'wrap', 'command', 'timeout')
+
+
+READINGS_BUFFER = BufferSpec('READINGS', constants.SENSOR_READINGS_BUFFER_SIZE, False, 'ACQUISITION', constants.RESPONSE_TIMEOUT)
+SYSTEM_BUFFER = BufferSpec('SYSTEM', constants.SYSTEM_BUFFER_SIZE, True, 'NOW', constants.STATUS_TIMEOUT)
+
+BUFFERS = {'readings': READINGS_BUFFER, 'system': SYSTEM_BUFFER}
+
+
+class Link(object):
+    '''
+    serial_func with framing which keeps STATUS notifications apart from responses
+    and does not lose data received after the awaited message
+    '''
+    def __init__(self, send = send_string_serial_wait, receive = receive_string_serial):
+        self.send_function = send
+        self.receive_function = receive
+        self.rest = ''
+        self.messages = []
+        self.notifications = []
+
+    def send(self, string):
+        recorder.sent(string, quiet = True)
+        self.send_function(string)
+
+    def receive(self):
+        '''
+        Returns number of bytes received
+        '''
+        received = self.receive_function()
+        if not received:
+            time.sleep(0.01)
+            return 0
+        recorder.received(received, quiet = True)
+        messages, self.rest = frame(self.rest + received)
+        for message in messages:
+            message = message.lstrip()
+            if message.startswith('STATUS '):
+                self.notifications.append(message)
+            else:
+                self.messages.append(message)
+        return len(received)
+
+    def request(self, string, timeout = constants.RESPONSE_TIMEOUT):
+        '''
+        Returns (responses, seconds until last one, bytes received)
+        '''
+        del self.messages[:]
+        expected = string.count(constants.COMMAND_TERMINATOR)
+        size = 0
+        start = time.time()
+        self.send(string)
+        while len(self.messages) < expected and time.time() - start < timeout:
+            size += self.receive()
+        responses = self.messages[:expected]
+        del self.messages[:expected]
+        return responses, time.time() - start, size
+
+    def wait_notification(self, status, seen, timeout):
+        '''
+        Waits for status notification which came after first 'seen' ones
+        '''
+        deadline = time.time() + timeout
+        while status not in self.notifications[seen:]:
+            if time.time() >= deadline:
+                return False
+            self.receive()
+        return True
+
+
+def tag(index):
+    return TAG_BASE + index * TAG_STEP
+
+def entry(timestamp):
+    return (timestamp - TAG_BASE) // TAG_STEP
+
+def set_tag(link, index):
+    '''
+    Returns False when device was busy, after it returned to IDLE
+    '''
+    seen = len(link.notifications)
+    responses, seconds, size = link.request("RTC %d;" %tag(index))
+    if responses == [constants.BUSY]:
+        # periodic acquisition or heartbeat cycle
+        link.wait_notification('STATUS IDLE;', seen, constants.STATUS_TIMEOUT)
+        return False
+    return True
+
+def add_entry(link, spec, index):
+    '''
+    Sets RTC to tag of entry and runs spec.command. Returns True when entry was added
+    '''
+    if not retry(set_tag, link, index):
+        logging_device.error("Entry %d: RTC not set" %index)
+        return False
+
+    seen = len(link.notifications)
+    responses, seconds, size = link.request(spec.command + constants.COMMAND_TERMINATOR)
+    if responses != [constants.DONE]:
+        logging_device.error("Entry %d: %s not executed. Received: %s" %(index, spec.command, ''.join(responses)))
+        return False
+
+    if spec.command == 'ACQUISITION':
+        # full readings buffer rejects acquisition, device stays idle
+        if not link.wait_notification('STATUS ACQUISITION;', seen, ACCEPT_TIMEOUT):
+            return False
+    if not link.wait_notification('STATUS IDLE;', seen, spec.timeout):
+        logging_device.error("Entry %d: device did not return to IDLE" %index)
+        return False
+    return True
+
+def fill(link, spec, count):
+    '''
+    Returns (indexes of entries added, seconds)
+    '''
+    added = []
+    start = time.time()
+    for index in range(count):
+        if add_entry(link, spec, index):
+            added.append(index)
+    return added, time.time() - start
+
+def framing(message, name):
+    '''
+    Problems of response streamed in parts: header once, ';' only at the end, no empty item
+    '''
+    problems = []
+    if message.count(name) != 1 or not message.startswith(name):
+        problems.append("%s header found %d times" %(name, message.count(name)))
+    if message.count(constants.COMMAND_TERMINATOR) != 1 or not message.endswith(constants.COMMAND_TERMINATOR):
+        problems.append("';' found %d times" %message.count(constants.COMMAND_TERMINATOR))
+    body = message[len(name):].strip(' ' + constants.COMMAND_TERMINATOR)
+    if body and '' in body.split('|'):
+        problems.append("empty item, parts joined without item or with two separators")
+    return problems
+
+def expected_entries(spec, sent, untagged = 0):
+    '''
+    Entries which have to be in the buffer after entries 0..sent-1 were sent, untagged items
+    (periodic acquisition, heartbeat cycle) take their place in the buffer
+    '''
+    capacity = spec.size - untagged
+    if sent <= capacity:
+        return range(sent)
+    if spec.wrap:
+        return range(sent - capacity, sent)
+    return range(capacity)
+
+def verify(spec, sent, items, message):
+    '''
+    Returns list of problems, empty when buffer behaved
+    '''
+    problems = framing(message, spec.name)
+
+    if len(items) != min(sent, spec.size):
+        problems.append("capacity: %d items after %d entries, expected %d" %(len(items), sent, min(sent, spec.size)))
+
+    timestamps = [item.timestamp for item in items]
+    for position in range(1, len(timestamps)):
+        if timestamps[position] < timestamps[position - 1]:
+            problems.append("order: item %d R:%d older than item %d R:%d" %(position, timestamps[position],
+                                                                             position - 1, timestamps[position - 1]))
+    if len(timestamps) != len(set(timestamps)):
+        problems.append("duplicate items, part of the response sent twice")
+
+    # item which is not an entry has the tag of the entry before it
+    entries = sorted(set(entry(timestamp) for timestamp in timestamps))
+    untagged = len(set(timestamps)) - len(entries)
+    if untagged:
+        logging_device.info("%d item(s) added by device during the fill" %untagged)
+
+    expected = expected_entries(spec, sent, untagged)
+    rule = "oldest have to be dropped" if spec.wrap else "newest have to be rejected"
+    missing = sorted(set(expected) - set(entries))
+    unexpected = sorted(set(entries) - set(expected))
+    if missing:
+        problems.append("eviction: entries %s missing, %s" %(missing[:10], rule))
+    if unexpected:
+        problems.append("eviction: entries %s kept, %s" %(unexpected[:10], rule))
+
+    return problems
+
+def drain(link, spec):
+    '''
+    Reads buffer without clearing it. Returns (items, message, seconds, bytes)
+    '''
+    responses, seconds, size = link.request(spec.name + constants.COMMAND_TERMINATOR)
+    if not responses:
+        logging_device.error("%s not received" %spec.name)
+        return [], '', seconds, size
+    try:
+        items = decode(responses[0])
+    except ValueError as e:
+        logging_device.error("%s" %e)
+        items = []
+    return items, responses[0], seconds, size
+
+def check_buffer(spec, overfill = OVERFILL, link = None):
+    '''
+    Clears buffer, fills it with spec.size + overfill tagged entries and checks it.
+    Device RTC is restored at the end. Returns result dict, 'problems' is empty when buffer behaved
+    '''
+    link = link or Link()
+    logging_device.info("\n\r\t\t-------- %s buffer, %d entries into %d --------" %(spec.name, spec.size + overfill, spec.size))
+
+    responses, seconds, size = link.request('RTC;')
+    rtc = int(responses[0][len('RTC'):].strip(' ;')) if responses and responses[0].startswith('RTC ') else None
+    started = time.time()
+
+    link.request(spec.name + ' CLEAR;')
+    sent = spec.size + overfill
+    added, fill_seconds = fill(link, spec, sent)
+    items, message, drain_seconds, drain_size = drain(link, spec)
+    problems = verify(spec, sent, items, message)
+    link.request(spec.name + ' CLEAR;')
+
+    if rtc is not None:
+        link.request("RTC %d;" %(rtc + int(time.time() - started)))
+
+    result = {'buffer': spec.name, 'size': spec.size, 'sent': sent, 'added': len(added), 'items': len(items),
+              'fill_seconds': fill_seconds, 'fill_rate': len(added) / fill_seconds if fill_seconds else None,
+              'drain_seconds': drain_seconds, 'drain_bytes': drain_size,
+              'drain_rate': drain_size / drain_seconds if drain_seconds else None, 'problems': problems}
+
+    logging_device.info("Added %d of %d entries in %.1fs (%.1f entries/s), read %d items, %d bytes in %.2fs (%.0f B/s)" \
+                        %(len(added), sent, fill_seconds, result['fill_rate'] or 0, len(items), drain_size, drain_seconds,
+                          result['drain_rate'] or 0))
+    for problem in problems:
+        logging_device.error("%s buffer %s" %(spec.name, problem))
+    return result
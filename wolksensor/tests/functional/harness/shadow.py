@@ -0,0 +1,136 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Device configuration shadow.
+       Configuration is read from the device once, in one batch, and kept
+       in sync from every response that passes through batch.send_batch().
+       apply() writes only the fields which differ from the shadow, in one
+       batch, so a suite can state the configuration it needs without paying
+       a round trip and a flash write for values the device already has.
+
+           apply([('SSID', constants.SSID), ('AUTH', constants.AUTH), ('PASS', constants.PASS), ('MOVEMENT', 'OFF')])
+
+       Writes done around the shadow (device_test_func.test(), protocol_parser())
+       have to be followed by forget() of the fields they change.
+'''
+import constants
+import logging_device
+
+from batch import accepted
+from batch import response_observers
+from batch import send_batch
+from codec import split
+
+# read order, AUTH comes before PASS because WEP password is checked against AUTH
+CONFIG_COMMANDS = ['SSID', 'AUTH', 'PASS', 'URL', 'PORT', 'HEARTBEAT', 'MOVEMENT', 'ATMO',
+                   'STATIC_IP', 'STATIC_MASK', 'STATIC_GATEWAY', 'STATIC_DNS',
+                   'TEMP_OFFSET', 'HUMIDITY_OFFSET', 'PRESSURE_OFFSET']
+
+# other fields changed on the device by a write, also when the write is a Data Driven vector
+# sent around apply(); a read with the same response only makes the fields read again
+SIDE_EFFECTS = {('STATIC_IP', 'OFF'): ['STATIC_MASK', 'STATIC_GATEWAY', 'STATIC_DNS'],
+                ('OFFSET_FACTORY', 'RESET'): ['TEMP_OFFSET', 'HUMIDITY_OFFSET', 'PRESSURE_OFFSET']}
+
+
+def normalize(command, value):
+    '''
+    Value as device reports it in response: normalize('SSID', 'NULL') -> '', normalize('TEMP_OFFSET', '1') -> '1.0'
+    '''
+    value = str(value)
+    if command in ('SSID', 'PASS') and value == 'NULL':
+        return ''
+    if command in ('TEMP_OFFSET', 'HUMIDITY_OFFSET', 'PRESSURE_OFFSET'):
+        try:
+            return "%.1f" %float(value)
+        except ValueError:
+            return value
+    if command in ('PORT', 'HEARTBEAT'):
+        try:
+            return str(int(value))
+        except ValueError:
+            return value
+    return value
+
+
+class ConfigShadow(object):
+    def __init__(self):
+        self.values = {}
+        self.writes_saved = 0
+
+    def observe(self, responses):
+        '''
+        Updates shadow from 'NAME value;' responses, others are ignored
+        '''
+        for response in responses:
+            try:
+                name, argument = split(response)
+            except ValueError:
+                continue
+            if name in CONFIG_COMMANDS:
+                self.values[name] = argument
+            for field in SIDE_EFFECTS.get((name, normalize(name, argument)), []):
+                self.forget(field)
+
+    def forget(self, *commands):
+        '''
+        forget() with no arguments drops whole shadow, it is read again on next apply()
+        '''
+        if not commands:
+            self.values.clear()
+        for command in commands:
+            self.values.pop(command, None)
+
+    def read(self, commands = CONFIG_COMMANDS):
+        missing = [command for command in commands if command not in self.values]
+        if missing:
+            # responses reach observe() through send_batch
+            send_batch([(command, None) for command in missing])
+        return dict((command, self.values.get(command)) for command in commands)
+
+    def differences(self, profile):
+        '''
+        profile: list of (command, value) pairs in order they have to be written
+        '''
+        # whole configuration is read on first use and after forget()
+        self.read(CONFIG_COMMANDS if not self.values else [command for command, value in profile])
+        return [(command, value) for command, value in profile if self.values.get(command) != normalize(command, value)]
+
+    def apply(self, profile):
+        '''
+        Writes fields of profile which differ from the shadow. Returns True if device accepted all of them
+        '''
+        writes = self.differences(profile)
+        self.writes_saved += len(profile) - len(writes)
+        if not writes:
+            logging_device.debug("Configuration already applied: %s" %', '.join("%s %s" %pair for pair in profile))
+            return True
+
+        results = send_batch(writes)
+
+        response = True
+        for (command, value), responses in zip(writes, results):
+            if not accepted(command, responses):
+                logging_device.error("%s %s not applied. Received: %s" %(command, value, ''.join(responses)))
+                self.forget(command)
+                response = False
+            for field in SIDE_EFFECTS.get((command, normalize(command, value)), []):
+                self.forget(field)
+
+        return response
+
+
+shadow = ConfigShadow()
+response_observers.append(shadow.observe)
+
+def apply(profile):
+    return shadow.apply(profile)
+
+def wifi_profile(ssid, auth, password):
+    return [('SSID', ssid), ('AUTH', auth), ('PASS', password)]
+
+def server_profile(url = constants.URL, port = constants.PORT):
+    return [('URL', url), ('PORT', port)]
+
+def forget(*commands):
+    shadow.forget(*commands)
@@ -0,0 +1,104 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Sharding of one suite across a pool of devices.
+       Suite is split into independent shards, (name, cost) pairs of
+       data_driven.data_driven_shards(): vector group of every command,
+       STATIC_* block, offset block, read only parameters, READINGS and
+       SYSTEM checks. assign() gives the longest shard to the device with
+       least work so far until all shards are given out; cost is measured
+       duration from the report of the previous run when known, number of
+       commands scaled to seconds otherwise.
+
+       Every device runs its shards as checkpoint.run_steps() steps, so the
+       configuration a shard needs is applied before it, and saves results
+       and durations to its own checkpoint file. merge() puts checkpoint
+       files of all devices into one report:
+
+           {'passed': True, 'wall': 41.2, 'busy': 152.7, 'speedup': 3.7,
+            'shards': {'SSID': {'device': 'COM3', 'result': True, 'duration': 6.1}, ...},
+            'devices': {'COM3': {'shards': ['SSID', ...], 'duration': 40.8}, ...},
+            'failed_vectors': [['PORT', 'PORT', '65536'], ...]}
+'''
+import json
+import os
+
+
+def weights(shards, durations = None):
+    '''
+    shards: [(name, cost)], durations: {name: seconds} of previous run. Returns {name: seconds}
+    '''
+    durations = durations or {}
+    known = [(durations[name], cost) for name, cost in shards if durations.get(name) is not None]
+    known_cost = sum(cost for duration, cost in known)
+    scale = sum(duration for duration, cost in known) / known_cost if known_cost else 1.0
+    return dict((name, durations[name] if durations.get(name) is not None else cost * scale) for name, cost in shards)
+
+def assign(shards, count, durations = None):
+    '''
+    Returns list of shard name lists, one for each of count devices, shards of a device are in suite order.
+    Devices left without shards get empty lists
+    '''
+    weight = weights(shards, durations)
+    order = dict((name, index) for index, (name, cost) in enumerate(shards))
+    loads = [0.0] * count
+    devices = [[] for index in range(count)]
+    for name in sorted(weight, key = lambda name: (-weight[name], order[name])):
+        device = loads.index(min(loads))
+        devices[device].append(name)
+        loads[device] += weight[name]
+    return [sorted(names, key = order.get) for names in devices]
+
+def durations(path):
+    '''
+    {shard name: seconds} from report of previous run, empty when there is none
+    '''
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        report = json.load(f)
+    return dict((name, shard['duration']) for name, shard in report['shards'].items() if shard['result'] is not None)
+
+def merge(suite, devices, wall):
+    '''
+    devices: [(device, shard names, checkpoint path, duration)]. Shards which did not finish have result None
+    '''
+    report = {'suite': suite, 'wall': wall, 'shards': {}, 'devices': {}, 'failed_vectors': []}
+    for device, names, path, duration in devices:
+        steps = {}
+        vectors = []
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            steps = data['steps']
+            vectors = data['vectors']
+        for name in names:
+            step = steps.get(suite + '/' + name, {})
+            report['shards'][name] = {'device': device, 'result': step.get('result'), 'duration': step.get('duration')}
+        report['devices'][device] = {'shards': names, 'duration': duration}
+        report['failed_vectors'] += [vector[:3] for vector in vectors if not vector[3]]
+
+    report['failed_vectors'].sort()
+    report['passed'] = len(report['shards']) > 0 and all(shard['result'] for shard in report['shards'].values())
+    report['busy'] = sum(shard['duration'] or 0.0 for shard in report['shards'].values())
+    # time one device would need for the same shards, relative to wall clock time of the pool
+    report['speedup'] = report['busy'] / wall if wall else None
+    return report
+
+def save(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent = 2, sort_keys = True)
+
+def summary(report):
+    print '\n\r==========================================================='
+    for device in sorted(report['devices']):
+        entry = report['devices'][device]
+        shards = ', '.join("%s:%s" %(name, {True: 'PASS', False: 'FAIL'}.get(report['shards'][name]['result'], 'NOT RUN'))
+                           for name in entry['shards'])
+        print " %-14s %7.1fs  %s" %(device, entry['duration'], shards)
+    print " %s %s in %.1fs, %.1fs of shards, speedup %.1f" %(report['suite'], 'PASSED' if report['passed'] else 'FAILED',
+                                                              report['wall'], report['busy'], report['speedup'] or 0.0)
+    for vector in report['failed_vectors']:
+        print "   failed: %s %r" %(vector[1], vector[2])
+    print '==========================================================='
@@ -0,0 +1,623 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Discrete-event fleet simulation of heartbeat and power management.
+       Every sensor follows the rules of SDK/application/wolksensor.c in
+       virtual time:
+           - reading is acquired every minute while ATMO is ON and readings
+             buffer (150) is not full, readings acquired while it is full are lost
+           - heartbeat_timer counts minutes and device connects when it reaches
+             current heartbeat, start_heartbeat() keeps the phase of the timer
+             (timer is uint16_t and wraps around when it passes the heartbeat)
+           - movement (MOVEMENT ON) is stored as reading and sounded as alarm,
+             alarm which was not sounded is retried on next acquisitions up to
+             MAX_ALARM_RETRIES times, alarm raised while connected waits for them
+           - two failed connections in a row on battery double heartbeat up to
+             MAX_NO_CONNECTION_HEARTBEAT, successful connection restores it
+           - device with empty battery is out of service, readings left in its
+             buffer are not delivered
+       Online time of connections and share of failed ones come from SYSTEM
+       items (A:/D:/S:/Q:/L:/C:) collected by analytics.py (phases.PhaseStore),
+       default model follows the emulator. Energy is counted with PowerModel,
+       its defaults are planning values until they are measured on devices.
+
+       Sensors share nothing, so each one is simulated on its own, with its
+       own random generator; next event is the earliest of heartbeat, alarm
+       retry and movement. Minute acquisitions are not events, readings
+       acquired between two events are added as one run of consecutive
+       minutes. Successful heartbeat cycles between two failures are all
+       the same after the first one and are added at once, with mean online
+       time of successful connections. With MOVEMENT ON every movement
+       between them connects at once: movements are counted from their
+       exponential intervals and a reading is delivered by the next movement
+       or heartbeat, whichever comes first, so its latency is added as
+       expected counts (movement_latencies()) instead of event by event.
+'''
+import math
+import random
+import sys
+import constants
+
+from codec import Record
+from streaming import percentile
+from phases import PHASES
+
+MINUTE = 60
+MAX_ALARM_RETRIES = 2                   # wolksensor.h
+HEARTBEAT_TIMER_RANGE = 1 << 16         # heartbeat_timer is uint16_t
+WIFI_CONNECTING_TIMEOUT = 20            # wifi_communication_module.c, connection to AP which is not there
+LATENCY_BINS = 14 * 24 * 60             # minutes, longer latencies are counted together
+DEFAULT_FAILURE_RATE = 0.02
+MOVEMENT_INTERVAL = 30                  # minutes, mean time between movements
+NEVER = float('inf')
+
+# (heartbeat, movement interval, online): movement_latencies() of the configuration
+latency_cache = {}
+
+
+class PowerModel(Record):
+    '''
+    capacity in mAh, currents in mA, acquisition_charge in mAs (one acquisition or movement wake up)
+    '''
+    __slots__ = ('capacity', 'sleep_current', 'movement_current', 'acquisition_charge', 'online_current')
+
+
+DEFAULT_POWER = PowerModel(2600.0, 0.05, 0.01, 0.5, 120.0)
+
+
+class Configuration(Record):
+    '''
+    heartbeat in minutes, movement and atmo True when ON
+    '''
+    __slots__ = ('heartbeat', 'movement', 'atmo')
+
+    def name(self):
+        return "HB%d MOVEMENT %s ATMO %s" %(self.heartbeat, 'ON' if self.movement else 'OFF', 'ON' if self.atmo else 'OFF')
+
+
+class PhaseModel(object):
+    '''
+    Online seconds of successful and of failed connections, and share of failed ones
+    '''
+    def __init__(self, successful, failed, failure_rate):
+        self.successful = successful
+        self.failed = failed
+        self.failure_rate = failure_rate
+        self.mean_successful = float(sum(successful)) / len(successful)
+
+    @classmethod
+    def default(cls, failure_rate = DEFAULT_FAILURE_RATE):
+        # emulator connection_plan(): AP 1-4 s, DHCP 1-3 s, server 1-3 s, exchange 1 s, disconnect 1 s
+        successful = [ap + dhcp + server + 2 for ap in range(1, 5) for dhcp in range(1, 4) for server in range(1, 4)]
+        return cls(successful, [WIFI_CONNECTING_TIMEOUT + 1], failure_rate)
+
+    @classmethod
+    def from_store(cls, store, version = None, failure_rate = None):
+        '''
+        Model from phases.PhaseStore items of firmware version (all when None). None when there is no successful cycle
+        '''
+        successful = []
+        failed = []
+        for row in store.rows():
+            if version and row['version'] != version:
+                continue
+            # C: is left out when it is zero
+            online = row['connection_time'] or sum(row[column] or 0 for column in PHASES[:-1])
+            (failed if row['error'] else successful).append(online)
+        if not successful:
+            return None
+        if failure_rate is None:
+            failure_rate = float(len(failed)) / (len(failed) + len(successful))
+        return cls(successful, failed or [WIFI_CONNECTING_TIMEOUT + 1], failure_rate)
+
+
+class LatencyHistogram(object):
+    '''
+    Delivered readings per minute of latency. Run of readings a minute apart covers consecutive
+    minutes and is added as a difference, in one step whatever its length
+    '''
+    def __init__(self, bins = LATENCY_BINS):
+        self.bins = bins
+        self.steps = [0] * (bins + 1)
+        self.overflow = 0
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, newest, count, step = MINUTE, repeat = 1):
+        '''
+        count readings step seconds apart, newest of them delivered newest seconds after it was acquired
+        '''
+        self.count += count * repeat
+        self.total += (count * newest + step * count * (count - 1) / 2.0) * repeat
+        first = int(newest // MINUTE)
+        last = first + (count if step else 1)
+        if last > self.bins:
+            self.overflow += (last - max(first, self.bins)) * repeat
+            last = self.bins
+        if first < last:
+            self.steps[first] += repeat
+            self.steps[last] -= repeat
+
+    def add_expected(self, weights, total, repeat = 1):
+        '''
+        weights[minute]: expected readings delivered within that minute of latency, total: their expected latency in seconds
+        '''
+        self.count += sum(weights) * repeat
+        self.total += total * repeat
+        for minute, weight in enumerate(weights):
+            if minute >= self.bins:
+                self.overflow += weight * repeat
+                continue
+            self.steps[minute] += weight * repeat
+            self.steps[minute + 1] -= weight * repeat
+
+    def percentile(self, fraction):
+        '''
+        Minutes within which fraction of readings was delivered, None above histogram range
+        '''
+        if not self.count:
+            return None
+        needed = fraction * self.count
+        found = 0
+        height = 0
+        for minute in range(self.bins):
+            height += self.steps[minute]
+            found += height
+            if found >= needed:
+                return minute + 1
+        return None
+
+    def maximum(self):
+        if self.overflow:
+            return None
+        height = 0
+        last = None
+        for minute in range(self.bins):
+            height += self.steps[minute]
+            # expected counts leave rounding errors, not readings
+            if height > 1e-6:
+                last = minute + 1
+        return last
+
+    def mean(self):
+        return self.total / self.count / MINUTE if self.count else None
+
+
+def movement_latencies(heartbeat, interval, online):
+    '''
+    (weights, total) of LatencyHistogram.add_expected() for the readings of one heartbeat cycle with MOVEMENT ON.
+    Reading acquired d seconds before the next heartbeat is delivered min(E, d) + online seconds after it was
+    acquired, E is exponential time to the next movement with mean interval seconds
+    '''
+    key = (heartbeat, interval, online)
+    if key in latency_cache:
+        return latency_cache[key]
+
+    rate = 1.0 / interval
+    weights = [0.0] * (int(((heartbeat - 1) * MINUTE + online) // MINUTE) + 1)
+    total = 0.0
+    for minute in range(heartbeat):
+        before = minute * MINUTE
+        survive = math.exp(-rate * before)
+        # no movement before the heartbeat
+        weights[int((before + online) // MINUTE)] += survive
+        # movement after lo and before hi seconds puts the reading into minute index
+        for index in range(int(online // MINUTE), len(weights)):
+            lo = max(0.0, index * MINUTE - online)
+            hi = min(float(before), (index + 1) * MINUTE - online)
+            if hi > lo:
+                weights[index] += math.exp(-rate * lo) - math.exp(-rate * hi)
+        total += online + (1.0 - survive) / rate
+
+    latency_cache[key] = weights, total
+    return weights, total
+
+
+class Sensor(object):
+    def __init__(self, configuration, model, power, usb, movement_interval, horizon, histogram, generator):
+        '''
+        movement_interval: mean minutes between movements, horizon: seconds simulated
+        '''
+        self.configuration = configuration
+        self.model = model
+        self.power = power
+        self.usb = usb
+        self.movement_interval = movement_interval * MINUTE if configuration.movement else None
+        self.horizon = horizon
+        self.histogram = histogram
+        self.random = generator
+        self.system_heartbeat = configuration.heartbeat
+        self.base_current = power.sleep_current + (power.movement_current if configuration.movement else 0)
+
+        self.time = 0.0
+        self.readings = []              # runs of readings in buffer, (first timestamp, count, step)
+        self.size = 0
+        self.acquired_tick = -1         # minute 0 is the acquisition on power on
+        # power on, first connection a minute later
+        self.current_heartbeat = 1
+        self.timer_tick = 0             # minute at which heartbeat_timer was timer_value
+        self.timer_value = 0
+        self.no_connection_count = 0
+        self.no_connection_heartbeat = self.system_heartbeat
+        self.unsounded = False
+        self.alarm_retries = 0
+        self.pending = False
+        self.brownout = None
+        self.successes = self.draw_successes()
+        self.next_movement = self.draw_movement(0.0)
+
+        self.acquisitions = 0
+        self.movements = 0
+        self.online = 0.0
+        self.connections = 0
+        self.failed = 0
+        self.delivered = 0
+        self.lost = 0
+        self.peak = 0
+        self.system = 0
+        self.system_dropped = 0
+        self.stalled = False
+
+    # ------------------------------------------------------------------ random
+
+    def draw_successes(self):
+        '''
+        Successful connections before the next failed one
+        '''
+        if self.model.failure_rate <= 0:
+            return sys.maxint
+        if self.model.failure_rate >= 1:
+            return 0
+        return int(math.log(1.0 - self.random.random()) / math.log(1.0 - self.model.failure_rate))
+
+    def draw_movement(self, moment):
+        if not self.movement_interval:
+            return NEVER
+        return moment + self.random.expovariate(1.0 / self.movement_interval)
+
+    def count_movements(self, cycles, cycle, successes):
+        '''
+        Returns (cycles, movements): heartbeat cycles after the first one, up to cycles, whose connections and the
+        connections of movements between them stay within successes. Intervals are exponential, so movements
+        do not depend on the last one
+        '''
+        movements = 0
+        elapsed = self.random.expovariate(1.0 / self.movement_interval)
+        for index in range(cycles):
+            count = 0
+            while elapsed < (index + 1) * cycle:
+                count += 1
+                elapsed += self.random.expovariate(1.0 / self.movement_interval)
+            if index + 1 + movements + count > successes:
+                return index, movements
+            movements += count
+        return cycles, movements
+
+    # ------------------------------------------------------------------ buffers and energy
+
+    def acquire_until(self, moment):
+        tick = int(moment // MINUTE)
+        count = tick - self.acquired_tick
+        if count <= 0:
+            return
+        first = (self.acquired_tick + 1) * MINUTE
+        self.acquired_tick = tick
+        if not self.configuration.atmo:
+            return
+        accepted = min(count, constants.SENSOR_READINGS_BUFFER_SIZE - self.size)
+        if accepted:
+            self.readings.append((first, accepted, MINUTE))
+            self.size += accepted
+            self.acquisitions += accepted
+            self.peak = max(self.peak, self.size)
+        self.lost += count - accepted
+
+    def move(self, moment):
+        '''
+        Returns True when movement raised new alarm
+        '''
+        self.acquire_until(moment)
+        self.movements += 1
+        if self.size < constants.SENSOR_READINGS_BUFFER_SIZE:
+            self.readings.append((moment, 1, 0))
+            self.size += 1
+            self.peak = max(self.peak, self.size)
+        else:
+            self.lost += 1
+        if self.unsounded:
+            return False
+        self.unsounded = True
+        self.alarm_retries = 0
+        return True
+
+    def deliver(self, runs, moment):
+        for first, count, step in self.readings[:runs]:
+            self.histogram.add(moment - first - step * (count - 1), count, step)
+            self.delivered += count
+            self.size -= count
+        del self.readings[:runs]
+
+    def add_system_item(self):
+        if self.system == constants.SYSTEM_BUFFER_SIZE:
+            self.system_dropped += 1
+        else:
+            self.system += 1
+
+    def charge(self, moment):
+        '''
+        mAs used until moment
+        '''
+        return self.base_current * moment + self.power.acquisition_charge * (self.acquisitions + self.movements) \
+               + self.power.online_current * self.online
+
+    def battery_life(self):
+        '''
+        Seconds battery lasts, measured when it ran out, projected otherwise. None on USB
+        '''
+        if self.usb:
+            return None
+        if self.brownout is not None:
+            return self.brownout
+        return self.power.capacity * 3600 / (self.charge(self.horizon) / self.horizon)
+
+    # ------------------------------------------------------------------ heartbeat
+
+    def heartbeat_tick(self):
+        '''
+        Minute at which heartbeat_timer reaches current heartbeat
+        '''
+        if self.timer_value < self.current_heartbeat:
+            return self.timer_tick + self.current_heartbeat - self.timer_value
+        # timer passed the heartbeat, it is reached again only after it wraps around
+        return self.timer_tick + HEARTBEAT_TIMER_RANGE - self.timer_value + self.current_heartbeat
+
+    def start_heartbeat(self, period, moment):
+        if period == self.current_heartbeat:
+            return
+        tick = int(moment // MINUTE)
+        timer = (self.timer_value + tick - self.timer_tick) % HEARTBEAT_TIMER_RANGE
+        if timer != 0:
+            timer = period - timer % period
+        if timer >= period:
+            self.stalled = True
+        self.timer_tick = tick
+        self.timer_value = timer
+        self.current_heartbeat = period
+
+    def adjust_heartbeat_on_error(self, moment):
+        if self.usb:
+            self.start_heartbeat(self.system_heartbeat, moment)
+            return
+        if self.unsounded and self.alarm_retries <= MAX_ALARM_RETRIES:
+            return
+
+        if self.no_connection_count == 0:
+            self.no_connection_heartbeat = self.system_heartbeat
+        self.no_connection_count += 1
+        if self.no_connection_count % 2 == 0 and self.no_connection_heartbeat < constants.MAX_NO_CONNECTION_HEARTBEAT:
+            self.no_connection_heartbeat = min(self.no_connection_heartbeat * 2, constants.MAX_NO_CONNECTION_HEARTBEAT)
+            self.start_heartbeat(self.no_connection_heartbeat, moment)
+
+    def retry_time(self):
+        '''
+        Next acquisition, which sounds alarm again when there is one and retries are left
+        '''
+        if not self.unsounded or self.alarm_retries >= MAX_ALARM_RETRIES or not self.configuration.atmo \
+        or self.size >= constants.SENSOR_READINGS_BUFFER_SIZE:
+            return NEVER
+        return (int(self.time // MINUTE) + 1) * MINUTE
+
+    # ------------------------------------------------------------------ connection
+
+    def exchange(self, moment):
+        while True:
+            runs = len(self.readings)
+            success = self.successes > 0
+            if success:
+                self.successes -= 1
+                online = self.random.choice(self.model.successful)
+            else:
+                self.successes = self.draw_successes()
+                online = self.random.choice(self.model.failed)
+            end = moment + online
+            self.connections += 1
+            self.online += online
+
+            # heartbeat while connected is handled when device is idle again
+            tick = self.heartbeat_tick()
+            while tick * MINUTE <= end:
+                self.timer_tick = tick
+                self.timer_value = 0
+                self.pending = True
+                tick = self.heartbeat_tick()
+            self.acquire_until(end)
+
+            self.time = end
+            if success:
+                self.deliver(runs, end)
+                self.system = 1
+                self.unsounded = False
+                self.no_connection_count = 0
+                self.no_connection_heartbeat = self.system_heartbeat
+                self.start_heartbeat(self.system_heartbeat, end)
+            else:
+                self.failed += 1
+                self.add_system_item()
+                self.adjust_heartbeat_on_error(end)
+            # alarm raised while connected is not sounded now, acquisitions retry it
+            while self.next_movement <= end:
+                self.move(self.next_movement)
+                self.next_movement = self.draw_movement(self.next_movement)
+
+            if not self.usb and self.charge(end) >= self.power.capacity * 3600:
+                self.brownout = end
+                return
+            if not self.pending:
+                return
+            self.pending = False
+            moment = end
+
+    def fast_forward(self, tick):
+        '''
+        Adds run of successful heartbeat cycles, starting with the one due at tick, in one step.
+        Every cycle after the first one finds the readings of one heartbeat in the buffer,
+        less the ones movements between heartbeats delivered. Returns False when it can not be done
+        '''
+        period = self.system_heartbeat
+        if self.current_heartbeat != period or self.unsounded or self.successes < 2:
+            return False
+        moment = tick * MINUTE
+        online = self.model.mean_successful
+        cycle = period * MINUTE
+        cycles = min(self.successes, int((self.horizon - moment - online) // cycle) + 1)
+        per_cycle = float(cycle) / self.movement_interval if self.movement_interval else 0.0
+        if per_cycle and period > constants.SENSOR_READINGS_BUFFER_SIZE:
+            return False
+        acquisitions = period if self.configuration.atmo else 0
+        if not self.usb:
+            used = self.base_current * cycle + self.power.online_current * online * (1 + per_cycle) \
+                   + self.power.acquisition_charge * (acquisitions + per_cycle)
+            cycles = min(cycles, int((self.power.capacity * 3600 - self.charge(moment)) // used))
+        if cycles < 2:
+            return False
+
+        movements = 0
+        if per_cycle:
+            # first connection is due now
+            cycles, movements = self.count_movements(cycles - 1, cycle, self.successes - 1)
+            cycles += 1
+            if cycles < 2:
+                return False
+        connections = cycles + movements
+        if not self.usb:
+            charge = self.charge(moment) + self.base_current * ((cycles - 1) * cycle + online) \
+                     + self.power.online_current * online * connections \
+                     + self.power.acquisition_charge * (acquisitions * (cycles - 1) + movements)
+            if charge >= self.power.capacity * 3600:
+                return False
+
+        last = tick + (cycles - 1) * period
+        self.deliver(len(self.readings), moment + online)
+        if acquisitions:
+            if per_cycle:
+                weights, total = movement_latencies(period, self.movement_interval, online)
+                self.histogram.add_expected(weights, total, cycles - 1)
+            else:
+                self.histogram.add(online, period, MINUTE, cycles - 1)
+            self.delivered += acquisitions * (cycles - 1)
+            self.acquisitions += acquisitions * (cycles - 1)
+        if movements:
+            # movement reading is delivered by the connection it started
+            self.histogram.add(online, 1, 0, movements)
+            self.delivered += movements
+            self.movements += movements
+            self.peak = max(self.peak, acquisitions + 1)
+        self.acquired_tick = last
+        self.timer_tick = last
+        self.timer_value = 0
+        self.successes -= connections
+        self.no_connection_count = 0
+        self.no_connection_heartbeat = period
+        self.connections += connections
+        self.online += online * connections
+        self.system = 1
+        self.time = last * MINUTE + online
+        self.acquire_until(self.time)
+        if per_cycle:
+            self.next_movement = self.draw_movement(self.time)
+        return True
+
+    # ------------------------------------------------------------------ event loop
+
+    def run(self):
+        while self.brownout is None:
+            heartbeat = self.heartbeat_tick() * MINUTE
+            retry = self.retry_time()
+            moment = min(heartbeat, retry, self.next_movement)
+            if moment > self.horizon:
+                break
+
+            if moment == self.next_movement:
+                self.next_movement = self.draw_movement(moment)
+                self.time = moment
+                if self.move(moment):
+                    self.exchange(moment)
+                continue
+
+            if moment == retry:
+                self.alarm_retries += 1
+            self.acquire_until(moment)
+            self.time = moment
+            if moment == heartbeat:
+                # acquisition comes first on the same minute, alarm it retries is lost while connected
+                self.timer_tick = int(moment // MINUTE)
+                self.timer_value = 0
+                if not self.fast_forward(self.timer_tick):
+                    self.exchange(moment)
+            else:
+                self.exchange(moment)
+
+        if self.brownout is None:
+            self.acquire_until(self.horizon)
+
+
+def simulate(configuration, devices, days, model, power = DEFAULT_POWER, usb = 0.0, movement_interval = MOVEMENT_INTERVAL, seed = 0):
+    '''
+    usb: share of devices powered over USB. Returns result dict of the configuration
+    '''
+    horizon = days * 24 * 3600.0
+    histogram = LatencyHistogram()
+    usb_devices = int(round(devices * usb))
+    lives = []
+    peaks = []
+    totals = dict((name, 0) for name in ['connections', 'failed', 'delivered', 'lost', 'undelivered', 'system_dropped'])
+    service = 0.0
+    overflow_devices = 0
+    stalled = 0
+    depleted = 0
+
+    for index in range(devices):
+        # every configuration gets the same random streams, results differ by configuration only
+        sensor = Sensor(configuration, model, power, index < usb_devices, movement_interval, horizon, histogram,
+                        random.Random(seed * 1000003 + index))
+        sensor.run()
+        for name in ['connections', 'failed', 'delivered', 'lost', 'system_dropped']:
+            totals[name] += getattr(sensor, name)
+        totals['undelivered'] += sensor.size
+        service += sensor.brownout if sensor.brownout is not None else horizon
+        overflow_devices += 1 if sensor.lost else 0
+        stalled += 1 if sensor.stalled else 0
+        peaks.append(float(sensor.peak) / constants.SENSOR_READINGS_BUFFER_SIZE)
+        life = sensor.battery_life()
+        if life is not None:
+            lives.append(life / (24 * 3600))
+            depleted += 1 if sensor.brownout is not None else 0
+
+    lives.sort()
+    peaks.sort()
+    acquired = totals['delivered'] + totals['undelivered'] + totals['lost']
+    result = {'configuration': configuration.name(),
+              'heartbeat': configuration.heartbeat,
+              'movement': configuration.movement,
+              'atmo': configuration.atmo,
+              'devices': devices,
+              'days': days,
+              'failure_rate': model.failure_rate,
+              # per day in service, device with empty battery does not connect
+              'connections_per_day': totals['connections'] / (service / (24 * 3600)),
+              'failed_share': float(totals['failed']) / totals['connections'] if totals['connections'] else None,
+              'battery_days_p5': percentile(lives, 0.05),
+              'battery_days_p50': percentile(lives, 0.50),
+              'depleted': depleted,
+              'latency_mean': histogram.mean(),
+              'latency_p50': histogram.percentile(0.50),
+              'latency_p95': histogram.percentile(0.95),
+              'latency_p99': histogram.percentile(0.99),
+              'latency_max': histogram.maximum(),
+              'lost_share': float(totals['lost']) / acquired if acquired else 0.0,
+              'overflow_devices': overflow_devices,
+              'peak_fill_p95': percentile(peaks, 0.95),
+              'stalled_heartbeat': stalled}
+    result.update(totals)
+    return result
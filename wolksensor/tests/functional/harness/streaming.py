@@ -0,0 +1,118 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Streaming aggregates of constant size for long runs.
+       Samples are not kept, so memory does not grow with the length of
+       the run:
+
+           QuantileSketch - log bucket sketch (DDSketch). Value v goes to
+                            bucket ceil(log(v) / log(gamma)), gamma =
+                            (1 + accuracy) / (1 - accuracy), so every
+                            quantile is within relative accuracy of the
+                            exact one. When there are more than 'buckets'
+                            buckets the two lowest are merged, only the
+                            lowest quantiles lose accuracy then.
+           Streak         - consecutive failures: current, longest, number
+                            of streaks and failures
+           percentile()   - exact percentile of sorted samples, for runs
+                            short enough to keep them
+
+           sketch = QuantileSketch()
+           sketch.add(0.012)
+           sketch.summary()    -> {'count': 1, 'p50': 0.012, 'p95': .., 'max': 0.012, ..}
+'''
+import heapq
+import math
+
+SKETCH_ACCURACY = 0.01
+SKETCH_BUCKETS = 2048          # 1% buckets from 1 us to over 10^9 s
+SKETCH_MINIMUM = 1e-6          # smaller values, zero phase times of SYSTEM items included, are counted as zero
+
+
+def percentile(samples, fraction):
+    '''
+    samples has to be sorted
+    '''
+    if not samples:
+        return None
+    return samples[min(len(samples) - 1, int(round(fraction * (len(samples) - 1))))]
+
+
+class QuantileSketch(object):
+    def __init__(self, accuracy = SKETCH_ACCURACY, buckets = SKETCH_BUCKETS):
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.limit = buckets
+        self.buckets = {}
+        self.zero = 0
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+        if value < SKETCH_MINIMUM:
+            self.zero += 1
+            return
+        index = int(math.ceil(math.log(value) / self.log_gamma))
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        if len(self.buckets) > self.limit:
+            lowest, second = heapq.nsmallest(2, self.buckets)
+            self.buckets[second] += self.buckets.pop(lowest)
+
+    def quantile(self, fraction):
+        '''
+        Same rank as percentile() of the sorted samples, None when there are none
+        '''
+        if not self.count:
+            return None
+        rank = int(round(fraction * (self.count - 1)))
+        if rank < self.zero:
+            return max(self.minimum, 0.0)
+        seen = self.zero
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # middle of the bucket, never outside of the values seen
+                return min(max(2 * self.gamma ** index / (self.gamma + 1), self.minimum), self.maximum)
+        return self.maximum
+
+    def summary(self):
+        return {'count': self.count,
+                'mean': self.total / self.count if self.count else None,
+                'min': self.minimum,
+                'max': self.maximum,
+                'p50': self.quantile(0.50),
+                'p95': self.quantile(0.95),
+                'p99': self.quantile(0.99)}
+
+
+class Streak(object):
+    def __init__(self):
+        self.current = 0
+        self.longest = 0
+        self.streaks = 0
+        self.failures = 0
+
+    def add(self, failed):
+        '''
+        Returns length of the streak a success ended, 0 otherwise
+        '''
+        if failed:
+            if not self.current:
+                self.streaks += 1
+            self.current += 1
+            self.failures += 1
+            self.longest = max(self.longest, self.current)
+            return 0
+        ended = self.current
+        self.current = 0
+        return ended
+
+    def summary(self):
+        return {'current': self.current, 'longest': self.longest, 'streaks': self.streaks, 'failures': self.failures}
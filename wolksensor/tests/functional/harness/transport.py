@@ -0,0 +1,271 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Event driven serial transport.
+       Background thread reads the port and frames messages on
+       constants.COMMAND_TERMINATOR. Unsolicited 'STATUS ...;' notifications
+       are kept apart from command responses and callers wait for events
+       with a deadline instead of sleeping for the worst case or spinning
+       on the port.
+
+       Python 2.7 has no asyncio, so waits are built on threading.Condition;
+       a waiter is woken as soon as the reader thread frames the message.
+'''
+import threading
+import time
+import constants
+import logging_device
+import recorder
+
+from batch import frame
+from batch import segments
+from serial_func import receive_string_serial
+from serial_func import send_string_serial_wait
+
+NOTIFICATIONS_KEPT = 100
+
+
+def is_status(message):
+    return message.startswith('STATUS ')
+
+def readings_count(message):
+    '''
+    Number of readings in 'READINGS R:..,P:..|R:..;' message
+    '''
+    body = message[len('READINGS'):].strip(' ' + constants.COMMAND_TERMINATOR)
+    return len(body.split('|')) if body else 0
+
+
+class Transport(object):
+    def __init__(self, connection):
+        '''
+        connection: opened pyserial compatible object with read timeout set
+        '''
+        self.connection = connection
+        self.condition = threading.Condition()
+        self.responses = []
+        self.notifications = []
+        self.notifications_total = 0
+        self.pending_status_requests = 0
+        self.first_data_time = None
+        self.response_time = None
+        self.running = False
+        self.thread = None
+
+    @classmethod
+    def open(cls, port, baudrate = constants.BAUDRATE):
+        import serial
+        transport = cls(serial.Serial(port, baudrate, timeout = constants.READ_TIMEOUT))
+        transport.start()
+        return transport
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target = self.reader)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def close(self):
+        self.running = False
+        if self.thread:
+            self.thread.join()
+        self.connection.close()
+
+    def waiting(self):
+        waiting = getattr(self.connection, 'in_waiting', None)
+        if waiting is None:
+            waiting = self.connection.inWaiting()
+        return waiting
+
+    def reader(self):
+        rest = ''
+        while self.running:
+            # blocks for at most constants.READ_TIMEOUT, port is not polled in a busy loop
+            data = self.connection.read(self.waiting() or 1)
+            if not data:
+                continue
+            if self.first_data_time is None:
+                self.first_data_time = time.time()
+            recorder.received(data, quiet = True)
+
+            messages, rest = frame(rest + data)
+            if messages:
+                self.dispatch(messages)
+
+    def dispatch(self, messages):
+        with self.condition:
+            for message in messages:
+                if is_status(message) and self.pending_status_requests == 0:
+                    logging_device.debug(" <-- Notification: %s" %message)
+                    self.notifications.append(message)
+                    self.notifications_total += 1
+                    del self.notifications[:-NOTIFICATIONS_KEPT]
+                else:
+                    if is_status(message):
+                        self.pending_status_requests -= 1
+                    self.responses.append(message)
+                    self.response_time = time.time()
+            self.condition.notify_all()
+
+    def wait(self, predicate, timeout):
+        '''
+        Waits until predicate() returns something true, returns it or None on deadline
+        '''
+        deadline = time.time() + timeout
+        with self.condition:
+            result = predicate()
+            while not result:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+                self.condition.wait(remaining)
+                result = predicate()
+            return result
+
+    def send(self, string):
+        with self.condition:
+            self.pending_status_requests += string.count('STATUS' + constants.COMMAND_TERMINATOR)
+        recorder.sent(string, quiet = True)
+        self.connection.write(string)
+
+    def request(self, string, timeout = constants.RESPONSE_TIMEOUT):
+        '''
+        Sends command string and returns list with one response per command in it
+        '''
+        with self.condition:
+            del self.responses[:]
+        self.send(string)
+
+        expected = segments(string)
+        if not self.wait(lambda: len(self.responses) >= expected, timeout):
+            logging_device.error("Timeout waiting response on %s. Received: %s" %(string, ''.join(self.responses)))
+
+        with self.condition:
+            responses = self.responses[:expected]
+            del self.responses[:expected]
+            self.pending_status_requests = 0
+        return responses
+
+    def timed_request(self, string, timeout = constants.RESPONSE_TIMEOUT):
+        '''
+        request() which also measures, in seconds from the start of the write, when the write was
+        drained to the port, when first byte arrived and when the last response was framed.
+        Returns (responses, (write, first byte, complete)), times are None on timeout
+        '''
+        with self.condition:
+            del self.responses[:]
+            self.first_data_time = None
+            self.response_time = None
+
+        start = time.time()
+        self.send(string)
+        self.connection.flush()
+        written = time.time() - start
+
+        expected = segments(string)
+        complete = self.wait(lambda: len(self.responses) >= expected, timeout)
+
+        with self.condition:
+            responses = self.responses[:expected]
+            del self.responses[:expected]
+            self.pending_status_requests = 0
+            first_byte = self.first_data_time - start if self.first_data_time is not None else None
+            complete = self.response_time - start if complete else None
+
+        return responses, (written, first_byte, complete)
+
+    def wait_notification(self, predicate, timeout):
+        '''
+        Waits for notification which arrives after this call and satisfies predicate
+        '''
+        with self.condition:
+            seen = self.notifications_total
+
+        def arrived():
+            new = self.notifications_total - seen
+            if new <= 0:
+                return None
+            for message in self.notifications[-new:]:
+                if predicate(message):
+                    return message
+            return None
+
+        return self.wait(arrived, timeout)
+
+    def wait_status(self, status, timeout = constants.STATUS_TIMEOUT):
+        '''
+        wait_status('IDLE') returns when device reports 'STATUS IDLE;'
+        '''
+        expected = 'STATUS %s;' %status
+        return self.wait_notification(lambda message: message == expected, timeout)
+
+    def wait_readings(self, predicate, timeout, period = constants.READINGS_POLL_PERIOD):
+        '''
+        Reads READINGS every period until predicate(response) is true. Returns response or None on deadline
+        '''
+        deadline = time.time() + timeout
+        while True:
+            responses = self.request('READINGS;', max(0, min(constants.RESPONSE_TIMEOUT, deadline - time.time())))
+            if responses and predicate(responses[0]):
+                return responses[0]
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None
+            with self.condition:
+                self.condition.wait(min(period, remaining))
+
+    def wait_readings_value(self, value, timeout = constants.MOVEMENT_TIMEOUT):
+        '''
+        wait_readings_value('M:1.0') returns READINGS response containing value
+        '''
+        return self.wait_readings(lambda response: value in response, timeout)
+
+    def wait_readings_count(self, count, timeout):
+        return self.wait_readings(lambda response: readings_count(response) >= count, timeout)
+
+
+def wait_serial_message(predicate, timeout, receive = receive_string_serial):
+    '''
+    Same wait for suites which use serial_func directly: received data is framed so message split
+    across reads is not missed and port is polled with a sleep instead of a busy loop.
+    predicate is either message string or function. Returns message or None on deadline.
+    '''
+    if isinstance(predicate, str):
+        expected = predicate
+        predicate = lambda message: message == expected
+
+    rest = ''
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        received = receive()
+        if not received:
+            time.sleep(constants.READ_TIMEOUT)
+            continue
+        recorder.received(received, quiet = True)
+
+        messages, rest = frame(rest + received)
+        for message in messages:
+            if predicate(message.lstrip()):
+                return message.lstrip()
+
+    return None
+
+def wait_serial_readings(predicate, timeout, period = constants.READINGS_POLL_PERIOD):
+    '''
+    Reads READINGS through serial_func every period until predicate(response) is true.
+    predicate is either value contained in response or function. Returns response or None on deadline.
+    '''
+    if isinstance(predicate, str):
+        value = predicate
+        predicate = lambda message: value in message
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        send_string_serial_wait('READINGS;')
+        response = wait_serial_message(lambda message: message.startswith('READINGS'), constants.RESPONSE_TIMEOUT)
+        if response and predicate(response):
+            return response
+        time.sleep(period)
+
+    return None
@@ -0,0 +1,181 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Data Driven test plan.
+       Valid and invalid arguments of every R/W command are built from the
+       firmware limits in constants.py (config.h, commands.h) instead of
+       hand written lists. Boundary vectors sit on both sides of a limit,
+       sample vectors are typical values kept from the original test lists.
+       PLAN is built once on import, duplicates are removed and it is run
+       by batch.run_plan().
+'''
+import constants
+
+from codec import Record
+
+# malformed arguments, shared by all commands which do not take free text
+SPECIAL = '!")(*&^%'
+ESCAPED = '\\Test1234'
+TERMINATED = '!")(*&^%;'
+HOSTNAME = 'app.wolkabout.com'
+OVERSIZED = '0123456789' * 7
+
+
+class Vector(Record):
+    __slots__ = ('section', 'command', 'argument', 'valid', 'boundary', 'setup')
+
+
+def text(length, character = 'q'):
+    return character * length
+
+def hostname(length):
+    return text(length - len('.com'), 'a') + '.com'
+
+def decimal(value):
+    return "%.1f" %value
+
+def section(name, command, boundary_valid = (), boundary_invalid = (), valid = (), invalid = ()):
+    '''
+    Returns vectors of one section, boundary vectors first
+    '''
+    return [Vector(name, command, argument, True, True) for argument in boundary_valid] + \
+           [Vector(name, command, argument, False, True) for argument in boundary_invalid] + \
+           [Vector(name, command, argument, True, False) for argument in valid] + \
+           [Vector(name, command, argument, False, False) for argument in invalid]
+
+def switch(name, command, argument):
+    '''
+    Setup vector other vectors in section depend on, always run. At the end of a section
+    it leaves production value on the device, boundary vectors alone would leave a limit
+    '''
+    return [Vector(name, command, argument, True, True, True)]
+
+def address_section(command, valid = (), invalid = ()):
+    return section(command, command,
+                   ['0.0.0.0', '255.255.255.255'],
+                   ['', '256.255.255.255', '255.255.255', '255.255.255.255.0', '-1.-1.-1.-1'],
+                   valid, ['ON', HOSTNAME, ESCAPED, TERMINATED] + list(invalid))
+
+def switch_section(command):
+    return section(command, command, ['ON', 'OFF'], ['', 'on', 'ONN'], [], ['yes', 'NO', '0123', OVERSIZED])
+
+def offset_section(command, minimum, maximum, valid):
+    # first offset written to a unit without factory offset becomes its factory offset (commands.c),
+    # 0.0 is written before the limits so boundary runs do not calibrate the sensor to one of them
+    return switch(command, command, '0.0') + \
+           section(command, command,
+                   [decimal(minimum), decimal(maximum)],
+                   [decimal(minimum - 0.1), decimal(maximum + 0.1), "%.2f" %(maximum + 0.01), ''],
+                   valid, ['-1.%s.+1.QWE' %command.split('_')[0].lower(), HOSTNAME, ESCAPED, TERMINATED])
+
+def build_plan():
+    plan = []
+
+    plan += section('SSID', 'SSID',
+                    ['', text(1), text(constants.MAX_WIFI_SSID_SIZE)],
+                    [text(constants.MAX_WIFI_SSID_SIZE + 1)],
+                    ['mywirelessnetwork', '1234567890', SPECIAL, '\n\r', 'WA_1'])
+
+    plan += section('AUTH', 'AUTH', ['NONE', 'WEP', 'WPA', 'WPA2'], ['', 'WPA Ent', 'wpa2'], [], ['0123456789'])
+
+    plan += switch('PASS', 'AUTH', 'WPA2')
+    plan += section('PASS', 'PASS',
+                    ['', text(1), text(constants.MAX_WIFI_PASSWORD_SIZE)],
+                    [text(constants.MAX_WIFI_PASSWORD_SIZE + 1)],
+                    ['mywirelessnetworkpassword', '1234567890', SPECIAL, '\n\r', 'wolksensorsystem'],
+                    [OVERSIZED])
+
+    plan += section('URL', 'URL',
+                    ['0.0.0.0', '255.255.255.255', hostname(constants.MAX_HOSTNAME_SIZE)],
+                    ['', '256.256.256.256', '-1.-1.-1.-1', hostname(constants.MAX_HOSTNAME_SIZE + 1),
+                     'appwolksense', '-app.wolksense', 'app.wolksense-'],
+                    ['8.8.8.8', 'app-wolksense.com', '9gag.com', 'automatika.ftn.uns.ac.rs', constants.HOSTNAME],
+                    ['app.wolksense*com', '9821.com.123', '9gag.123.com', 'abc.123.abc.abc', ESCAPED, TERMINATED])
+    plan += switch('URL', 'URL', constants.URL)
+
+    plan += section('PORT', 'PORT',
+                    ['0', str(constants.MAX_PORT_NUMBER)],
+                    ['', '-1', str(constants.MAX_PORT_NUMBER + 1), '1' + '0' * constants.MAX_INT_LENGTH],
+                    ['1883'],
+                    ['mynetworkport', SPECIAL, OVERSIZED])
+    plan += switch('PORT', 'PORT', constants.PORT)
+
+    plan += switch('PASS WEP', 'AUTH', 'WEP')
+    plan += section('PASS WEP', 'PASS',
+                    [text(constants.MIN_WIFI_PASSWORD_SIZE_WEP, '0'), text(constants.MAX_WIFI_PASSWORD_SIZE_WEP, 'F')],
+                    ['', text(constants.MIN_WIFI_PASSWORD_SIZE_WEP - 1, '0'), text(constants.MAX_WIFI_PASSWORD_SIZE_WEP + 1, 'F'),
+                     text(constants.MIN_WIFI_PASSWORD_SIZE_WEP, 'G')],
+                    ['008C7073C348F91054E1FB8729', '3164E175384E17240A78CE63D3'],
+                    [text(constants.MAX_WIFI_PASSWORD_SIZE + 1), SPECIAL, '\n\r'])
+    plan += switch('PASS WEP', 'AUTH', 'WPA2')
+
+    plan += section('RTC', 'RTC',
+                    ['0', '4294967295'],
+                    ['', '-1', '1' + '0' * 10],
+                    ['1470236756'],
+                    ['timecountdown', SPECIAL])
+    plan += switch('RTC', 'RTC', constants.RTC)
+
+    plan += section('HEARTBEAT', 'HEARTBEAT',
+                    ['0', str(constants.MAX_NO_CONNECTION_HEARTBEAT)],
+                    ['', '-1', str(constants.MAX_NO_CONNECTION_HEARTBEAT + 1), str(constants.MAX_PORT_NUMBER)],
+                    [constants.HB5, constants.HB30],
+                    ['heartbeatcount', SPECIAL, OVERSIZED])
+    plan += switch('HEARTBEAT', 'HEARTBEAT', constants.HB10)
+
+    plan += switch_section('MOVEMENT')
+    plan += switch_section('ATMO')
+
+    plan += address_section('STATIC_MASK', ['255.255.255.0'])
+    plan += address_section('STATIC_GATEWAY', ['192.168.15.1'])
+    plan += address_section('STATIC_DNS', ['8.8.4.4'])
+    plan += address_section('STATIC_IP', ['192.168.15.98'])
+    plan += switch('STATIC_IP', 'STATIC_IP', 'OFF')
+
+    plan += offset_section('TEMP_OFFSET', constants.TEMPERATURE_OFFSET_MIN, constants.TEMPERATURE_OFFSET_MAX, ['1.1', '-1.5'])
+    plan += offset_section('HUMIDITY_OFFSET', constants.HUMIDITY_OFFSET_MIN, constants.HUMIDITY_OFFSET_MAX, ['1.3', '-1.9'])
+    plan += offset_section('PRESSURE_OFFSET', constants.PRESSURE_OFFSET_MIN, constants.PRESSURE_OFFSET_MAX, ['8.2', '-2.6'])
+
+    plan += section('OFFSET_FACTORY', 'OFFSET_FACTORY', ['RESET'], ['', 'RESE', 'RESETTOFACTORY'], [], [HOSTNAME, ESCAPED, TERMINATED])
+
+    plan += section('ACQUISITION', 'ACQUISITION', [None], ['', 'CLEAR'], [], ['empty', TERMINATED])
+
+    return unique(plan)
+
+def unique(vectors):
+    '''
+    Removes repeated (section, command, argument) vectors, first one is kept
+    '''
+    seen = set()
+    result = []
+    for vector in vectors:
+        if key(vector) not in seen:
+            seen.add(key(vector))
+            result.append(vector)
+    return result
+
+def select(plan, boundary_only = True, covered = ()):
+    '''
+    Vectors still to run: boundary vectors only unless boundary_only is False,
+    (section, command, argument) keys in covered are skipped. Setup vectors always run.
+    '''
+    covered = set(covered)
+    return [vector for vector in plan if vector.setup or
+            ((vector.boundary or not boundary_only) and key(vector) not in covered)]
+
+def key(vector):
+    return (vector.section, vector.command, vector.argument)
+
+def sections(vectors):
+    '''
+    Splits vectors into lists of one section each, sections left with setup vectors only are dropped
+    '''
+    result = []
+    for vector in vectors:
+        if not result or result[-1][0].section != vector.section:
+            result.append([])
+        result[-1].append(vector)
+    return [section_vectors for section_vectors in result if not all(vector.setup for vector in section_vectors)]
+
+PLAN = build_plan()
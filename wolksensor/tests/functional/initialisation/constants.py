@@ -42,14 +42,60 @@ CONNECTIONTIME      = 'C:'
 	
 ERROR = 'E:'
 
+COMMAND_TERMINATOR         = ';'
+COMMAND_ARGUMENT_SEPARATOR = ' '
+COMMAND_MAX_LENGTH         = 96   # COMMAND_NAME_MAX_LENGTH + COMMAND_ARGUMENT_MAX_LENGTH + 2
+COMMANDS_BUFFER_SIZE       = 10   # commands device can hold from one write
+COMMAND_STRING_BUFFER_SIZE = 768  # MAX_BUFFER_SIZE
+RESPONSE_TIMEOUT           = 5
+BAUDRATE                   = 115200
+READ_TIMEOUT               = 0.1  # serial read timeout of background reader
+STATUS_TIMEOUT             = 120  # longest connection sequence
+MOVEMENT_TIMEOUT           = 300  # operator has to move the device
+READINGS_POLL_PERIOD       = 0.5
+RETRY_ATTEMPTS             = 5
+RETRY_DELAY                = 0.5  # first backoff, doubled on every attempt
+RETRY_MAX_DELAY            = 30
+RETRY_DEADLINE             = 600  # all attempts of one retry
+WATCHDOG_TIMEOUT           = 2 * MOVEMENT_TIMEOUT  # station without serial traffic or progress
+WATCHDOG_RELOADS           = 1    # RELOADs before device is marked failed
+DONE        = 'DONE;'
+BAD_REQUEST = 'BAD_REQUEST;'
+BUSY        = 'BUSY;'
+
+# firmware limits (SDK/core/config.h, commands.h, sensor_readings_buffer.h, system_buffer.h)
+COMMAND_NAME_MAX_LENGTH     = 30
+COMMAND_ARGUMENT_MAX_LENGTH = 64
+MAX_INT_LENGTH              = 5
+MAX_WIFI_SSID_SIZE          = 32
+MAX_WIFI_PASSWORD_SIZE      = 63
+MIN_WIFI_PASSWORD_SIZE_WEP  = 10
+MAX_WIFI_PASSWORD_SIZE_WEP  = 26
+MAX_HOSTNAME_SIZE           = 29
+MAX_PORT_NUMBER             = 65535
+MAX_NO_CONNECTION_HEARTBEAT = 60
+DEFAULT_SYSTEM_HEARTBEAT    = 10
+TEMPERATURE_OFFSET_MIN      = -2.0
+TEMPERATURE_OFFSET_MAX      = 3.7
+HUMIDITY_OFFSET_MIN         = -3.0
+HUMIDITY_OFFSET_MAX         = 3.0
+PRESSURE_OFFSET_MIN         = -10.0
+PRESSURE_OFFSET_MAX         = 10.0
+SENSOR_READINGS_BUFFER_SIZE = 150
+SYSTEM_BUFFER_SIZE          = 60
+ACQUISITION_PERIOD          = 60
+FIRMWARE_VERSION            = '4.3.6'
+
 HB5   = '5'
 HB10  = '10'
 HB30  = '30'
 HB60  = '60'
 
 FILEBIN           = 'bin\wolksensor_cc3100_sensors.bin'
+FIRMWARECACHE     = 'firmware_cache'        # harness/firmware.py, images by SHA-256
 FILEBLESSED       = 'BlessedDevices.csv'
 FILESERIALNUMBERS = '0116WS10Series.csv'
+FILEIDENTITY      = 'WolkSensorUnits.db'    # harness/identity.py, replaces the two CSV files
 
 NAME = 'Functional Tests'
 LOGO = '    _    _       _ _    _____                           \
@@ -1,18 +1,28 @@
-import ctypes
+import os
+import sys
 import constants
 import logging_device
 
-from colorama import init
+def set_console_title(title):
+    if os.name == 'nt':
+        import ctypes
+        ctypes.windll.kernel32.SetConsoleTitleA(title)
+    elif sys.stdout.isatty():
+        # xterm compatible terminals, output of stations is a log file
+        sys.stdout.write("\x1b]0;%s\x07" %title)
 
 def initialisation():
-    ctypes.windll.kernel32.SetConsoleTitleA("Functional Testing")
-    
-    init()
+    set_console_title("Functional Testing")
+
+    if os.name == 'nt':
+        # Windows console does not understand ANSI colors, other terminals do
+        from colorama import init
+        init()
     logging_device.set_level(logging_device._info_)
     logging_device.info("")
 
     #print constants.LOGO + "\n\r\t\t   Functional Testing\n\r==========================================================="
-    
+
     print '\n\r===========================================================\n\r' + constants.LOGO + '\n\r\t\t   ' + constants.NAME \
     + "\n\r\t\t\tV" + str(constants.BLESSERVERSIONMAJOR) + '.' + str(constants.BLESSERVERSIONMINOR) + '.' + str(constants.BLESSERVERSIONPATCH) \
-    + '\n\r==========================================================='
\ No newline at end of file
+    + '\n\r==========================================================='
@@ -0,0 +1,178 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: MQTT load test with virtual WolkSensor devices (harness/loadgen.py).
+       Thousands of virtual sensors connect, publish WolkSensor payloads and
+       disconnect like firmware does, against local broker or the stand-in
+       broker (harness/mqtt.py, --stand-in). Platform client subscribed to
+       sensors/# acknowledges every payload and measures end-to-end latency:
+           publish  - PUBLISH written by sensor until platform receives it
+           connect  - sensor starts connecting until platform receives its PUBLISH
+       Sustained publish rate is taken from publishes delivered in every
+       second of the run. Results are printed and saved as JSON.
+
+       python mqttload.py --stand-in                                    - 10000 sensors, HB10, real time
+       python mqttload.py --stand-in --sensors 20000 --speed 60 --processes 4
+       python mqttload.py --host 127.0.0.1 --port 1883 --movement-interval 30 --burst 5
+'''
+#!/Python27/python
+import sys
+import harness         # puts initialisation, tests, harness and WolkSensor-python-lib on sys.path
+
+import argparse
+import functools
+import json
+import multiprocessing
+import socket
+import threading
+import time
+
+from loadgen import LoadProfile
+from loadgen import Platform
+from loadgen import RECEIVE_TIMEOUT
+from loadgen import generate
+from loadgen import summarize
+from mqtt import MQTT_PORT
+from mqtt import StandInBroker
+
+LOAD_SENSORS = 10000
+LOAD_DURATION = 120
+LOAD_HEARTBEAT = 10
+BROKER_START_TIMEOUT = 5
+
+
+def stand_in_broker(host, port):
+    '''
+    Broker process
+    '''
+    try:
+        StandInBroker(port, host).serve()
+    except KeyboardInterrupt:
+        pass
+
+def wait_for_broker(address, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(address, 1).close()
+            return True
+        except socket.error:
+            time.sleep(0.1)
+    return False
+
+def raise_file_limit():
+    '''
+    Every sensor in connection cycle holds a socket
+    '''
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+def value(number, form):
+    return form %number if number is not None else '-'
+
+def milliseconds(seconds):
+    return "%.1f" %(1000 * seconds) if seconds is not None else '-'
+
+def report(result):
+    print '\n\r==========================================================='
+    print " Sensors %d, %.0f s, %d connection cycles, %d failed" %(result['sensors'], result['duration'],
+                                                                 result['cycles'], result['failed'])
+    print " Publishes sent %d (%.1f/s), delivered %d (%.1f/s), %d split, mean payload %s bytes" \
+          %(result['publishes'], result['publish_rate'], result['delivered'], result['delivered_rate'],
+            result['split'], value(result['payload_mean'], "%.0f"))
+    print " Sustained publish rate p5 %s/s, p50 %s/s" %(value(result['sustained_rate_p5'], "%d"),
+                                                        value(result['sustained_rate_p50'], "%d"))
+    print " %-8s %9s %9s %9s %9s" %('latency', 'p50 ms', 'p95 ms', 'p99 ms', 'max ms')
+    for name in ['publish', 'connect']:
+        print " %-8s %9s %9s %9s %9s" %(name, milliseconds(result[name + '_latency_p50']), milliseconds(result[name + '_latency_p95']),
+                                          milliseconds(result[name + '_latency_p99']), milliseconds(result[name + '_latency_max']))
+    print " Connection cycle p50 %s ms, p95 %s ms, %d movement(s), %d reading(s) lost to full buffer" \
+          %(milliseconds(result['cycle_p50']), milliseconds(result['cycle_p95']), result['movements'], result['lost_readings'])
+    print '==========================================================='
+
+def main():
+    parser = argparse.ArgumentParser(description = "WolkSensor MQTT load test")
+    parser.add_argument('--host', default = '127.0.0.1', help = "broker, default %(default)s")
+    parser.add_argument('--port', type = int, default = MQTT_PORT, help = "default %(default)s")
+    parser.add_argument('--stand-in', action = 'store_true', help = "start stand-in broker on host and port")
+    parser.add_argument('--sensors', type = int, default = LOAD_SENSORS, help = "default %(default)s")
+    parser.add_argument('--duration', type = float, default = LOAD_DURATION, help = "seconds, default %(default)s")
+    parser.add_argument('--heartbeat', type = int, default = LOAD_HEARTBEAT, help = "minutes, default %(default)s")
+    parser.add_argument('--movement-interval', type = float, help = "mean minutes between movement bursts, MOVEMENT OFF when not given")
+    parser.add_argument('--burst', type = int, default = 1, help = "movements in a burst, default %(default)s")
+    parser.add_argument('--burst-spacing', type = float, default = 10, help = "seconds between movements in a burst, default %(default)s")
+    parser.add_argument('--atmo', choices = ['ON', 'OFF'], default = 'ON', help = "default %(default)s")
+    parser.add_argument('--speed', type = float, default = 1.0, help = "virtual minutes per real minute, default %(default)s")
+    parser.add_argument('--timeout', type = float, default = RECEIVE_TIMEOUT, help = "receive timeout, default %(default)s s")
+    parser.add_argument('--no-acknowledge', action = 'store_true', help = "platform does not publish commands, readings are sent again")
+    parser.add_argument('--processes', type = int, default = 1, help = "sensors are split among processes, default %(default)s")
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--output', help = "results file")
+    arguments = parser.parse_args()
+
+    raise_file_limit()
+    address = (arguments.host, arguments.port)
+    broker = None
+    if arguments.stand_in:
+        broker = multiprocessing.Process(target = stand_in_broker, args = address)
+        broker.daemon = True
+        broker.start()
+    if not wait_for_broker(address, BROKER_START_TIMEOUT):
+        print "No broker on %s:%d" %address
+        return 1
+
+    profile = LoadProfile(arguments.heartbeat, arguments.movement_interval, arguments.burst, arguments.burst_spacing,
+                          arguments.atmo == 'ON', arguments.speed, arguments.timeout)
+    processes = max(1, min(arguments.processes, arguments.sensors))
+    tasks = [(arguments.sensors * index // processes, arguments.sensors * (index + 1) // processes - arguments.sensors * index // processes,
+              arguments.seed + index) for index in range(processes)]
+    run = functools.partial(generate, address = address, profile = profile, duration = arguments.duration)
+    # workers are forked before platform thread is started
+    pool = multiprocessing.Pool(processes) if processes > 1 else None
+
+    try:
+        platform = Platform(address, not arguments.no_acknowledge)
+        if not platform.start():
+            print "Platform client is not subscribed to sensors/# on %s:%d" %address
+            return 1
+        # platform keeps receiving until cycles abandoned at the end of the run are over
+        platform_thread = threading.Thread(target = platform.run, args = (time.time() + arguments.duration + 2 * arguments.timeout,))
+        platform_thread.daemon = True
+        platform_thread.start()
+
+        if pool is not None:
+            try:
+                results = pool.map(run, tasks, chunksize = 1)
+                pool.close()
+            except KeyboardInterrupt:
+                pool.terminate()
+                raise
+            finally:
+                pool.join()
+        else:
+            results = [run(task) for task in tasks]
+        platform_thread.join()
+    finally:
+        if pool is not None:
+            pool.terminate()
+        if broker is not None:
+            broker.terminate()
+
+    result = summarize(results, platform.received)
+    report(result)
+
+    if arguments.output:
+        with open(arguments.output, 'w') as f:
+            json.dump(result, f, indent = 2, sort_keys = True)
+        print "Results saved to %s" %arguments.output
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
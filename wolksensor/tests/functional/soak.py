@@ -0,0 +1,123 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Soak mode of functional tests (tests/endurance.py).
+       NOW cycles and READINGS/SYSTEM drains are repeated on every device
+       until --hours are over or Ctrl+C, each device in its own process.
+       Only streaming aggregates are kept, memory of a run stays constant;
+       summary of the run and of the last snapshot intervals is saved to
+       logs/<port>.soak.json every --interval seconds. Device Wi-Fi is set
+       to constants.SSID/AUTH/PASS before the first cycle. Exit code is 1
+       when a device had failed cycles.
+
+       python soak.py                                   - first attached device, until Ctrl+C
+       python soak.py COM3 COM7 --hours 72 --interval 900
+       python soak.py --emulate 4 --hours 0.1           - emulated devices (harness/emulator.py)
+'''
+#!/Python27/python
+import os
+import sys
+import harness         # puts initialisation, tests, harness and WolkSensor-python-lib on sys.path
+
+import argparse
+import multiprocessing
+
+from ports import find_ports
+from endurance import CYCLE_PERIOD
+from endurance import SNAPSHOT_INTERVAL
+
+LOG_DIRECTORY = 'logs'
+EMULATOR_SPEED = 60              # one virtual minute per second
+
+
+def snapshot_name(port):
+    return os.path.join(LOG_DIRECTORY, os.path.basename(port) + '.soak.json')
+
+def device(port, duration, interval, period):
+    '''
+    Soak of one device, in its own process when there are more
+    '''
+    import constants
+    import logging_device
+    from serial_func import open_serial
+    from serial_func import close_serial
+    from retry import retry
+    from shadow import apply
+    from shadow import wifi_profile
+    from endurance import soak
+
+    logging_device.set_level(logging_device._info_)
+    if open_serial(port) != True:
+        logging_device.error("Unable to open serial port %s" %port)
+        return
+    try:
+        if not retry(apply, wifi_profile(constants.SSID, constants.AUTH, constants.PASS)):
+            logging_device.error("%s: Wi-Fi not set, cycles will fail" %port)
+        soak(snapshot_name(port), port, duration, interval, period)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close_serial()
+
+def failed(port):
+    '''
+    True when snapshot of the device is missing or shows failed cycles
+    '''
+    import json
+    if not os.path.exists(snapshot_name(port)):
+        return True
+    with open(snapshot_name(port)) as f:
+        summary = json.load(f)
+    return summary['total']['failed_items'] > 0 or summary['total']['no_idle'] > 0
+
+def main():
+    parser = argparse.ArgumentParser(description = "WolkSensor soak test")
+    parser.add_argument('ports', nargs = '*', help = "serial ports, first attached device by default")
+    parser.add_argument('--hours', type = float, help = "length of the run, until Ctrl+C when not given")
+    parser.add_argument('--interval', type = float, default = SNAPSHOT_INTERVAL, help = "seconds between snapshots, default %(default)s")
+    parser.add_argument('--period', type = float, default = CYCLE_PERIOD, help = "seconds between cycles, default %(default)s")
+    parser.add_argument('--emulate', type = int, default = 0, help = "soak given number of emulated devices")
+    arguments = parser.parse_args()
+
+    emulators = []
+    if arguments.emulate:
+        from emulator import start_emulators
+        emulators = start_emulators(arguments.emulate, speed = EMULATOR_SPEED)
+        ports = [emulator.port for emulator in emulators]
+    else:
+        ports = arguments.ports or find_ports()[:1]
+    if not ports:
+        print "No WolkSensor device found"
+        return 1
+
+    if not os.path.isdir(LOG_DIRECTORY):
+        os.makedirs(LOG_DIRECTORY)
+    duration = arguments.hours * 3600 if arguments.hours is not None else None
+
+    print "Soaking %d device(s): %s" %(len(ports), ', '.join(ports))
+    try:
+        if len(ports) == 1:
+            device(ports[0], duration, arguments.interval, arguments.period)
+        else:
+            processes = [multiprocessing.Process(target = device, args = (port, duration, arguments.interval, arguments.period))
+                         for port in ports]
+            for process in processes:
+                process.start()
+            try:
+                for process in processes:
+                    process.join()
+            except KeyboardInterrupt:
+                # devices got the same Ctrl+C and save their last snapshot
+                for process in processes:
+                    process.join()
+    finally:
+        for emulator in emulators:
+            emulator.stop()
+
+    for port in ports:
+        print "Snapshot saved to %s" %snapshot_name(port)
+    return 1 if any(failed(port) for port in ports) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
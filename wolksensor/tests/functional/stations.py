@@ -0,0 +1,276 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Multi-station runner for functional tests.
+       Every attached WolkSensor device (constants.VID/constants.PID) gets
+       its own worker process which runs Data Driven, Flow and Robustness
+       tests on its serial port. Output of each station is written to its
+       own log file and pass/fail result is reported per station.
+
+       python stations.py              - test all attached devices
+       python stations.py COM3 COM7    - test only listed ports
+       python stations.py --emulate 20 - test 20 emulated devices (harness/emulator.py)
+       python stations.py --resume COM3 - continue interrupted run from logs/<port>.checkpoint.json,
+                                         --failed runs only steps which failed
+       python stations.py --capture COM3 sessions/ap_not_found.jsonl
+                                       - test device and save session (harness/replay.py)
+       python stations.py --replay sessions/*.jsonl
+                                       - run suites against saved sessions, no device needed
+       python stations.py --shard COM3 COM7 COM9
+                                       - Data Driven vectors split across devices (harness/shards.py),
+                                         merged report in logs/shards.json
+'''
+#!/Python27/python
+import os
+import sys
+import harness         # puts initialisation, tests, harness and WolkSensor-python-lib on sys.path
+
+import functools
+import multiprocessing
+import time
+import traceback
+
+from ports import find_ports
+
+LOG_DIRECTORY = 'logs'
+STATION_TIMEOUT = 24 * 60 * 60
+EMULATOR_SPEED = 60              # one virtual minute per second
+EMULATOR_MOVEMENT_PERIOD = 120   # virtual seconds, movement is needed by flow tests
+SHARD_REPORT = os.path.join(LOG_DIRECTORY, 'shards.json')
+
+
+def station_log_name(port):
+    return os.path.join(LOG_DIRECTORY, os.path.basename(port) + '.log')
+
+def station_trace_name(port):
+    return os.path.join(LOG_DIRECTORY, os.path.basename(port) + '.trace.jsonl')
+
+def station_checkpoint_name(port):
+    return os.path.join(LOG_DIRECTORY, os.path.basename(port) + '.checkpoint.json')
+
+def station(port, mode = None, shards = None, record_units = True):
+    '''
+    Worker process. Runs all suites on given port and returns (port, results, duration),
+    mode is checkpoint.RESUME or checkpoint.FAILED for interrupted run.
+    shards: names of Data Driven shards to run instead of all suites
+    record_units: False for capture and replay ports, which are not production units
+    '''
+    log = open(station_log_name(port), 'w', 1)
+    sys.stdout = log
+    sys.stderr = log
+
+    import constants
+    import logging_device
+    import checkpoint
+    import device_watchdog
+    import recorder
+    from serial_func import open_serial
+    from serial_func import close_serial
+    from serial_func import send_string_serial_wait
+    from functional import run_suites
+    from functional import SUITES
+    from identity import identify
+    from data_driven import run_shards
+
+    logging_device.set_level(logging_device._info_)
+    logging_device.info("Station %s" %port)
+    suites = SUITES
+    if shards is not None:
+        suites = [('data_driven', functools.partial(run_shards, shards))]
+
+    recorder.start(station_trace_name(port), port)
+    checkpoint.start(station_checkpoint_name(port), mode)
+    start = time.time()
+    results = []
+    unit = None
+    try:
+        if open_serial(port) == True:
+            # units are recorded on production line, where identity.py store was created
+            if record_units and os.path.exists(constants.FILEIDENTITY):
+                unit = identify()
+            device_watchdog.start(lambda: send_string_serial_wait('RELOAD;'))
+            try:
+                results = run_suites(suites)
+            finally:
+                device_watchdog.stop()
+                close_serial()
+        else:
+            logging_device.error("Unable to open serial port %s" %port)
+    except KeyboardInterrupt:
+        if not device_watchdog.watchdog.failed:
+            raise
+        results.append(('watchdog', False))
+    except Exception:
+        traceback.print_exc()
+        results.append(('exception', False))
+
+    if unit and unit[0]:
+        record_unit(unit, results, port)
+    checkpoint.stop()
+    recorder.stop()
+    log.flush()
+    return (port, results, time.time() - start)
+
+def record_unit(unit, results, port):
+    '''
+    unit: (MAC, ID, VERSION) read before the suites
+    '''
+    import constants
+    from identity import IdentityStore
+    store = IdentityStore(constants.FILEIDENTITY)
+    try:
+        store.record_run(unit[0], unit[1], unit[2], results, port)
+    finally:
+        store.close()
+
+def passed(results):
+    return len(results) > 0 and all(result for name, result in results)
+
+def report(stations):
+    print '\n\r==========================================================='
+    for port, results, duration in stations:
+        suites = ', '.join("%s:%s" %(name, 'PASS' if result else 'FAIL') for name, result in results)
+        print " %-14s %-6s %7.1fs  %s" %(port, 'PASSED' if passed(results) else 'FAILED', duration, suites or 'not started')
+    print '==========================================================='
+
+def station_task(task, mode = None, record_units = True):
+    port, shards = task
+    return station(port, mode, shards, record_units)
+
+def run_stations(ports, mode = None, shards = None, record_units = True):
+    '''
+    shards: list of shard names for every port, all suites are run when not given
+    '''
+    if not os.path.isdir(LOG_DIRECTORY):
+        os.makedirs(LOG_DIRECTORY)
+
+    pool = multiprocessing.Pool(len(ports), maxtasksperchild = 1)
+    try:
+        # get() with timeout keeps Ctrl+C working while workers are running
+        tasks = zip(ports, shards or [None] * len(ports))
+        stations = pool.map_async(functools.partial(station_task, mode = mode, record_units = record_units), tasks, chunksize = 1).get(STATION_TIMEOUT)
+        pool.close()
+    except (KeyboardInterrupt, Exception):
+        # timeout, Ctrl+C or exception of a worker, join() waits only for stopped workers
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+    return stations
+
+def capture(port, path):
+    '''
+    Runs suites on device through recording proxy, session file gets results of the run
+    '''
+    from replay import Capture
+    proxy = Capture(port, path)
+    proxy_port = proxy.start()
+    stations = []
+    try:
+        stations = run_stations([proxy_port], record_units = False)
+    finally:
+        results, duration = stations[0][1:] if stations else (None, None)
+        proxy.stop(results, duration)
+    report([(port, results, duration)])
+    print "Session saved to %s" %path
+
+    return 0 if passed(results) else 1
+
+def replay(paths):
+    '''
+    Runs suites against saved sessions, fails when results differ from recorded ones
+    or suite sent commands which are not in the session
+    '''
+    from replay import Replay
+    players = [Replay(path) for path in paths]
+    ports = [player.start() for player in players]
+    try:
+        stations = run_stations(ports, record_units = False)
+    finally:
+        for player in players:
+            player.stop()
+    report([(player.path, results, duration) for player, (port, results, duration) in zip(players, stations)])
+
+    failed = 0
+    for player, (port, results, duration) in zip(players, stations):
+        summary = player.summary()
+        print " %s: %s" %(player.path, ', '.join("%s %d" %(key, summary[key]) for key in sorted(summary)))
+        if results != player.results or player.unmatched:
+            failed += 1
+            print "   results %s, recorded %s" %(results, player.results)
+            for command in player.unmatched[:10]:
+                print "   not in session: %r" %command
+
+    print "%d of %d session(s) replayed differently" %(failed, len(players))
+    return 1 if failed else 0
+
+def shard(ports):
+    '''
+    Data Driven suite split across devices, one merged report
+    '''
+    import shards
+    from data_driven import data_driven_shards
+    suite_shards = [(name, cost) for name, function, state, cost in data_driven_shards()]
+    assignment = shards.assign(suite_shards, len(ports), shards.durations(SHARD_REPORT))
+    # more devices than shards, devices without shards are not started
+    used = [(port, names) for port, names in zip(ports, assignment) if names]
+    if not used:
+        print "No shards to run"
+        return 1
+    ports, assignment = zip(*used)
+
+    for port, names in zip(ports, assignment):
+        print " %-14s %s" %(port, ', '.join(names))
+    start = time.time()
+    stations = run_stations(list(ports), shards = list(assignment))
+    merged = shards.merge('data_driven', [(port, names, station_checkpoint_name(port), duration)
+                                          for (port, results, duration), names in zip(stations, assignment)],
+                          time.time() - start)
+    shards.summary(merged)
+    shards.save(merged, SHARD_REPORT)
+    print "Report saved to %s" %SHARD_REPORT
+
+    return 0 if merged['passed'] else 1
+
+def main():
+    if sys.argv[1:2] == ['--capture']:
+        return capture(sys.argv[2], sys.argv[3])
+    if sys.argv[1:2] == ['--replay']:
+        return replay(sys.argv[2:])
+
+    sharded = sys.argv[1:2] == ['--shard']
+    if sharded:
+        sys.argv.pop(1)
+
+    mode = None
+    if sys.argv[1:2] in (['--resume'], ['--failed']):
+        mode = sys.argv.pop(1)[2:]        # checkpoint.RESUME, checkpoint.FAILED
+
+    emulators = []
+    if sys.argv[1:2] == ['--emulate']:
+        from emulator import start_emulators
+        emulators = start_emulators(int(sys.argv[2]), speed = EMULATOR_SPEED, movement_period = EMULATOR_MOVEMENT_PERIOD)
+        ports = [emulator.port for emulator in emulators]
+    else:
+        ports = sys.argv[1:] or find_ports()
+
+    if not ports:
+        print "No WolkSensor device found"
+        return 1
+
+    print "Testing %d device(s): %s" %(len(ports), ', '.join(ports))
+    try:
+        if sharded:
+            return shard(ports)
+        stations = run_stations(ports, mode)
+    finally:
+        for emulator in emulators:
+            emulator.stop()
+    report(stations)
+
+    return 0 if all(passed(results) for port, results, duration in stations) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,41 +1,53 @@
 '''
 Created on August 1st 2016
 @author: srdjan.stankovic@wolkabout.com
-Last Modified on August 08st 2016
+Last Modified on October 18th 2026
 @author: srdjan.stankovic@wolkabout.com
 
 brief: Set of Data Driven tests
 '''
-import os
-import sys
-
-sys.path.append(os.path.dirname(os.path.realpath("Blesser.py")) + "/../../../WolkSensor-python-lib/core")
-sys.path.append(os.path.dirname(os.path.realpath("Blesser.py")) + "/../../../WolkSensor-python-lib/API")
-
+import functools
 import logging_device
-import constants
 
-from device_test_func import check_argument
 from device_test_func import parse_readings
 from device_test_func import parse_system_reading
 from device_test_func import protocol_parser
-from device_test_func import test
-from device_test_func import wait_dev_state_idle
-from device_wlan_set import set_wifi_parameters
-
-
-def data_driven():
-    return_value = True
+from batch import run_plan
+from checkpoint import checkpoint
+from checkpoint import run_steps
+from shadow import wifi_profile
+from vectors import PLAN
+from vectors import sections
+from vectors import select
+
+
+DATA_DRIVEN_STATE = [('MOVEMENT', 'OFF'), ('ATMO', 'OFF')] + wifi_profile('NULL', 'NONE', 'NULL')
+# STATIC_* block starts from DHCP, STATIC_IP OFF clears mask, gateway and DNS
+STATIC_STATE = DATA_DRIVEN_STATE + [('STATIC_IP', 'OFF')]
+# commands sent by steps which do not run plan vectors, cost of a shard is number of commands
+SHARD_COSTS = {'read_only': 10, 'readings': 7, 'system': 7}
+
+
+def data_driven(boundary_only = True):
+    '''
+    boundary_only False runs sample vectors of the plan as well
+    '''
     logging_device.info("\n\r\t\t   Data Driven Tests\n\r***************************************************************\n\r")
 
     logging_device.info("------------ turn OFF all functionalities -----------")
 
-    while not test('MOVEMENT', ['OFF'],[]): pass
-    while not test('ATMO', ['OFF'],[]): pass
-    while not test('SSID', ['NULL'],[]): pass
-    while not test('PASS', ['NULL'],[]): pass
-    while not test('AUTH', ['NONE'],[]): pass
+    return_value = run_steps('data_driven', [
+        ('read_only',     test_read_only_parameters,                 DATA_DRIVEN_STATE),
+        ('rw_parameters', lambda: test_rw_parameters(boundary_only), DATA_DRIVEN_STATE),
+        ('readings',      test_readings_response,                    DATA_DRIVEN_STATE),
+        ('system',        test_system_response,                      DATA_DRIVEN_STATE)])
 
+    logging_device.log("\n\r")
+    return return_value
+
+
+def test_read_only_parameters():
+    return_value = True
     logging_device.info("---------------- Read Only parameters ----------------")
 
     logging_device.info("\n\r\t\t-------- STATUS --------")
@@ -63,131 +75,71 @@ def data_driven():
         return_value = False
         logging_device.error("Return value is %s" %return_value)
 
-    logging_device.info("------------------- R\W parameters -------------------")
-
-    logging_device.info("\n\r\t\t-------- SSID --------")
-    if not test('SSID', ['mywirelessnetwork', '1234567890', 'm4w1r3l3ssn3tw0rk', 'qwertyuiopqwertyuiopqwertyuiopqw', '' , '!")(*&^%', '\n\r', 'WA_1'], ['qwertyuiopqwertyuiopqwertyuiopqwe']):
-        return_value = False
-        logging_device.error("Return value is %s" %return_value)
-
-    logging_device.info("\n\r\t\t-------- AUTH --------")
-    if not test('AUTH', ['NONE', 'WEP', 'WPA', 'WPA2'], ['', 'WPA Ent', '0123456789']):
-        return_value = False
-        logging_device.error("Return value is %s" %return_value)
-
-    logging_device.info("\n\r\t\t-------- PASS --------")
-    if not test('PASS', ['mywirelessnetworkpassword', '1234567890', 'm4w1r3l3ssn3tw0rkpassw0rd', 'qwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwe', '' , '!")(*&^%', '\n\r', \
-    'wolksensorsystem'], ['qwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwer', '0123456789012345678901234567890123456789012345678901234567890123456789']):
-        return_value = False
-        logging_device.error("Return value is %s" %return_value)
-
-    logging_device.info("\n\r\t\t-------- URL --------")
-    if not test('URL', ['8.8.8.8', '0.0.0.0', '255.255.255.255', 'appwolksense.com', 'app-wolksense.com', '9gag.com', 'automatika.ftn.uns.ac.rs', 'ftn.uns.ac.rs', constants.URL, constants.HOSTNAME], ['', '-1.-1.-1.-1', '256.256.256.256',\
-    'appwolksense', '-app.wolksense', 'app.wolksense-', 'app.wolksense*com', '9821.com.123', '9gag.123.com', 'abc.123.abc.abc', 'app.wolksense.comapp.wolksense.comapp.wolksense.comapp.wolksense.comapp.wolksense.com' , '\Test1234', '!")(*&^%;']):
-        return_value = False
-        logging_device.error("Return value is %s" %return_value)
-
-    logging_device.info("\n\r\t\t-------- PORT --------")
-    if not test('PORT', ['1883', '0', '65535', '8883'], ['', '-5', '65536', 'mynetworkport', 'm4n3tw0rkp0rt', '!")(*&^%', '0123456789012345678901234567890123456789012345678901234567890123456789', \
-    'qwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwer']):
-        return_value = False
-        logging_device.error("Return value is %s" %return_value)
-
-    if not test('AUTH', ['WEP'], []):
-        return_value = False
-        logging_device.error("Return value is %s" %return_value)
-    if not test('PASS', ['008C7073C348F91054E1FB8729', '00000000000000000000000000', 'FFFFFFFFFFFFFFFFFFFFFFFFFF', '3164E175384E17240A78CE63D3' ], \
-    ['qwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwer', '0123456789012345678901234567890123456789012345678901234567890123456789', '!")(*&^%', '\n\r', '']):
-        return_value = False
-        logging_device.error("Return value is %s" %return_value)
-    if not test('AUTH', ['WPA2'], []):
-        return_value = False
-        logging_device.error("Return value is %s" %return_value)
-
-    logging_device.info("\n\r\t\t-------- RTC --------")
-    if not test('RTC', ['0', '1470236756', '4294967295', constants.RTC], ['', '-1', '12345678901234567890123456789', 'timecountdown', 't1m3c0u5td0wn', '!")(*&^%']):
-        return_value = False
-        logging_device.error("Return value is %s" %return_value)
-
-    logging_device.info("\n\r\t\t-------- HEARTBEAT --------")
-    if not test('HEARTBEAT', ['5', '10', '30', '0', '60'], ['', '-1', '61', '65535', '1234567890', 'heartbeatcount', '!")(*&^%', '0123456789012345678901234567890123456789012345678901234567890123456789', \
-    'qwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwer']):
-        return_value = False
-        logging_device.error("Return value is %s" %return_value)
-
-    logging_device.info("\n\r\t\t-------- MOVEMENT --------")
-    if not test('MOVEMENT', ['ON', 'OFF'], ['', 'yes', 'NO', '0123', 'movement', 'm0v3m3nt', '0123456789012345678901234567890123456789012345678901234567890123456789', \
-    'qwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwer']):
-        return_value = False
-        logging_device.error("Return value is %s" %return_value)
-
-    logging_device.info("\n\r\t\t-------- ATMO --------")
-    if not test('ATMO', ['ON', 'OFF'], ['', 'yes', 'NO', '0123', 'atmo', '4tm0', '0123456789012345678901234567890123456789012345678901234567890123456789', \
-    'qwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwertyuiopqwer']):
-        return_value = False
-        logging_device.error("Return value is %s" %return_value)
-
-    logging_device.info("\n\r\t\t-------- STATIC MASK --------")
-    if not test('STATIC_MASK', ['192.168.15.98', '0.0.0.0', '255.255.255.255', '255.255.255.0'], ['ON', '', '-1.-1.-1.-1', '256.256.256.256', 'app.wolkabout.com', '\Test1234', '!")(*&^%;']):
-        return_value = False
-        logging_device.error("Return value is %s" %return_value)
-
-    logging_device.info("\n\r\t\t-------- STATIC GATEWAY --------")
-    if not test('STATIC_GATEWAY', ['192.168.15.98', '0.0.0.0', '255.255.255.255', '192.168.15.1'], ['ON', '', '-1.-1.-1.-1', '256.256.256.256', 'app.wolkabout.com', '\Test1234', '!")(*&^%;']):
-        return_value = False
-        logging_device.error("Return value is %s" %return_value)
-
-    logging_device.info("\n\r\t\t-------- STATIC DNS --------")
-    if not test('STATIC_DNS', ['192.168.15.98', '0.0.0.0', '255.255.255.255', '8.8.4.4'], ['ON', '', '-1.-1.-1.-1', '256.256.256.256', 'app.wolkabout.com', '\Test1234', '!")(*&^%;']):
-        return_value = False
-        logging_device.error("Return value is %s" %return_value)
-
-    logging_device.info("\n\r\t\t-------- STATIC IP --------")
-    if not test('STATIC_IP', ['192.168.15.98', '0.0.0.0', '255.255.255.255', 'OFF'], ['ON', '', '-1.-1.-1.-1', '256.256.256.256', 'app.wolkabout.com', '\Test1234', '!")(*&^%;']):
-        return_value = False
-        logging_device.error("Return value is %s" %return_value)
-
-    logging_device.info("\n\r\t\t-------- READINGS --------")
-    if not test_readings_response():
-        return_value = False
-        logging_device.error("Return value is %s" %return_value)
+    return return_value
 
-    logging_device.info("\n\r\t\t-------- SYSTEM --------")
-    if not test_system_response():
-        return_value = False
-        logging_device.error("Return value is %s" %return_value)
+def test_rw_parameters(boundary_only):
+    logging_device.info("------------------- R\W parameters -------------------")
 
-    logging_device.info("\n\r\t\t-------- TEMP_OFFSET --------")
-    if not test('TEMP_OFFSET', ['0.0', '2.0', '-1.0', '1.1', '1.7', '-1.5', '-0.9', '3.7', '-2.0'], ['3.71', '-2.01', '38.23', '-21.879', '', '-1.temperature.+1.QWE', 'app.wolkabout.com', '\Test1234', '!")(*&^%;']):
-        return_value = False
-        logging_device.error("Return value is %s" %return_value)
+    # vectors which passed before resume are not sent again, checkpoint is saved after every section
+    return run_sections(select(PLAN, boundary_only, checkpoint.covered()))
 
-    logging_device.info("\n\r\t\t-------- HUMIDITY_OFFSET --------")
-    if not test('HUMIDITY_OFFSET', ['0.0', '2.0', '-1.0', '1.3', '1.3', '-1.9', '-2.9', '3.0', '-3.0'], ['3.1', '-3.1', '78.12', '', '-1.humidity.+1.QWE', 'app.wolkabout.com', '\Test1234', '!")(*&^%;']):
+def run_sections(vectors):
+    return_value = True
+    failed = []
+    for section_vectors in sections(vectors):
+        passed, section_failed = run_plan(section_vectors)
+        checkpoint.cover(section_vectors, section_failed)
+        failed += section_failed
+    if failed:
         return_value = False
-        logging_device.error("Return value is %s" %return_value)
+        logging_device.error("Return value is %s, %d of %d vectors failed" %(return_value, len(failed), len(vectors)))
 
-    logging_device.info("\n\r\t\t-------- PRESSURE_OFFSET --------")
-    if not test('PRESSURE_OFFSET', ['0.0', '2.0', '-8.0', '8.2', '1.5', '-2.6', '-1.3', '10.0', '-10.0'], ['10.1', '-10.1', '94.65', '', '-1.pressure.+1.QWE', 'app.wolkabout.com', '\Test1234', '!")(*&^%;']):
-        return_value = False
-        logging_device.error("Return value is %s" %return_value)
+    return return_value
 
-    logging_device.info("\n\r\t\t-------- OFFSET_FACTORY --------")
-    if not test('OFFSET_FACTORY', ['RESET'], ['RESETTOFACTORY', 'RESE', '', '-1.pressure.+1.QWE', 'app.wolkabout.com', '\Test1234', '!")(*&^%;']):
-        return_value = False
-        logging_device.error("Return value is %s" %return_value)
+def shard_group(section):
+    '''
+    Sections which change the same fields run together, in plan order
+    '''
+    if section.startswith('STATIC_'):
+        return 'STATIC_*'
+    if section.endswith('_OFFSET') or section == 'OFFSET_FACTORY':
+        return 'OFFSETS'
+    return section
+
+def data_driven_shards(boundary_only = True):
+    '''
+    Independent parts of the suite for shards.assign(): [(name, function, state, cost)]
+    '''
+    groups = []
+    for section_vectors in sections(select(PLAN, boundary_only, checkpoint.covered())):
+        group = shard_group(section_vectors[0].section)
+        if not groups or groups[-1][0] != group:
+            groups.append((group, []))
+        groups[-1][1].extend(section_vectors)
+
+    shards = [('read_only', test_read_only_parameters, DATA_DRIVEN_STATE, SHARD_COSTS['read_only'])]
+    for group, group_vectors in groups:
+        shards.append((group, functools.partial(run_sections, group_vectors),
+                       STATIC_STATE if group == 'STATIC_*' else DATA_DRIVEN_STATE, len(group_vectors)))
+    shards.append(('readings', test_readings_response, DATA_DRIVEN_STATE, SHARD_COSTS['readings']))
+    shards.append(('system', test_system_response, DATA_DRIVEN_STATE, SHARD_COSTS['system']))
+    return shards
+
+def run_shards(names, boundary_only = True):
+    '''
+    Runs shards of data_driven_shards() given by name, results are in the checkpoint under data_driven/<name>
+    '''
+    logging_device.info("\n\r\t\t   Data Driven Tests, shards %s\n\r***************************************************************\n\r" %', '.join(names))
+
+    return_value = run_steps('data_driven', [(name, function, state)
+                                             for name, function, state, cost in data_driven_shards(boundary_only) if name in names])
 
-    logging_device.info("\n\r\t\t-------- ACQUISITION --------")
-    if not test('ACQUISITION', [], ['empty', 'CLEAR', '', '-1.pressure.+1.QWE', '!")(*&^%;']):
-        return_value = False
-        logging_device.error("Return value is %s" %return_value)
-    
     logging_device.log("\n\r")
     return return_value
 
-
 def test_readings_response():
     response = True
+    logging_device.info("\n\r\t\t-------- READINGS --------")
 
     i = 0
     list = ['', 'CLEAR']
@@ -208,6 +160,7 @@ def test_readings_response():
 
 def test_system_response():
     response = True
+    logging_device.info("\n\r\t\t-------- SYSTEM --------")
 
     i = 0
     list = ['', 'CLEAR']
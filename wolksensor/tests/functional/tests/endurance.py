@@ -0,0 +1,250 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Soak test, NOW cycles and buffer drains for days.
+       Every cycle runs NOW, waits until the device is back in IDLE and
+       drains READINGS and SYSTEM (reads them without clearing). Nothing is
+       kept per cycle, only streaming aggregates (harness/streaming.py):
+            * latency of NOW, READINGS and SYSTEM round trips
+            * NOW to IDLE time and connection phases of new SYSTEM items
+            * counts of E: error codes of SYSTEM items and of misbehaviour
+              (BUSY, no response, no IDLE, malformed response)
+            * failure streaks of connection cycles and of commands
+       Aggregates of the whole run and of the last WINDOWS_KEPT snapshot
+       intervals are saved to the snapshot file every interval, the file is
+       replaced at once. Errors are logged when a failure streak starts
+       and ends, not for every failure, so the log does not grow with a
+       device which keeps failing.
+'''
+import collections
+import json
+import os
+import time
+import constants
+import logging_device
+
+from codec import decode
+from phases import PHASES
+from ringbuffer import Link
+from streaming import QuantileSketch
+from streaming import Streak
+
+SOAK_COMMANDS = ['NOW', 'READINGS', 'SYSTEM']
+COUNTERS = ['busy', 'no_response', 'no_idle', 'malformed', 'readings', 'items', 'failed_items']
+SNAPSHOT_INTERVAL = 600         # seconds
+WINDOWS_KEPT = 24
+CYCLE_PERIOD = 0                # seconds between cycles, heartbeat cycles run meanwhile
+
+
+class Aggregates(object):
+    def __init__(self):
+        self.started = time.time()
+        self.cycles = 0
+        self.cycle_time = QuantileSketch()
+        self.latency = dict((command, QuantileSketch()) for command in SOAK_COMMANDS)
+        self.phases = dict((phase, QuantileSketch()) for phase in PHASES)
+        self.errors = {}
+        self.counters = dict((name, 0) for name in COUNTERS)
+
+    def summary(self):
+        result = {'started': self.started,
+                  'duration': time.time() - self.started,
+                  'cycles': self.cycles,
+                  'cycle_time': self.cycle_time.summary(),
+                  'latency': dict((command, sketch.summary()) for command, sketch in self.latency.items()),
+                  'phases': dict((phase, sketch.summary()) for phase, sketch in self.phases.items()),
+                  'errors': dict(self.errors)}
+        result.update(self.counters)
+        return result
+
+
+class Soak(object):
+    def __init__(self, port = None, link = None):
+        self.port = port
+        self.link = link or Link()
+        self.total = Aggregates()
+        self.window = Aggregates()
+        self.windows = collections.deque(maxlen = WINDOWS_KEPT)
+        self.streaks = {'cycle': Streak(), 'command': Streak()}
+        # SYSTEM items in the buffer at the last drain, items are told apart by all their fields
+        self.known_items = set()
+        self.version = None
+
+    def aggregates(self):
+        return (self.total, self.window)
+
+    def count(self, name, amount = 1):
+        for aggregates in self.aggregates():
+            aggregates.counters[name] += amount
+
+    def streak(self, name, failed):
+        streak = self.streaks[name]
+        ended = streak.add(failed)
+        if failed and streak.current == 1:
+            logging_device.error("%s failure streak started" %name)
+        if ended:
+            logging_device.info("%s failure streak of %d ended" %(name, ended))
+
+    def request(self, command, decoded = False):
+        '''
+        Returns response, decoded when asked, None when there is none or it is malformed
+        '''
+        responses, seconds, size = self.link.request(command + constants.COMMAND_TERMINATOR)
+        response = responses[0] if responses else None
+        if response is None:
+            self.count('no_response')
+        else:
+            for aggregates in self.aggregates():
+                aggregates.latency[command].add(seconds)
+            if decoded:
+                try:
+                    response = decode(response)
+                except ValueError:
+                    self.count('malformed')
+                    response = None
+        self.streak('command', response is None)
+        return response
+
+    def wait_idle(self, seen):
+        '''
+        Waits for IDLE which ends the connection cycle, every cycle is left through DISCONNECTING.
+        IDLE after acquisition which was running when NOW came does not end it
+        '''
+        deadline = time.time() + constants.STATUS_TIMEOUT
+        if not self.link.wait_notification('STATUS DISCONNECTING;', seen, constants.STATUS_TIMEOUT):
+            return False
+        seen = self.link.notifications.index('STATUS DISCONNECTING;', seen) + 1
+        return self.link.wait_notification('STATUS IDLE;', seen, max(0, deadline - time.time()))
+
+    def prime(self):
+        '''
+        Items which were in SYSTEM buffer before the soak are not counted
+        '''
+        items = self.request('SYSTEM', True) or []
+        self.known_items = set(tuple(item.values()) for item in items)
+        if items:
+            self.version = items[-1].version
+
+    def cycle(self):
+        # notifications of the previous cycle are dropped, memory stays constant
+        del self.link.notifications[:]
+        response = self.request('NOW')
+        if response == constants.BUSY:
+            # heartbeat cycle or acquisition is running
+            self.count('busy')
+            self.link.wait_notification('STATUS IDLE;', 0, constants.STATUS_TIMEOUT)
+            return
+        if response != constants.DONE:
+            if response is not None:
+                self.count('malformed')
+            return
+
+        start = time.time()
+        idle = self.wait_idle(0)
+        if idle:
+            for aggregates in self.aggregates():
+                aggregates.cycle_time.add(time.time() - start)
+        else:
+            self.count('no_idle')
+
+        self.drain_readings()
+        failed_items = self.drain_system()
+        # one outcome per cycle, timeout and failed item of the same cycle are one failure
+        self.streak('cycle', not idle or failed_items)
+        for aggregates in self.aggregates():
+            aggregates.cycles += 1
+
+    def drain_readings(self):
+        readings = self.request('READINGS', True)
+        if readings is not None:
+            self.count('readings', len(readings))
+
+    def drain_system(self):
+        '''
+        Returns True when a new SYSTEM item has error
+        '''
+        items = self.request('SYSTEM', True)
+        if items is None:
+            return False
+
+        failed = False
+        keys = set()
+        for item in items:
+            key = tuple(item.values())
+            keys.add(key)
+            if key in self.known_items:
+                continue
+            self.count('items')
+            if item.error:
+                self.count('failed_items')
+                for aggregates in self.aggregates():
+                    aggregates.errors[item.error] = aggregates.errors.get(item.error, 0) + 1
+            else:
+                for aggregates in self.aggregates():
+                    for phase in PHASES:
+                        # zero times are omitted by firmware
+                        aggregates.phases[phase].add(getattr(item, phase) or 0)
+            failed = failed or bool(item.error)
+            self.version = item.version or self.version
+        self.known_items = keys
+        return failed
+
+    def summary(self):
+        return {'port': self.port,
+                'version': self.version,
+                'updated': time.time(),
+                'total': self.total.summary(),
+                'windows': list(self.windows),
+                'streaks': dict((name, streak.summary()) for name, streak in self.streaks.items())}
+
+    def snapshot(self, path):
+        '''
+        Closes current window and replaces snapshot file
+        '''
+        self.windows.append(self.window.summary())
+        self.window = Aggregates()
+        summary = self.summary()
+        temporary = path + '.tmp'
+        with open(temporary, 'w') as f:
+            json.dump(summary, f, indent = 2, sort_keys = True)
+        if os.name == 'nt' and os.path.exists(path):
+            os.remove(path)
+        os.rename(temporary, path)
+        return summary
+
+
+def report_line(summary):
+    total = summary['total']
+    now = total['latency']['NOW']
+    return "%s: %d cycles in %.1f h, %d failed items %s, NOW p95 %s ms, cycle p95 %s s, longest failure streak %d" \
+           %(summary['port'], total['cycles'], total['duration'] / 3600, total['failed_items'],
+             ', '.join("%s:%d" %(code, count) for code, count in sorted(total['errors'].items())) or '-',
+             "%.1f" %(now['p95'] * 1000) if now['p95'] is not None else '-',
+             "%.1f" %total['cycle_time']['p95'] if total['cycle_time']['p95'] is not None else '-',
+             summary['streaks']['cycle']['longest'])
+
+def soak(path, port = None, duration = None, interval = SNAPSHOT_INTERVAL, period = CYCLE_PERIOD, link = None):
+    '''
+    Runs cycles until duration (seconds) is over or Ctrl+C, None runs forever. Returns last summary
+    '''
+    logging_device.info("\n\r\t\t   Soak Test\n\r***************************************************************\n\r")
+
+    run = Soak(port, link)
+    run.prime()
+    start = time.time()
+    next_snapshot = start + interval
+    try:
+        while duration is None or time.time() - start < duration:
+            run.cycle()
+            if time.time() >= next_snapshot:
+                logging_device.info(report_line(run.snapshot(path)))
+                next_snapshot = time.time() + interval
+            if period:
+                time.sleep(period)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        summary = run.snapshot(path)
+    logging_device.info(report_line(summary))
+    return summary
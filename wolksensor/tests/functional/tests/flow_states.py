@@ -1,23 +1,15 @@
 '''
 Created on August 08th 2016
 @author: srdjan.stankovic@wolkabout.com
-Last Modified on October 31th 2016
+Last Modified on October 18th 2026
 @author: srdjan.stankovic@wolkabout.com
 
 brief: Set of flow states tests
 '''
-import os
-import sys
 import time
-import re
-
-sys.path.append(os.path.dirname(os.path.realpath("Blesser.py")) + "/../../../WolkSensor-python-lib/core")
-sys.path.append(os.path.dirname(os.path.realpath("Blesser.py")) + "/../../../WolkSensor-python-lib/API")
-
 import logging_device
 import constants
 
-from device_test_func import protocol_parser
 from device_test_func import test
 from device_test_func import test_now
 from device_test_func import parse_readings
@@ -25,18 +17,51 @@ from device_test_func import receive_string_serial
 from device_test_func import send_string_serial_wait
 from device_test_func import wait_dev_state_idle
 from device_test_func import parse_system_reading
-from device_test_func import test_readings_response
-from device_wlan_set import set_wifi_parameters
+from checkpoint import run_steps
+from retry import retry
+from shadow import apply
+from shadow import forget
+from shadow import server_profile
+from shadow import wifi_profile
+from transport import wait_serial_message
+from transport import wait_serial_readings
+from codec import decode
+from codec import Offsets
+
+FLOW_STATES_STATE = wifi_profile(constants.SSID, constants.AUTH, constants.PASS) + server_profile() + \
+                    [('MOVEMENT', 'OFF'), ('ATMO', 'ON'), ('STATIC_IP', 'OFF')]
+NO_CONNECTION_STATE = wifi_profile('NULL', 'NONE', 'NULL') + [('MOVEMENT', 'OFF'), ('ATMO', 'ON')]
+
 
 def flow_states():
-    return_value = True
-    
     logging_device.info("\n\r\t\t   Flow States Testing\n\r***************************************************************\n\r")
-    while not set_wifi_parameters(constants.SSID, constants.AUTH, constants.PASS): pass
-    while not protocol_parser('MOVEMENT', True, 'OFF', True): pass
-    while not protocol_parser('ATMO', True, 'ON', True): pass
-    while not protocol_parser('STATIC_IP', True, 'OFF', True): pass
 
+    return_value = run_steps('flow_states', [
+        ('set_wifi',        test_set_wifi,        FLOW_STATES_STATE),
+        ('readings',        test_readings,        NO_CONNECTION_STATE),
+        ('offsets',         test_offsets,         NO_CONNECTION_STATE),
+        ('movement',        test_movement,        NO_CONNECTION_STATE),
+        ('system_readings', test_system_readings, NO_CONNECTION_STATE),
+        ('factory_offsets', test_factory_offsets, NO_CONNECTION_STATE)])
+
+    logging_device.log("\n\r")
+    return return_value
+
+
+def set_offset(pressure_offset, temperature_offset, humidity_offset):
+    logging_device.debug( "\n\rP offset: %s\n\rT offset: %s\n\rH offset: %s" %(str(pressure_offset), str(temperature_offset), str(humidity_offset)) )
+    forget('PRESSURE_OFFSET', 'TEMP_OFFSET', 'HUMIDITY_OFFSET')
+    if not test('PRESSURE_OFFSET', [str(pressure_offset)],[]):
+        return False
+    if not test('TEMP_OFFSET', [str(temperature_offset)],[]):
+        return False
+    if not test('HUMIDITY_OFFSET', [str(humidity_offset)],[]):
+        return False
+
+    return True
+
+def test_set_wifi():
+    return_value = True
     logging_device.info("\t\t---------------- Set WiFi Flow ----------------")
     logging_device.log("\t---True flow---")
     logging_device.info("\n\r\t\t-------- set Wifi with WPA2 secure --------")
@@ -73,19 +98,20 @@ def flow_states():
         logging_device.error("Return value is %s. Response from command NOW; is: %s" %(return_value, response))
     '''
     logging_device.log("\t---False flow---")
-    if not set_wifi_parameters('my0penwl4n', 'NONE', 'NULL'):
+    if not apply(wifi_profile('my0penwl4n', 'NONE', 'NULL')):
         return_value = False
         logging_device.error("Return value is %s" %return_value)
     if test_now('', '') == True:
         return_value = False
         logging_device.error("Return value is %s" %return_value)
 
+    return return_value
+
+def test_readings():
+    return_value = True
     logging_device.info("\n\r\t\t-------- read Readings --------")
     logging_device.log("\t---True flow---")
     wait_dev_state_idle()
-    while not set_wifi_parameters('NULL', 'NONE', 'NULL'): pass
-    test('MOVEMENT', ['OFF'],[])
-    test('ATMO', ['ON'],[])
     if not parse_readings('CLEAR', "show"):
         return_value = False
         logging_device.error("Return value is %s" %return_value)
@@ -106,91 +132,60 @@ def flow_states():
         logging_device.error("Return value is %s" %return_value)
 
     logging_device.log("CLEAR and OFF atmo measurements")
-    test('ATMO', ['OFF'],[])
+    apply([('ATMO', 'OFF')])
     if not parse_readings('CLEAR', "show"):
         return_value = False
         logging_device.error("Return value is %s" %return_value)
-    for i in reversed(range(0, 65)):
-        time.sleep(1)
-        print " | %s | ...wait 65sec to countdown ACQUISITION period \r" %i,
+    logging_device.log("...wait 65sec to countdown ACQUISITION period")
+    if wait_serial_message("STATUS ACQUISITION;", 65):
+        return_value = False
+        logging_device.error("ACQUISITION occurred while ATMO is OFF. Return value is %s" %return_value)
     if 'empty' != parse_readings('', "show"):
         return_value = False
         logging_device.error("READINGS message isn't empty. Expected to be. ATMO is OFF. Return value is %s" %return_value)
 
-    logging_device.info("\n\r\t\t-------- Check OFFSET settings --------")
-    def set_offset(pressure_offset, temperature_offset, humidity_offset):
-        logging_device.debug( "\n\rP offset: %s\n\rT offset: %s\n\rH offset: %s" %(str(pressure_offset), str(temperature_offset), str(humidity_offset)) )
-        if not test('PRESSURE_OFFSET', [str(pressure_offset)],[]):
-            return False
-        if not test('TEMP_OFFSET', [str(temperature_offset)],[]):
-            return False
-        if not test('HUMIDITY_OFFSET', [str(humidity_offset)],[]):
-            return False
+    return return_value
 
-        return True
+def test_offsets():
+    # numpy is loaded only by the steps which need it
+    from offsets import sample_readings
+    from offsets import check_shift
+    from offsets import OFFSET_SAMPLES
 
+    return_value = True
+    logging_device.info("\n\r\t\t-------- Check OFFSET settings --------")
     logging_device.log("\t---True flow---")
-    if not test('ATMO', ['ON'],[]):
+    if not apply([('ATMO', 'ON')]):
         return_value = False
         logging_device.error("Return value is %s" %return_value)
 
     if not set_offset(0, 0, 0):
         return_value = False
         logging_device.error("Return value is %s" %return_value)
-    if not parse_readings('CLEAR', "show"):
-        return_value = False
-        logging_device.error("Return value is %s" %return_value)
-
-    logging_device.log("set ACQUISITION state")
-    if not test('ACQUISITION', [], []):
-        return_value = False
-        logging_device.error("Return value is %s in send ACQUISITION" %return_value)
-    send_string_serial_wait("READINGS;")
-    received_string = receive_string_serial()
-    logging_device.debug("Received message readings: %s" %received_string)
-    if len(received_string) > 9 :
-        string_split = re.split(" ", received_string)
-    logging_device.debug("string_split is/are %s" %string_split)
-    pressure = test_readings_response(string_split[1], "show")[1]
-    temp = test_readings_response(string_split[1], "show")[2]    
-    humidity = test_readings_response(string_split[1], "show")[3]
-    logging_device.log("%s, %s, %s" %(pressure, temp, humidity))
+    logging_device.log("%d ACQUISITIONs without offsets" %OFFSET_SAMPLES)
+    before = sample_readings()
 
     logging_device.log("\tSET NEW OFFSET VALUES")
     if not set_offset(1, 2, 3):
         return_value = False
         logging_device.error("Return value is %s" %return_value)
-    if not parse_readings('CLEAR', "show"):
-        return_value = False
-        logging_device.error("Return value is %s" %return_value)
+    logging_device.log("%d ACQUISITIONs with new offsets" %OFFSET_SAMPLES)
+    after = sample_readings()
 
-    logging_device.log("set ACQUISITION state")
-    if not test('ACQUISITION', [], []):
+    if not check_shift(before, after, [1, 2, 3]):
         return_value = False
-        logging_device.error("Return value is %s in send ACQUISITION" %return_value)
-    send_string_serial_wait("READINGS;")
-    received_string = receive_string_serial()
-    logging_device.debug("Received message readings: %s" %received_string)
-    if len(received_string) > 9 :
-        string_split = re.split(" ", received_string)
-    logging_device.debug("string_split is/are %s" %string_split)
-    pressure_new = test_readings_response(string_split[1], "show")[1]
-    temp_new = test_readings_response(string_split[1], "show")[2]    
-    humidity_new = test_readings_response(string_split[1], "show")[3]
-    logging_device.log("Sensors values with new offsets are: %s, %s, %s" %(pressure_new, temp_new, humidity_new))
-
-    if not ((int(float(temp)*100) in range(int(float(temp_new)*100) - 25*10, int(float(temp_new)*100) - 15*10)) or (int(float(humidity)*100) in range(int(float(humidity_new)*100) - 35*10, int(float(humidity_new)*100) - 25*10)) or (int(float(pressure)*100) in range(int(float(pressure_new)*100) - 15*10, int(float(pressure_new)*100) - 5*10))):
         logging_device.error("Return value is %s \n\rSet new offset values failed" %return_value)
-        return_value = False
     else:
         logging_device.log("\tSUCCESSFUL ARE SETS NEW OFFSET VALUES")
 
+    return return_value
+
+def test_movement():
+    return_value = True
     logging_device.info("\n\r\t\t-------- read Movement --------")
     logging_device.log("\t---True flow---")
     wait_dev_state_idle()
-    test('MOVEMENT', ['ON'],[])
-    test('ATMO', ['OFF'],[])
-    if not set_wifi_parameters('NULL', 'NONE', 'NULL'):
+    if not apply(wifi_profile('NULL', 'NONE', 'NULL') + [('MOVEMENT', 'ON'), ('ATMO', 'OFF')]):
         return_value = False
         logging_device.error("Return value is %s" %return_value)
     if not parse_readings('CLEAR', "show"):
@@ -198,18 +193,16 @@ def flow_states():
         logging_device.error("Return value is %s" %return_value)
 
     logging_device.log("\t -->MOVE WolkSensor to continue testing<--")
-    send_string_serial_wait("READINGS;")
-    received_string = receive_string_serial()
-    while ",M:1.0;" not in received_string:
-        send_string_serial_wait("READINGS;")
-        received_string = receive_string_serial()
+    if not wait_serial_readings(",M:1.0;", constants.MOVEMENT_TIMEOUT):
+        return_value = False
+        logging_device.error("No movement readings in %s seconds. Return value is %s" %(constants.MOVEMENT_TIMEOUT, return_value))
     time.sleep(0.5)
     if not parse_readings('', "show"):
         return_value = False
         logging_device.error("Return value is %s" %return_value)
 
     wait_dev_state_idle()
-    test('MOVEMENT', ['OFF'],[])
+    apply([('MOVEMENT', 'OFF')])
     if not parse_readings('CLEAR', "show"):
         return_value = False
         logging_device.error("Return value is %s" %return_value)
@@ -220,12 +213,16 @@ def flow_states():
     if not parse_readings('', "show"):
         return_value = False
         logging_device.error("Return value is %s" %return_value)
-    test('ATMO', ['ON'],[])
+    apply([('ATMO', 'ON')])
+
+    return return_value
 
+def test_system_readings():
+    return_value = True
     logging_device.info("\n\r\t\t-------- read System readings--------")
     logging_device.log("\t---True flow---")
     wait_dev_state_idle()
-    if not set_wifi_parameters(constants.SSID, constants.AUTH, constants.PASS):
+    if not apply(wifi_profile(constants.SSID, constants.AUTH, constants.PASS)):
         return_value = False
         logging_device.error("Return value is %s" %return_value)
 
@@ -234,15 +231,17 @@ def flow_states():
         logging_device.error("Return value is %s" %return_value)
     logging_device.log("---NOW---")
     wait_dev_state_idle()
-    while test_now('', '') != True:
-        pass
+    response = retry(test_now, '', '', accept = lambda response: response == True)
+    if response != True:
+        return_value = False
+        logging_device.error("Return value is %s. Response from command NOW; is: %s" %(return_value, response))
     if not parse_system_reading('', 'show'):
         return_value = False
         logging_device.error("Return value is %s" %return_value)
 
     logging_device.log("\t---False flow---")
     wait_dev_state_idle()
-    if not set_wifi_parameters('doesnotexist', 'WPA', 'doesnotexist'):
+    if not apply(wifi_profile('doesnotexist', 'WPA', 'doesnotexist')):
         return_value = False
         logging_device.error("Return value is %s" %return_value)
     if not parse_system_reading('CLEAR', 'show'):
@@ -327,54 +326,68 @@ def flow_states():
 
     while not protocol_parser('ATMO', True, 'ON', True): pass
     '''
+
+    return return_value
+
+def read_decoded(command):
+    '''
+    Reads command and returns decoded value, None when response is missing or malformed
+    '''
+    send_string_serial_wait(command + ';')
+    received_string = receive_string_serial()
+    logging_device.debug("%s: %s" %(command, received_string))
+    try:
+        return decode(received_string)
+    except ValueError:
+        logging_device.error("%s response is malformed: %r" %(command, received_string))
+        return None
+
+def test_factory_offsets():
+    from offsets import sample_readings
+    from offsets import check_shift
+
+    return_value = True
     logging_device.info("\n\r\t\t-------- Factory OFFSET settings --------")
-    while not set_wifi_parameters('NULL', 'NONE', 'NULL'): pass
     wait_dev_state_idle()
 
     if not set_offset(-10, -2, 1.5):
         return_value = False
         logging_device.error("Return value is %s" %return_value)
+    before = sample_readings()
 
-    send_string_serial_wait('OFFSET_FACTORY' + ';')
-    received_string = receive_string_serial()
-    logging_device.debug(received_string)
-    string_split = re.split(" |;", received_string)
-    factory = string_split[1]
+    factory = read_decoded('OFFSET_FACTORY')
     logging_device.debug("Factory: %s" %factory)
     
     if not test('OFFSET_FACTORY', ['RESET'],[]):
         return_value = False
         logging_device.error("Return value is %s in OFFSET_FACTORY reset" %return_value)
+    forget('PRESSURE_OFFSET', 'TEMP_OFFSET', 'HUMIDITY_OFFSET')
 
-    send_string_serial_wait('TEMP_OFFSET' + ';')
-    received_string = receive_string_serial()
-    logging_device.debug("TEMP_OFFSET: %s" %received_string)
-    string_split = re.split(" |;", received_string)
-    temp = string_split[1]
+    temp = read_decoded('TEMP_OFFSET')
     logging_device.debug("temp: %s" %temp)
 
-    send_string_serial_wait('HUMIDITY_OFFSET' + ';')
-    received_string = receive_string_serial()
-    logging_device.debug("HUMIDITY_OFFSET: %s" %received_string)
-    string_split = re.split(" |;", received_string)
-    humidity = string_split[1]
+    humidity = read_decoded('HUMIDITY_OFFSET')
     logging_device.debug("humidity: %s" %humidity)
 
-    send_string_serial_wait('PRESSURE_OFFSET' + ';')
-    received_string = receive_string_serial()
-    logging_device.debug("PRESSURE_OFFSET: %s" %received_string)
-    string_split = re.split(" |;", received_string)
-    pressure = string_split[1]
+    pressure = read_decoded('PRESSURE_OFFSET')
     logging_device.debug("pressure: %s" %pressure)
 
-    offset = "P:%s,T:%s,H:%s" %(pressure, temp, humidity)
-    logging_device.log(factory)
-    logging_device.log(offset)
-    if factory != offset:
+    offset = Offsets(pressure, temp, humidity)
+    logging_device.log("%s" %factory)
+    logging_device.log("%s" %offset)
+    if factory is None or None in offset.values():
+        return_value = False
+        logging_device.error("Return value is %s, offsets were not read" %return_value)
+    elif factory != offset:
         return_value = False
         logging_device.error("Return value is %s in compare offset from factory. Factory offset are: %s, New offset are: %s" %(return_value, factory, offset))
     else:
         logging_device.log("\tSUCCESSFUL RESET TO FACTORY OFFSET")
 
-    logging_device.log("\n\r")
+    # readings follow restored offsets
+    after = sample_readings()
+    if not isinstance(factory, Offsets) or not check_shift(before, after, [factory.pressure + 10, factory.temperature + 2, factory.humidity - 1.5]):
+        return_value = False
+        logging_device.error("Return value is %s, readings do not follow factory offsets" %return_value)
+
     return return_value
@@ -0,0 +1,153 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Per-command round trip latency benchmark.
+       Every command from SDK/core/commands.h is sent many times in its read
+       form and, where it is safe to do so, in its write form with the value
+       just read, so device configuration is not changed. Every write is an
+       EEPROM write, so write forms are sent only WRITE_REPEAT times. Every
+       round trip is split into:
+            * write      - command written and drained to the port
+            * first_byte - first byte of the response received
+            * complete   - last response framed
+       Results carry firmware VERSION and are compared against a baseline
+       by benchmark.py.
+'''
+import time
+import constants
+import logging_device
+
+from codec import split
+from streaming import percentile
+
+LATENCY_REPEAT = 100
+WRITE_REPEAT = 3                # write forms, every one writes configuration to EEPROM
+LATENCY_THRESHOLD = 0.2         # allowed slowdown of p95 against baseline
+LATENCY_MIN_DELTA = 0.002       # seconds, smaller slowdowns are noise of the USB serial link
+HISTOGRAM_BUCKETS = [0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0]
+METRICS = ['write', 'first_byte', 'complete']
+
+READ_COMMANDS = ["MAC", "HEARTBEAT", "RTC", "VERSION", "STATUS", "READINGS", "ID", "SIGNATURE", "URL", "PORT",
+                 "SSID", "PASS", "AUTH", "MOVEMENT", "ATMO", "SYSTEM", "STATIC_IP", "STATIC_MASK", "STATIC_GATEWAY",
+                 "STATIC_DNS", "ALARM", "SET", "LOCATION", "SSL", "TEMP_OFFSET", "HUMIDITY_OFFSET", "PRESSURE_OFFSET",
+                 "OFFSET_FACTORY"]
+
+# written back with the value just read
+WRITE_COMMANDS = ["HEARTBEAT", "RTC", "MOVEMENT", "ATMO", "ALARM", "LOCATION", "SSL"]
+
+# not benchmarked: NOW and RELOAD leave idle state, ACQUISITION is an action, not a read: every one
+# adds a reading until the buffer is full, ID and SIGNATURE can be written once,
+# write forms of READINGS, SYSTEM and OFFSET_FACTORY drop device data,
+# first write of TEMP/HUMIDITY/PRESSURE_OFFSET on a unit without factory offset becomes the factory offset,
+# writes of SSID, PASS, AUTH, STATIC_* disconnect Wi-Fi and of URL, PORT close the socket (commands.c)
+
+
+def histogram(samples):
+    '''
+    Number of samples up to every bucket edge, last count is for samples above last edge
+    '''
+    counts = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+    for sample in samples:
+        bucket = 0
+        while bucket < len(HISTOGRAM_BUCKETS) and sample > HISTOGRAM_BUCKETS[bucket]:
+            bucket += 1
+        counts[bucket] += 1
+    return counts
+
+def summary(samples):
+    samples = sorted(samples)
+    return {'p50': percentile(samples, 0.50),
+            'p95': percentile(samples, 0.95),
+            'p99': percentile(samples, 0.99),
+            'min': samples[0] if samples else None,
+            'max': samples[-1] if samples else None,
+            'histogram': histogram(samples)}
+
+def write_argument(transport, command):
+    '''
+    Reads command and returns string which writes the same value back, None when there is nothing to write
+    '''
+    responses = transport.request(command + constants.COMMAND_TERMINATOR)
+    if not responses:
+        return None
+    name, argument = split(responses[0])
+    if name != command or not argument:
+        return None
+    if command == "RTC":
+        read_time = time.time()
+        return lambda: "RTC %d;" %(int(argument) + int(time.time() - read_time))
+    string = command + constants.COMMAND_ARGUMENT_SEPARATOR + argument + constants.COMMAND_TERMINATOR
+    return lambda: string
+
+def measure(transport, string_function, repeat):
+    samples = dict((metric, []) for metric in METRICS)
+    timeouts = 0
+    for i in range(repeat):
+        responses, times = transport.timed_request(string_function())
+        if None in times or not responses:
+            timeouts += 1
+            continue
+        for metric, value in zip(METRICS, times):
+            samples[metric].append(value)
+
+    result = dict((metric, summary(samples[metric])) for metric in METRICS)
+    result['samples'] = repeat
+    result['timeouts'] = timeouts
+    return result
+
+def version(transport):
+    responses = transport.request('VERSION;')
+    if responses and responses[0].startswith('VERSION '):
+        return split(responses[0])[1]
+    return None
+
+def latency(transport, repeat = LATENCY_REPEAT, write_repeat = WRITE_REPEAT):
+    '''
+    Returns {'version': .., 'repeat': .., 'write_repeat': .., 'commands': {command string: {metric: summary, ..}}}
+    '''
+    logging_device.info("\n\r\t\t   Latency Benchmark\n\r***************************************************************\n\r")
+
+    results = {'version': version(transport), 'repeat': repeat, 'write_repeat': write_repeat, 'date': time.strftime('%Y-%m-%d %H:%M:%S'), 'commands': {}}
+    logging_device.info("Firmware version: %s" %results['version'])
+
+    for command in READ_COMMANDS:
+        string = command + constants.COMMAND_TERMINATOR
+        results['commands'][string] = measure(transport, lambda: string, repeat)
+        logging_device.log("%-24s p50 %6.1f ms" %(string, (results['commands'][string]['complete']['p50'] or 0) * 1000))
+
+    for command in WRITE_COMMANDS:
+        string_function = write_argument(transport, command)
+        if string_function is None:
+            logging_device.info("%s not set on device, write form skipped" %command)
+            continue
+        name = command + " <value>;"
+        results['commands'][name] = measure(transport, string_function, write_repeat)
+        logging_device.log("%-24s p50 %6.1f ms" %(name, (results['commands'][name]['complete']['p50'] or 0) * 1000))
+
+    return results
+
+def compare(results, baseline, threshold = LATENCY_THRESHOLD, min_delta = LATENCY_MIN_DELTA):
+    '''
+    Returns list of (command, metric, baseline p95, current p95) for commands slower than threshold
+    '''
+    if results.get('version') != baseline.get('version'):
+        logging_device.info("Comparing firmware %s against baseline %s" %(results.get('version'), baseline.get('version')))
+
+    regressions = []
+    for command, result in sorted(results['commands'].items()):
+        if command not in baseline['commands']:
+            continue
+        if result['timeouts'] > baseline['commands'][command]['timeouts']:
+            logging_device.error("%s timeouts: %d, baseline: %d" %(command, result['timeouts'], baseline['commands'][command]['timeouts']))
+            regressions.append((command, 'timeouts', baseline['commands'][command]['timeouts'], result['timeouts']))
+        for metric in METRICS:
+            old = baseline['commands'][command][metric]['p95']
+            new = result[metric]['p95']
+            if old is None or new is None:
+                continue
+            if new > old * (1 + threshold) and new - old > min_delta:
+                logging_device.error("%s %s p95 %.1f ms, baseline %.1f ms" %(command, metric, new * 1000, old * 1000))
+                regressions.append((command, metric, old, new))
+
+    return regressions
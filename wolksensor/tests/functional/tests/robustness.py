@@ -1,64 +1,80 @@
 '''
 Created on August 10th 2016
 @author: srdjan.stankovic@wolkabout.com
-Last Modified on August 11th 2016
+Last Modified on October 18th 2026
 @author: srdjan.stankovic@wolkabout.com
 
 brief: Set of robustness tests
 '''
-import os
-import sys
-import time
 import constants
-
-sys.path.append(os.path.dirname(os.path.realpath("Blesser.py")) + "/../../../WolkSensor-python-lib/core")
-sys.path.append(os.path.dirname(os.path.realpath("Blesser.py")) + "/../../../WolkSensor-python-lib/API")
-
 import logging_device
+import recorder
 
 from serial_func import send_string_serial_wait
 from serial_func import receive_string_serial
 from device_test_func import wait_dev_state_idle
 from device_test_func import unwanted_response
-from device_test_func import protocol_parser
 from device_test_func import parse_readings
-from device_test_func import test
-from device_wlan_set import set_wifi_parameters
+from checkpoint import run_steps
+from retry import retry
+from ringbuffer import check_buffer
+from ringbuffer import READINGS_BUFFER
+from ringbuffer import OVERFILL
+from shadow import apply
+from shadow import forget
+from shadow import server_profile
+from shadow import wifi_profile
+from transport import wait_serial_message
 
 
-def robustness():
-    return_value = True
-    
-    def check_more_commands(command_argument_list, check_condition, visibility):
-        response = True
-        i = 0
-
-        while i < len(command_argument_list):
-            if "show" in visibility: logging_device.log("---> Send commands:" + command_argument_list[i])
-            send_string_serial_wait(command_argument_list[i])
-            if check_condition:
-                received = receive_string_serial()
-                if unwanted_response(received):
-                    logging_device.debug("Unwanted response occurred. Received: %s" %received)
-                    response = False
-                if "show" in visibility: logging_device.log(" <-- Received response: %s" %received)
-            elif not check_condition:
-                received = receive_string_serial()
-                if not unwanted_response(received):
-                    logging_device.debug("Strange response occurred. Received: %s" %received)
-                    response = False
-                if "show" in visibility: logging_device.log(" <-- Received response: %s" %received)
-            else:
-                logging_device.error("Wrong input for check condition. Received: %s" %check_condition)
-            i += 1
-
-        return response
+CONNECTION_STATE = wifi_profile(constants.SSID, constants.AUTH, constants.PASS) + server_profile() + [('MOVEMENT', 'OFF'), ('ATMO', 'ON')]
 
 
+def robustness():
     logging_device.info("\n\r\t\t   Robustness Testing\n\r***************************************************************\n\r")
-    wait_dev_state_idle()
-    while not protocol_parser('MOVEMENT', True, 'OFF', True): pass
 
+    return_value = run_steps('robustness', [
+        ('set_of_commands',   test_set_of_commands,   [('MOVEMENT', 'OFF')]),
+        ('during_connection', test_during_connection, [('MOVEMENT', 'OFF')]),
+        ('during_movement',   test_during_movement,   [('MOVEMENT', 'OFF')]),
+        ('buffer_size',       test_buffer_size,       CONNECTION_STATE),
+        ('restore',           test_restore,           [])])
+
+    logging_device.log("\n\r")
+    return return_value
+
+
+def check_more_commands(command_argument_list, check_condition, visibility):
+    response = True
+    i = 0
+
+    while i < len(command_argument_list):
+        # shown exchanges go to console and log file through logging_device, recorder only traces them
+        if "show" in visibility: logging_device.log("---> Send commands:" + command_argument_list[i])
+        recorder.sent(command_argument_list[i], True)
+        send_string_serial_wait(command_argument_list[i])
+        if check_condition:
+            received = receive_string_serial()
+            recorder.received(received, True)
+            if unwanted_response(received):
+                logging_device.debug("Unwanted response occurred. Received: %s" %received)
+                response = False
+            if "show" in visibility: logging_device.log(" <-- Received response: %s" %received)
+        elif not check_condition:
+            received = receive_string_serial()
+            recorder.received(received, True)
+            if not unwanted_response(received):
+                logging_device.debug("Strange response occurred. Received: %s" %received)
+                response = False
+            if "show" in visibility: logging_device.log(" <-- Received response: %s" %received)
+        else:
+            logging_device.error("Wrong input for check condition. Received: %s" %check_condition)
+        i += 1
+
+    return response
+
+def test_set_of_commands():
+    return_value = True
     logging_device.info("---------------- Send set of commands ----------------")
     logging_device.log("\t---True---")
     wait_dev_state_idle()
@@ -72,9 +88,13 @@ def robustness():
         return_value = False
         logging_device.error("Return value is %s" %return_value)
 
+    return return_value
+
+def test_during_connection():
+    return_value = True
     logging_device.info("---------------- Read/Write values during connection ----------------")
     logging_device.log("\t---True---")
-    if not set_wifi_parameters('fakeargumentssid', 'NONE', 'fakeargumentpass'):
+    if not apply(wifi_profile('fakeargumentssid', 'NONE', 'fakeargumentpass')):
         return_value = False
     if not check_more_commands(['NOW;', 'SIGNATURE;STATIC_DNS;VERSION;PASS;MOVEMENT;SSID;STATIC_IP;MAC;HEARTBEAT;RTC;AUTH;PASS;TEMP_OFFSET;ID;STATUS;OFFSET_FACTORY'], True, "show"):
         return_value = False
@@ -85,9 +105,11 @@ def robustness():
     if not check_more_commands(['NOW;', 'STATIC_DNS 89.89.89.90;PASS mypassword;OFFSET_FACTORY RESET;SSID myssid;STATIC_IP 192.168.24.23;HEARTBEAT 35;RTC 12356789;AUTH NONE;'], True, "show"):
         return_value = False
         logging_device.error("Return value is %s" %return_value)
+    # writes above are sent around the shadow
+    forget()
 
     logging_device.log("\t---True---")
-    if not set_wifi_parameters(constants.SSID, constants.AUTH, constants.PASS):
+    if not apply(wifi_profile(constants.SSID, constants.AUTH, constants.PASS)):
         logging_device.error("Writing new wifi parameters failed")
         return_value = False
     wait_dev_state_idle()
@@ -114,15 +136,22 @@ def robustness():
         return_value = False
         logging_device.error("Return value is %s" %return_value)
     '''
+
+    return return_value
+
+def test_during_movement():
+    return_value = True
     logging_device.info("---------------- Read during movement ----------------")
     logging_device.log("\t---True---")
     wait_dev_state_idle()
-    if not set_wifi_parameters(constants.SSID, constants.AUTH, constants.PASS):
+    if not apply(wifi_profile(constants.SSID, constants.AUTH, constants.PASS)):
         return_value = False
-    protocol_parser('MOVEMENT', True, 'ON', True)
+    apply([('MOVEMENT', 'ON')])
 
     logging_device.log("\t -->MOVE WolkSensor to continue testing<--")
-    while "STATUS CONNECTING_TO_AP;" not in receive_string_serial(): pass
+    if not wait_serial_message("STATUS CONNECTING_TO_AP;", constants.MOVEMENT_TIMEOUT):
+        return_value = False
+        logging_device.error("Device didn't start connecting in %s seconds" %constants.MOVEMENT_TIMEOUT)
     if not check_more_commands(['SIGNATURE;STATIC_DNS;VERSION;PRESSURE_OFFSET;PASS;MOVEMENT;SSID;STATIC_IP;MAC;HEARTBEAT;RTC;AUTH;OFFSET_FACTORY;PASS;ID;STATUS;'], True, "show"):
         return_value = False
     if not check_more_commands(['P0RT;ST4TIC_DNS;V3RS1ON;ATM0;HEARTBEATMAC;7422;MOVEMENTBRE;SSID123SSID;ST4TUS;'], False, "show"):
@@ -131,12 +160,14 @@ def robustness():
 
     logging_device.log("\t---False---")
     wait_dev_state_idle()
-    if not set_wifi_parameters('fakeargumentssid', 'WEP', 'FA7EA4603E27'):
+    if not apply(wifi_profile('fakeargumentssid', 'WEP', 'FA7EA4603E27')):
         return_value = False
-    protocol_parser('MOVEMENT', True, 'ON', True)
+    apply([('MOVEMENT', 'ON')])
 
     logging_device.log("\t -->MOVE WolkSensor to continue testing<--")
-    while "STATUS CONNECTING_TO_AP;" not in receive_string_serial(): pass
+    if not wait_serial_message("STATUS CONNECTING_TO_AP;", constants.MOVEMENT_TIMEOUT):
+        return_value = False
+        logging_device.error("Device didn't start connecting in %s seconds" %constants.MOVEMENT_TIMEOUT)
     if not check_more_commands(['SIGNATURE;STATIC_DNS;VERSION;PRESSURE_OFFSET;PASS;MOVEMENT;SSID;STATIC_IP;MAC;HEARTBEAT;RTC;AUTH;OFFSET_FACTORY;PASS;ID;STATUS;'], True, "show"):
         return_value = False
     if check_more_commands(['P0RT;ST4TIC_DNS;V3RS1ON;ATM0;HEARTBEATMAC;7422;MOVEMENTBRE;SSID123SSID;ST4TUS;'], False, "show"):
@@ -144,71 +175,45 @@ def robustness():
         logging_device.error("Return value is %s" %return_value)
 
     wait_dev_state_idle()
-    protocol_parser('MOVEMENT', True, 'OFF', True)
-    while not set_wifi_parameters(constants.SSID, constants.AUTH, constants.PASS): pass
+    apply([('MOVEMENT', 'OFF')])
+    if not retry(apply, wifi_profile(constants.SSID, constants.AUTH, constants.PASS)):
+        return_value = False
     if not check_more_commands(['NOW;'], True, "show"):
         return_value = False
         logging_device.error("Return value is %s" %return_value)
 
+    return return_value
+
+def test_buffer_size():
+    return_value = True
     logging_device.info("\n\r\t\t---------------- Buffer size test with ACQUISITION; ----------------")
     logging_device.log("\t---True---")
-    BUFFER_SIZE = 150
     wait_dev_state_idle()
-    while not set_wifi_parameters(constants.SSID, constants.AUTH, constants.PASS): pass
-    check_more_commands(['ATMO ON;'],True, "show")
     if not parse_readings('CLEAR', "show"):
         return_value = False
         logging_device.error("Return value is %s on READINGS CLEAR; command" %return_value)
 
-    def check_buff(result):
-        if int(result) == BUFFER_SIZE:
-            logging_device.log("The Buffer is full. Number of readings is/are %s which is equal to buffer size.\n\r\tSUCCESSFULLY FILLED BUFFER" % result)
-        elif int(result) < BUFFER_SIZE:
-            logging_device.error("Number of readings is smaller than full MAX buffer size.")
-        else:
-            logging_device.error("Number of readings is bigger than full MAX buffer size.")
-
-        if not parse_readings('CLEAR', "hide"):
-            return_value = False
-            logging_device.error("Return value is %s on READINGS CLEAR; command" %return_value)
-
-    for counter in range(0, BUFFER_SIZE):
-        if not check_more_commands(['ACQUISITION;'], True, "hide"):
-            return_value = False
-            logging_device.error("Return value is %s on ACQUISITION; action" %return_value)
-            return
-        sys.stdout.write("...sending ACQUISITION;\r")
-        logging_device.debug("number of iteration is %d on ACQUISITION; action" %counter)
-
-    wait_dev_state_idle()
-    result = parse_readings('', "hide")
-    if not result:
+    result = check_buffer(READINGS_BUFFER, 0)
+    if result['problems']:
         return_value = False
-        logging_device.error("Return value is %s on READINGS; command" %return_value)
-    check_buff(result)
+    else:
+        logging_device.log("The Buffer is full. Number of readings is/are %s which is equal to buffer size.\n\r\tSUCCESSFULLY FILLED BUFFER" %result['items'])
 
-    logging_device.log("Made more[190] ACQUISITIONs than buffer can store[180]")
-    for counter in range(0, BUFFER_SIZE+10):
-        if not check_more_commands(['ACQUISITION;'], True, "hide"):
-            return_value = False
-            logging_device.error("Return value is %s on ACQUISITION; action" %return_value)
-            return
-        sys.stdout.write("...sending ACQUISITION;\r")
-        logging_device.debug("number of iteration is %d on ACQUISITION; action" %counter)
-
-    wait_dev_state_idle()
-    result = parse_readings('', "hide")
-    if not result:
+    logging_device.log("Made more[%d] ACQUISITIONs than buffer can store[%d]" %(READINGS_BUFFER.size + OVERFILL, READINGS_BUFFER.size))
+    result = check_buffer(READINGS_BUFFER, OVERFILL)
+    if result['problems']:
         return_value = False
-        logging_device.error("Return value is %s on READINGS; command" %return_value)
-    check_buff(result)
+    else:
+        logging_device.log("Readings over buffer size were rejected, the oldest %s readings are kept in order" %result['items'])
 
+    return return_value
 
+def test_restore():
+    return_value = True
     logging_device.info("\n\r\t\t---------------- Return WolkSensor to settings before the test was started ----------------")
     wait_dev_state_idle()
-    while not set_wifi_parameters(constants.SSID, constants.AUTH, constants.PASS): pass
-    while not protocol_parser('MOVEMENT', True, 'OFF', True): pass
-    while not protocol_parser('ATMO', True, 'ON', True): pass
+    if not retry(apply, CONNECTION_STATE):
+        return_value = False
+        logging_device.error("Settings before the test were not restored")
 
-    logging_device.log("\n\r")
     return return_value
@@ -0,0 +1,136 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: Micro-benchmarks of SDK core hot paths built for host (see Makefile).
+       Loops run inside the library, number of iterations is calibrated so
+       every benchmark runs for at least --time seconds, best of --repeat
+       runs is reported as ns/op and bytes/s.
+
+       python benchmark.py                          - run and print results
+       python benchmark.py --json results.json      - also save results
+       python benchmark.py --baseline results.json  - compare with saved results,
+                                                      exit code 1 if any benchmark is
+                                                      slower than --tolerance
+'''
+#!/Python27/python
+import argparse
+import json
+import sys
+import time
+
+import host
+
+MIN_TIME = 0.2
+REPEAT = 5
+TOLERANCE = 0.10
+
+# SDK/core/sensor_readings_buffer.h, SDK/core/system_buffer.h
+SENSOR_READINGS_BUFFER_SIZE = 150
+SYSTEM_BUFFER_SIZE = 60
+
+PARSE_STRING = "RTC 1514824768;HEARTBEAT 10;URL 192.168.1.100;PORT 1883;SSID wolkabout;STATUS;READINGS;"
+
+
+def fill_buffers():
+    host.clear_buffers()
+    for i in range(SENSOR_READINGS_BUFFER_SIZE):
+        host.store_reading(1514824768 + 60 * i, 1013.2 + i % 7, 23.1 + i % 3, 45.0 + i % 5, i % 2)
+    for i in range(SYSTEM_BUFFER_SIZE):
+        host.store_system_item(1514824768 + 600 * i, 0, 1200, 300, 450, 800, 50, 3000 - i)
+
+def benchmarks():
+    '''
+    [(name, function(iterations) -> bytes)]
+    '''
+    return [
+        ("add_array 64B",        lambda n: host.bench_add_array(n, 64)),
+        ("add_array 512B",       lambda n: host.bench_add_array(n, 512)),
+        ("peek_array 512B",      lambda n: host.bench_peek_array(n, 512)),
+        ("add+pop_array 64B",    lambda n: host.bench_add_pop_array(n, 64)),
+        ("add+pop_array 512B",   lambda n: host.bench_add_pop_array(n, 512)),
+        ("READINGS x%d" %SENSOR_READINGS_BUFFER_SIZE, lambda n: host.bench_serialize(n, True)),
+        ("SYSTEM x%d" %SYSTEM_BUFFER_SIZE,            lambda n: host.bench_serialize(n, False)),
+        ("parse 7 commands",     lambda n: host.bench_parse(n, PARSE_STRING))]
+
+def measure(function, min_time = MIN_TIME, repeat = REPEAT):
+    '''
+    Returns (ns/op, bytes/s) of the fastest run
+    '''
+    iterations = 1
+    while True:
+        start = time.time()
+        function(iterations)
+        elapsed = time.time() - start
+        if elapsed >= min_time:
+            break
+        iterations *= 2 if elapsed < min_time / 10 else int(min_time / elapsed) + 1
+
+    best = None
+    for i in range(repeat):
+        start = time.time()
+        moved = function(iterations)
+        elapsed = time.time() - start
+        if best is None or elapsed < best[0]:
+            best = (elapsed, moved)
+
+    elapsed, moved = best
+    return elapsed / iterations * 1e9, moved / elapsed
+
+def run(min_time = MIN_TIME, repeat = REPEAT):
+    fill_buffers()
+    results = {}
+    for name, function in benchmarks():
+        ns, rate = measure(function, min_time, repeat)
+        results[name] = {"ns_per_op": ns, "bytes_per_s": rate}
+        print " %-22s %12.1f ns/op %10.1f MB/s" %(name, ns, rate / 1e6)
+    return results
+
+def compare(results, baseline, tolerance = TOLERANCE):
+    '''
+    Returns list of benchmark names slower than baseline by more than tolerance
+    '''
+    regressions = []
+    print
+    print " %-22s %12s %12s %8s" %("benchmark", "baseline", "current", "change")
+    for name in sorted(results):
+        if name not in baseline:
+            continue
+        old = baseline[name]["ns_per_op"]
+        new = results[name]["ns_per_op"]
+        change = (new - old) / old
+        mark = ""
+        if change > tolerance:
+            regressions.append(name)
+            mark = "  REGRESSION"
+        print " %-22s %12.1f %12.1f %+7.1f%%%s" %(name, old, new, change * 100, mark)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description = "SDK core host micro-benchmarks")
+    parser.add_argument("--json", help = "save results to file")
+    parser.add_argument("--baseline", help = "compare with results saved by --json")
+    parser.add_argument("--tolerance", type = float, default = TOLERANCE, help = "allowed slowdown, default %(default)s")
+    parser.add_argument("--time", type = float, default = MIN_TIME, help = "minimum seconds per run, default %(default)s")
+    parser.add_argument("--repeat", type = int, default = REPEAT, help = "runs per benchmark, default %(default)s")
+    arguments = parser.parse_args()
+
+    results = run(arguments.time, arguments.repeat)
+
+    if arguments.json:
+        with open(arguments.json, "w") as f:
+            json.dump(results, f, indent = 2, sort_keys = True)
+
+    if arguments.baseline:
+        with open(arguments.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, arguments.tolerance)
+        if regressions:
+            print
+            print "Slower than baseline: %s" %', '.join(regressions)
+            return 1
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
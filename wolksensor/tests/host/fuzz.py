@@ -0,0 +1,336 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: In-process fuzzer of command_parser.c.
+       Inputs are generated around the limits in commands.h/config.h
+       (constants.py) and fed to extract_commands_from_string_buffer()
+       through libwolksensor_host.so. Batches run in forked worker processes,
+       so crash or hang of the parser takes down only its worker:
+
+           crash - worker died on signal (stack protector, segmentation fault)
+                   or exited with nonzero exit code
+           hang  - worker made no progress for --hang-timeout seconds
+
+       Worker is restarted after the offending input. Crashes with the same
+       signature (exit and command the input was built from, all inputs over
+       COMMAND_MAX_LENGTH together) are reported once with the number of
+       occurrences, so a known overflow does not use up --max-crashes.
+       Inputs are generated up to COMMAND_STRING_BUFFER_SIZE, --max-length
+       cuts them shorter.
+       Every other input ends as accepted, rejected (BAD command)
+       or incomplete (no terminator), counted per command it was built from.
+
+       python fuzz.py                            - 1000000 inputs on all cores
+       python fuzz.py -n 100000 --seed 7 -j 2
+       python fuzz.py --max-length 96            - stay within COMMAND_MAX_LENGTH
+       python fuzz.py --output findings.txt      - save crashing and hanging inputs
+'''
+#!/Python27/python
+import argparse
+import ctypes
+import multiprocessing
+import os
+import random
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../functional/initialisation")
+
+import constants
+import host
+
+COUNT = 1000000
+BATCH = 20000
+HANG_TIMEOUT = 2.0
+MAX_CRASHES = 20
+POLL_PERIOD = 0.005
+
+# commands.h
+ARGUMENT_ITEMS_SEPARATOR = '|'
+ARGUMENT_ITEM_KEY_VALUE_SEPARATOR = ':'
+ARGUMENT_ITEM_VALUES_SEPARATOR = ','
+SEPARATORS = constants.COMMAND_TERMINATOR + constants.COMMAND_ARGUMENT_SEPARATOR + \
+             ARGUMENT_ITEMS_SEPARATOR + ARGUMENT_ITEM_KEY_VALUE_SEPARATOR + ARGUMENT_ITEM_VALUES_SEPARATOR
+
+LIMITS = (0, 1, constants.MAX_INT_LENGTH, constants.MIN_WIFI_PASSWORD_SIZE_WEP, constants.MAX_WIFI_PASSWORD_SIZE_WEP,
+          constants.MAX_HOSTNAME_SIZE, constants.MAX_WIFI_SSID_SIZE, constants.MAX_WIFI_PASSWORD_SIZE,
+          constants.COMMAND_NAME_MAX_LENGTH, constants.COMMAND_ARGUMENT_MAX_LENGTH, constants.COMMAND_MAX_LENGTH)
+BOUNDARY_LENGTHS = sorted(set(limit + delta for limit in LIMITS for delta in (-1, 0, 1) if limit + delta >= 0))
+
+NUMBERS = (0, 1, 59, 60, 61, 255, 256, 9999, 65535, 65536, 99999, 100000, 2147483647, 4294967295, 4294967296)
+OCTETS = ('0', '1', '254', '255', '256', '999', '', '-1', '00', '0255')
+DECIMALS = ('0', '0.0', '-0.0', '1.', '.5', '-.', '1e3', '1.2.3', '--1', '+1',
+            '-2.0', '-2.1', '3.7', '3.8', '-3.0', '3.0', '3.1', '-10.0', '10.0', '10.1')
+ITEM_KEYS = ('R', 'P', 'T', 'H', 'M', 'E', 'A', 'B', '')
+ALPHABETS = ('0123456789', '0123456789ABCDEFabcdef', 'ABCDEFGHIJKLMNOPQRSTUVWXYZ_', SEPARATORS * 4 + 'aZ09',
+             ''.join(chr(i) for i in range(32, 127)), ''.join(chr(i) for i in range(256)))
+
+NAMES = host.COMMAND_TYPES[1:]
+MULTIPLE = len(host.COMMAND_TYPES)
+ROWS = ["(random name)"] + NAMES + ["(multiple)"]
+ACCEPTED, REJECTED, INCOMPLETE = range(3)
+OUTCOMES = ("accepted", "rejected", "incomplete")
+
+
+def text(rng, alphabet = None, length = None):
+    if alphabet is None:
+        alphabet = rng.choice(ALPHABETS)
+    if length is None:
+        length = rng.choice(BOUNDARY_LENGTHS)
+    return ''.join(rng.choice(alphabet) for i in xrange(length))
+
+def number(rng):
+    value = rng.choice(NUMBERS) if rng.random() < 0.8 else rng.randint(0, 1 << 33)
+    return rng.choice(('%d', '-%d', '+%d', '0%d', '%X', '0x%x')) %value
+
+def address(rng):
+    return '.'.join(rng.choice(OCTETS) for i in range(rng.choice((3, 4, 4, 4, 4, 5))))
+
+def decimal(rng):
+    return rng.choice(DECIMALS) if rng.random() < 0.8 else "%.*f" %(rng.randint(0, 8), rng.uniform(-20, 20))
+
+def items(rng):
+    result = []
+    for i in range(rng.randint(0, 6)):
+        values = [rng.choice(ITEM_KEYS) + ARGUMENT_ITEM_KEY_VALUE_SEPARATOR + rng.choice((number(rng), decimal(rng), ''))
+                  for j in range(rng.randint(1, 5))]
+        result.append(ARGUMENT_ITEM_VALUES_SEPARATOR.join(values))
+    return ARGUMENT_ITEMS_SEPARATOR.join(result)
+
+ARGUMENTS = (text, number, address, decimal, items, lambda rng: rng.choice(('ON', 'OFF', 'RESET', 'NONE', 'WEP', 'WPA2', 'WPA')))
+
+def mutate(rng, string):
+    for i in range(rng.randint(1, 3)):
+        position = rng.randint(0, len(string))
+        choice = rng.randint(0, 3)
+        if choice == 0:
+            string = string[:position] + rng.choice(SEPARATORS) + string[position:]
+        elif choice == 1:
+            string = string[:position] + string[position + 1:]
+        elif choice == 2:
+            string = string[:position] + chr(rng.randint(0, 255)) + string[position + 1:]
+        else:
+            string = string[:position] + string[position:position + rng.randint(1, 16)] * 2 + string[position:]
+    return string
+
+def command(rng):
+    '''
+    Returns (row, command string)
+    '''
+    if rng.random() < 0.9:
+        row = rng.randint(1, len(NAMES))
+        name = NAMES[row - 1]
+        variant = rng.random()
+        if variant < 0.05:
+            name = name.lower()
+        elif variant < 0.1:
+            name = name[:rng.randint(1, len(name))]
+        elif variant < 0.15:
+            name = name + text(rng, length = rng.randint(1, 3))
+    else:
+        row = 0
+        name = text(rng, length = rng.choice(BOUNDARY_LENGTHS[:-3]))
+
+    if rng.random() < 0.3:
+        string = name + constants.COMMAND_TERMINATOR
+    else:
+        argument = rng.choice(ARGUMENTS)(rng)
+        if rng.random() < 0.02:
+            # long enough to reach past COMMAND_MAX_LENGTH
+            argument = argument + text(rng, length = rng.randint(constants.COMMAND_ARGUMENT_MAX_LENGTH, constants.COMMAND_STRING_BUFFER_SIZE))
+        string = name + constants.COMMAND_ARGUMENT_SEPARATOR + argument + constants.COMMAND_TERMINATOR
+
+    if rng.random() < 0.2:
+        string = mutate(rng, string)
+    return row, string
+
+def generate(rng, max_length = None):
+    '''
+    Returns (row, input string), input is one command or several commands in one write
+    '''
+    if rng.random() < 0.1:
+        strings = [command(rng)[1] for i in range(rng.randint(2, constants.COMMANDS_BUFFER_SIZE + 2))]
+        row, string = MULTIPLE, ''.join(strings)
+    else:
+        row, string = command(rng)
+    if rng.random() < 0.03:
+        string = string.rstrip(constants.COMMAND_TERMINATOR)
+
+    limit = min(max_length or constants.COMMAND_STRING_BUFFER_SIZE, constants.COMMAND_STRING_BUFFER_SIZE)
+    return row, string[:limit]
+
+def batch_input(seed, batch, index, max_length = None):
+    '''
+    Returns (row, input string) of input index of batch, every input has its own seed
+    so restart after a crash and lookup of the offending input do not generate the ones before it
+    '''
+    return generate(random.Random((seed * 1000003 + batch) * 1000003 + index), max_length)
+
+
+def worker(seed, batch, start, size, max_length, progress, counts):
+    '''
+    Runs inputs start..size of batch, progress holds index of input being parsed,
+    counts[row * len(OUTCOMES) + outcome] is increased for every finished input
+    '''
+    lib = host.library()
+    types = (ctypes.c_uint8 * constants.COMMANDS_BUFFER_SIZE)()
+    has_argument = (ctypes.c_uint8 * constants.COMMANDS_BUFFER_SIZE)()
+    parse = lib.host_parse
+
+    for index in xrange(start, size):
+        row, string = batch_input(seed, batch, index, max_length)
+        progress.value = index
+        count = parse(string, len(string), types, has_argument, constants.COMMANDS_BUFFER_SIZE)
+        if count == 0:
+            outcome = INCOMPLETE
+        elif 0 in types[:min(count, constants.COMMANDS_BUFFER_SIZE)]:
+            outcome = REJECTED
+        else:
+            outcome = ACCEPTED
+        counts[row * len(OUTCOMES) + outcome] += 1
+    progress.value = size
+
+
+class Run(object):
+    '''
+    One batch, restarted in a new process after every crash or hang
+    '''
+    def __init__(self, batch, size):
+        self.batch = batch
+        self.size = size
+        self.progress = multiprocessing.Value('l', 0, lock = False)
+        self.counts = multiprocessing.Array('l', len(ROWS) * len(OUTCOMES), lock = False)
+        self.process = None
+        self.first = 0
+
+    def start(self, seed, start, max_length):
+        self.first = start
+        self.process = multiprocessing.Process(target = worker, args = (seed, self.batch, start, self.size, max_length, self.progress, self.counts))
+        self.process.daemon = True
+        self.process.start()
+        self.last_progress = self.progress.value
+        self.last_change = time.time()
+
+    def finished(self):
+        return not self.process.is_alive() and self.process.exitcode == 0
+
+def exit_description(exitcode):
+    return "signal %d" %-exitcode if exitcode < 0 else "exit code %d" %exitcode
+
+def fuzz(count = COUNT, jobs = None, seed = 0, batch_size = BATCH, hang_timeout = HANG_TIMEOUT,
+         max_crashes = MAX_CRASHES, max_length = None):
+    '''
+    Returns (counts per row and outcome, crashes, hangs, inputs run, seconds),
+    crashes and hangs are lists of (input, description), one crash for each signature
+    '''
+    host.library()
+    jobs = jobs or multiprocessing.cpu_count()
+    batches = [(batch, min(batch_size, count - batch * batch_size)) for batch in range((count + batch_size - 1) // batch_size)]
+    batches.reverse()
+
+    totals = [[0] * len(OUTCOMES) for row in ROWS]
+    crashes = []
+    signatures = {}                # crash signature: index in crashes
+    occurrences = []
+    hangs = []
+    running = []
+    executed = 0
+    start_time = time.time()
+
+    def collect(run):
+        for row in range(len(ROWS)):
+            for outcome in range(len(OUTCOMES)):
+                totals[row][outcome] += run.counts[row * len(OUTCOMES) + outcome]
+
+    while (batches or running) and len(crashes) < max_crashes:
+        while batches and len(running) < jobs:
+            run = Run(*batches.pop())
+            run.start(seed, 0, max_length)
+            running.append(run)
+
+        time.sleep(POLL_PERIOD)
+
+        for run in running[:]:
+            if run.finished():
+                collect(run)
+                executed += run.size - run.first
+                running.remove(run)
+                continue
+
+            index = run.progress.value
+            if run.process.is_alive():
+                if index != run.last_progress:
+                    run.last_progress = index
+                    run.last_change = time.time()
+                    continue
+                if time.time() - run.last_change < hang_timeout:
+                    continue
+                run.process.terminate()
+                run.process.join()
+                row, string = batch_input(seed, run.batch, index, max_length)
+                hangs.append((string, "no progress for %.1fs" %hang_timeout))
+            else:
+                row, string = batch_input(seed, run.batch, index, max_length)
+                description = exit_description(run.process.exitcode)
+                # inputs over COMMAND_MAX_LENGTH share one signature whatever command they were built from
+                signature = (description, row if len(string) <= constants.COMMAND_MAX_LENGTH else None)
+                if signature not in signatures:
+                    signatures[signature] = len(crashes)
+                    crashes.append((string, description))
+                    occurrences.append(0)
+                occurrences[signatures[signature]] += 1
+
+            # continue batch after offending input
+            executed += index + 1 - run.first
+            if index + 1 < run.size:
+                run.start(seed, index + 1, max_length)
+            else:
+                collect(run)
+                running.remove(run)
+
+    for run in running:
+        run.process.terminate()
+        run.process.join()
+        collect(run)
+        executed += run.progress.value - run.first
+
+    crashes = [(crash_input, crash_description if times == 1 else "%s, %d times" %(crash_description, times))
+               for (crash_input, crash_description), times in zip(crashes, occurrences)]
+    return totals, crashes, hangs, executed, time.time() - start_time
+
+def report(totals, crashes, hangs, executed, seconds):
+    print " %-18s %10s %10s %10s" %(("command",) + OUTCOMES)
+    for row, name in enumerate(ROWS):
+        if any(totals[row]):
+            print " %-18s %10d %10d %10d" %((name,) + tuple(totals[row]))
+    print
+    print "Inputs: %d in %.1fs (%d/s, %d/min)" %(executed, seconds, executed / seconds, executed / seconds * 60)
+    print "Crashes: %d, hangs: %d" %(len(crashes), len(hangs))
+    for string, description in crashes + hangs:
+        print " %s: %d bytes %r" %(description, len(string), string[:120] + ('...' if len(string) > 120 else ''))
+
+def main():
+    parser = argparse.ArgumentParser(description = "command_parser.c fuzzer")
+    parser.add_argument("-n", "--count", type = int, default = COUNT, help = "number of inputs, default %(default)s")
+    parser.add_argument("-j", "--jobs", type = int, default = multiprocessing.cpu_count(), help = "worker processes, default %(default)s")
+    parser.add_argument("--seed", type = int, default = 0, help = "same seed generates same inputs, default %(default)s")
+    parser.add_argument("--batch", type = int, default = BATCH, help = "inputs per worker run, default %(default)s")
+    parser.add_argument("--hang-timeout", type = float, default = HANG_TIMEOUT, help = "default %(default)s seconds")
+    parser.add_argument("--max-crashes", type = int, default = MAX_CRASHES, help = "stop after this many different crashes, default %(default)s")
+    parser.add_argument("--max-length", type = int, help = "cut inputs to this length, default %d" %constants.COMMAND_STRING_BUFFER_SIZE)
+    parser.add_argument("--output", help = "save crashing and hanging inputs, one repr() per line")
+    arguments = parser.parse_args()
+
+    totals, crashes, hangs, executed, seconds = fuzz(arguments.count, arguments.jobs, arguments.seed, arguments.batch,
+                                                     arguments.hang_timeout, arguments.max_crashes, arguments.max_length)
+    report(totals, crashes, hangs, executed, seconds)
+
+    if arguments.output:
+        with open(arguments.output, "w") as f:
+            for string, description in crashes + hangs:
+                f.write("%r\n" %string)
+
+    return 1 if crashes or hangs else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
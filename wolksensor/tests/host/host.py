@@ -0,0 +1,120 @@
+'''
+Created on October 18th 2026
+@author: srdjan.stankovic@wolkabout.com
+
+brief: ctypes bindings for libwolksensor_host.so, host build of SDK core
+       modules (circular_buffer.c, command_parser.c, protocol.c, ...).
+       Library is built with make on first use if it is missing.
+'''
+#!/Python27/python
+import ctypes
+import os
+import subprocess
+
+HOST_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+LIBRARY_PATH = os.path.join(HOST_DIRECTORY, "libwolksensor_host.so")
+
+# SDK/core/commands.h
+COMMAND_TYPES = ["BAD", "MAC", "NOW", "RELOAD", "HEARTBEAT", "RTC", "VERSION", "STATUS", "READINGS", "ID",
+                 "SIGNATURE", "URL", "PORT", "SSID", "PASS", "AUTH", "MOVEMENT", "ATMO", "SYSTEM", "STATIC_IP",
+                 "STATIC_MASK", "STATIC_GATEWAY", "STATIC_DNS", "ALARM", "SET", "LOCATION", "SSL", "MQTT_USERNAME",
+                 "TEMP_OFFSET", "HUMIDITY_OFFSET", "PRESSURE_OFFSET", "OFFSET_FACTORY", "ACQUISITION"]
+
+# SDK/application/wolksensor.h
+COMMANDS_BUFFER_SIZE = 10
+RESPONSE_SIZE = 150 * 64
+
+_library = None
+
+
+def build():
+    subprocess.check_call(["make", "-s", "-C", HOST_DIRECTORY])
+
+def library():
+    '''
+    Loads library once, builds it first when it is missing
+    '''
+    global _library
+    if _library is not None:
+        return _library
+
+    if not os.path.exists(LIBRARY_PATH):
+        build()
+
+    lib = ctypes.CDLL(LIBRARY_PATH)
+
+    lib.host_init.argtypes = []
+    lib.host_init.restype = None
+    lib.host_set_rtc.argtypes = [ctypes.c_uint32]
+    lib.host_set_rtc.restype = None
+    lib.host_parse.argtypes = [ctypes.c_char_p, ctypes.c_uint16, ctypes.POINTER(ctypes.c_uint8), ctypes.POINTER(ctypes.c_uint8), ctypes.c_uint8]
+    lib.host_parse.restype = ctypes.c_uint8
+    lib.host_store_reading.argtypes = [ctypes.c_uint32] + [ctypes.c_float] * 4
+    lib.host_store_reading.restype = None
+    lib.host_store_system_item.argtypes = [ctypes.c_uint32, ctypes.c_uint8] + [ctypes.c_uint16] * 6
+    lib.host_store_system_item.restype = None
+    lib.host_clear_buffers.argtypes = []
+    lib.host_clear_buffers.restype = None
+    lib.host_serialize.argtypes = [ctypes.c_bool, ctypes.c_char_p, ctypes.c_uint16]
+    lib.host_serialize.restype = ctypes.c_uint16
+
+    for name in ("host_bench_add_array", "host_bench_peek_array", "host_bench_add_pop_array"):
+        getattr(lib, name).argtypes = [ctypes.c_uint32, ctypes.c_uint16]
+        getattr(lib, name).restype = ctypes.c_uint32
+    lib.host_bench_serialize.argtypes = [ctypes.c_uint32, ctypes.c_bool]
+    lib.host_bench_serialize.restype = ctypes.c_uint32
+    lib.host_bench_parse.argtypes = [ctypes.c_uint32, ctypes.c_char_p, ctypes.c_uint16]
+    lib.host_bench_parse.restype = ctypes.c_uint32
+
+    lib.host_init()
+    _library = lib
+    return lib
+
+def parse(string):
+    '''
+    parse('RTC 1514824768;STATUS;') -> [('RTC', True), ('STATUS', False)]
+    Unknown or invalid command is ('BAD', ...)
+    '''
+    types = (ctypes.c_uint8 * COMMANDS_BUFFER_SIZE)()
+    has_argument = (ctypes.c_uint8 * COMMANDS_BUFFER_SIZE)()
+    count = library().host_parse(string, len(string), types, has_argument, COMMANDS_BUFFER_SIZE)
+    count = min(count, COMMANDS_BUFFER_SIZE)
+    return [(COMMAND_TYPES[types[i]], bool(has_argument[i])) for i in range(count)]
+
+def set_rtc(rtc):
+    library().host_set_rtc(rtc)
+
+def store_reading(timestamp, pressure, temperature, humidity, movement = 0):
+    library().host_store_reading(timestamp, pressure, temperature, humidity, movement)
+
+def store_system_item(timestamp, error = 0, access_point_time = 0, dhcp_time = 0, server_time = 0,
+                      data_exchange_time = 0, disconnect_time = 0, battery = 0):
+    library().host_store_system_item(timestamp, error, access_point_time, dhcp_time, server_time,
+                                     data_exchange_time, disconnect_time, battery)
+
+def clear_buffers():
+    library().host_clear_buffers()
+
+def serialize(readings = True):
+    '''
+    Whole READINGS (or SYSTEM) response as device sends it, split in as many
+    response buffers as needed
+    '''
+    output = ctypes.create_string_buffer(RESPONSE_SIZE)
+    length = library().host_serialize(readings, output, RESPONSE_SIZE)
+    return output.raw[:length]
+
+def bench_add_array(iterations, length):
+    return library().host_bench_add_array(iterations, length)
+
+def bench_peek_array(iterations, length):
+    return library().host_bench_peek_array(iterations, length)
+
+def bench_add_pop_array(iterations, length):
+    return library().host_bench_add_pop_array(iterations, length)
+
+def bench_serialize(iterations, readings = True):
+    return library().host_bench_serialize(iterations, readings)
+
+def bench_parse(iterations, string):
+    return library().host_bench_parse(iterations, string, len(string))
@@ -0,0 +1,262 @@
+/*
+ * host_api.c
+ *
+ * Host build glue for SDK core modules: definitions normally provided by
+ * application and platform code, and entry points called from Python
+ * through ctypes (host.py). Benchmark loops run here so ctypes call
+ * overhead is paid once per measurement and not once per operation.
+ */
+
+#include <ctype.h>
+
+#include "platform_specific.h"
+#include "circular_buffer.h"
+#include "command_parser.h"
+#include "commands.h"
+#include "protocol.h"
+#include "sensors.h"
+#include "sensor_readings_buffer.h"
+#include "system_buffer.h"
+#include "global_dependencies.h"
+#include "wifi_communication_module_dependencies.h"
+#include "tcp_communication_module_dependencies.h"
+#include "udp_communication_module_dependencies.h"
+#include "wolksensor_dependencies.h"
+#include "wolksensor.h"
+
+wifi_communication_module_dependencies_t wifi_communication_module_dependencies;
+tcp_communication_module_dependencies_t tcp_communication_module_dependencies;
+udp_communication_module_dependencies_t udp_communication_module_dependencies;
+wolksensor_dependencies_t wolksensor_dependencies;
+
+static uint32_t host_rtc = 0;
+
+static circular_buffer_t command_string_buffer;
+static char command_string_buffer_storage[COMMAND_STRING_BUFFER_SIZE];
+
+static circular_buffer_t commands_buffer;
+static command_t commands_buffer_storage[COMMANDS_BUFFER_SIZE];
+
+static circular_buffer_t response_buffer;
+static char response_buffer_storage[COMMAND_RESPONSE_BUFFER_SIZE];
+
+/* avr-libc extension used by util_conversions.c */
+char* strupr(char* string)
+{
+	char* position;
+	for(position = string; *position; position++)
+	{
+		*position = toupper((unsigned char)*position);
+	}
+
+	return string;
+}
+
+static uint32_t rtc_get(void)
+{
+	return host_rtc;
+}
+
+static uint16_t serialize_wifi_platform_specific_error_code(uint32_t error_code, char* buffer)
+{
+	return sprintf(buffer, "%04X%04X", (unsigned int)(error_code >> 16), (unsigned int)(error_code & 0xFFFF));
+}
+
+void host_init(void)
+{
+	global_dependencies.rtc_get = rtc_get;
+	wifi_communication_module_dependencies.serialize_wifi_platform_specific_error_code = serialize_wifi_platform_specific_error_code;
+
+	/* same sensors as set_sensors_types() in main.c */
+	sensors[0].id = 'P';
+	sensors[1].id = 'T';
+	sensors[2].id = 'H';
+	sensors[3].id = 'M';
+	sensors_init();
+
+	init_sensor_readings_buffer(true);
+	init_system_buffer(true);
+
+	circular_buffer_init(&command_string_buffer, command_string_buffer_storage, COMMAND_STRING_BUFFER_SIZE, sizeof(char), true, true);
+	circular_buffer_init(&commands_buffer, commands_buffer_storage, COMMANDS_BUFFER_SIZE, sizeof(command_t), true, true);
+	circular_buffer_init(&response_buffer, response_buffer_storage, COMMAND_RESPONSE_BUFFER_SIZE, sizeof(char), false, true);
+}
+
+void host_set_rtc(uint32_t rtc)
+{
+	host_rtc = rtc;
+}
+
+/************************** Parser **************************/
+
+/*
+ * Feeds string into command string buffer as UART would and extracts commands.
+ * Type and has_argument flag of first size extracted commands are written
+ * to types and has_argument. Returns number of extracted commands.
+ */
+uint8_t host_parse(const char* string, uint16_t length, uint8_t* types, uint8_t* has_argument, uint8_t size)
+{
+	circular_buffer_clear(&command_string_buffer);
+	circular_buffer_clear(&commands_buffer);
+
+	circular_buffer_add_array(&command_string_buffer, string, length);
+	uint8_t count = extract_commands_from_string_buffer(&command_string_buffer, &commands_buffer);
+
+	uint8_t i = 0;
+	command_t command;
+	while((i < size) && circular_buffer_pop(&commands_buffer, &command))
+	{
+		types[i] = command.type;
+		has_argument[i] = command.has_argument;
+		i++;
+	}
+
+	return count;
+}
+
+/************************** Readings and system **************************/
+
+void host_store_reading(uint32_t timestamp, float pressure, float temperature, float humidity, float movement)
+{
+	float values[NUMBER_OF_SENSORS] = { pressure, temperature, humidity, movement };
+
+	host_rtc = timestamp;
+	store_sensor_readings(values);
+}
+
+void host_store_system_item(uint32_t timestamp, uint8_t error, uint16_t connect_to_ap_time, uint16_t acquire_ip_address_time, uint16_t connect_to_server_time, uint16_t data_exchange_time, uint16_t disconnect_time, uint16_t battery)
+{
+	communication_and_battery_data_t data;
+	memset(&data, 0, sizeof(data));
+
+	data.communication_protocol_type_data.type = COMMUNICATION_PROTOCOL_MQTT;
+	data.communication_protocol_type_data.communication_module_type_data.type = COMMUNICATION_MODULE_WIFI;
+
+	wifi_communication_module_data_t* wifi = &data.communication_protocol_type_data.communication_module_type_data.data.wifi_communication_module_data;
+	wifi->error = error;
+	wifi->connect_to_ap_time = connect_to_ap_time;
+	wifi->acquire_ip_address_time = acquire_ip_address_time;
+	wifi->connect_to_server_time = connect_to_server_time;
+	wifi->data_exchange_time = data_exchange_time;
+	wifi->disconnect_time = disconnect_time;
+
+	data.battery_min_voltage = battery;
+
+	host_rtc = timestamp;
+	add_communication_and_battery_data(&data);
+}
+
+void host_clear_buffers(void)
+{
+	sensor_readings_buffer_clear();
+	system_buffer_clear();
+}
+
+/*
+ * Serializes READINGS (readings true) or SYSTEM response the way cmd_readings()/cmd_system()
+ * are executed: response buffer is filled and sent until everything is serialized.
+ * Whole response is copied to output. Returns response length.
+ */
+uint16_t host_serialize(bool readings, char* output, uint16_t size)
+{
+	circular_buffer_t* buffer = readings ? &sensor_readings_buffer : &system_buffer;
+	uint16_t position = 0;
+	uint16_t length = 0;
+
+	do
+	{
+		circular_buffer_clear(&response_buffer);
+		position += readings ? append_sensor_readings(buffer, position, &response_buffer, true) : append_system_info(buffer, position, &response_buffer, true);
+
+		uint16_t response_size = circular_buffer_size(&response_buffer);
+		if(length + response_size > size)
+		{
+			response_size = size - length;
+		}
+		circular_buffer_peek_array(&response_buffer, 0, response_size, output + length);
+		length += response_size;
+	}
+	while(position < circular_buffer_size(buffer));
+
+	return length;
+}
+
+/************************** Benchmark loops **************************/
+
+/* Returns number of bytes moved */
+uint32_t host_bench_add_array(uint32_t iterations, uint16_t length)
+{
+	static char data[MAX_BUFFER_SIZE];
+	memset(data, 'x', sizeof(data));
+
+	uint32_t i;
+	for(i = 0; i < iterations; i++)
+	{
+		circular_buffer_clear(&response_buffer);
+		circular_buffer_add_array(&response_buffer, data, length);
+	}
+
+	return iterations * length;
+}
+
+uint32_t host_bench_peek_array(uint32_t iterations, uint16_t length)
+{
+	static char data[MAX_BUFFER_SIZE];
+	memset(data, 'x', sizeof(data));
+
+	circular_buffer_clear(&response_buffer);
+	circular_buffer_add_array(&response_buffer, data, length);
+
+	uint32_t i;
+	for(i = 0; i < iterations; i++)
+	{
+		circular_buffer_peek_array(&response_buffer, 0, length, data);
+	}
+
+	return iterations * length;
+}
+
+uint32_t host_bench_add_pop_array(uint32_t iterations, uint16_t length)
+{
+	static char data[MAX_BUFFER_SIZE];
+	memset(data, 'x', sizeof(data));
+
+	circular_buffer_clear(&response_buffer);
+
+	uint32_t i;
+	for(i = 0; i < iterations; i++)
+	{
+		circular_buffer_add_array(&response_buffer, data, length);
+		circular_buffer_pop_array(&response_buffer, length, data);
+	}
+
+	return iterations * length;
+}
+
+uint32_t host_bench_serialize(uint32_t iterations, bool readings)
+{
+	static char output[SENSOR_READINGS_BUFFER_SIZE * 64];
+	uint32_t bytes = 0;
+
+	uint32_t i;
+	for(i = 0; i < iterations; i++)
+	{
+		bytes += host_serialize(readings, output, sizeof(output));
+	}
+
+	return bytes;
+}
+
+uint32_t host_bench_parse(uint32_t iterations, const char* string, uint16_t length)
+{
+	uint8_t types[COMMANDS_BUFFER_SIZE];
+	uint8_t has_argument[COMMANDS_BUFFER_SIZE];
+
+	uint32_t i;
+	for(i = 0; i < iterations; i++)
+	{
+		host_parse(string, length, types, has_argument, COMMANDS_BUFFER_SIZE);
+	}
+
+	return iterations * length;
+}
@@ -0,0 +1,54 @@
+/*
+ * platform_specific.h
+ *
+ * Host (Linux, gcc) replacement of wolksensor/WolkSensor/platform_specific.h
+ * used to build portable SDK core modules as shared library.
+ * AVR program memory accessors map to plain C library functions.
+ */
+
+#ifndef PLATFORM_SPECIFIC_H_
+#define PLATFORM_SPECIFIC_H_
+
+#include <stdlib.h>
+#include <stdio.h>
+#include <stdint.h>
+#include <stdbool.h>
+#include <stddef.h>
+#include <string.h>
+#include <math.h>
+
+#define FW_VERSION_MAJOR 4 // number 0 -99
+#define FW_VERSION_MINOR 3 // number 0 -99
+#define FW_VERSION_PATCH 6 // number 0 -99
+
+#define SYNCHRONIZED_BLOCK_START
+#define SYNCHRONIZED_BLOCK_END
+
+#define WIFI_SECURITY_UNSECURED		0
+#define WIFI_SECURITY_WEP			1
+#define WIFI_SECURITY_WPA2			2
+#define WIFI_SECURITY_WPA			3
+
+#define NO_INIT_MEMORY
+
+#define MAX_BUFFER_SIZE 768
+
+#define NUMBER_OF_ACTUATORS 0
+
+#define NUMBER_OF_SENSORS 4
+
+#define LOG_FORMAT "%s\r\n"
+
+#define PROGMEM
+#define PSTR(s) (s)
+#define pgm_read_byte(address) (*(const uint8_t*)(address))
+#define strcpy_P strcpy
+#define strcmp_P strcmp
+#define strncmp_P strncmp
+#define strlen_P strlen
+#define memcpy_P memcpy
+#define sprintf_P sprintf
+#define snprintf_P snprintf
+#define vsprintf_P vsprintf
+
+#endif /* PLATFORM_SPECIFIC_H_ */
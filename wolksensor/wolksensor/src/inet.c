@@ -133,6 +133,8 @@ uint32_t inet_pton_ipv4(const char *src, unsigned char *dst)
 	}
 	if(octets < 4)
 	return false;
+	// callers only validating address pass NULL as dst
+	if(dst)
 	memcpy(dst, tmp, ADDRESSSIZE);
 	return true;
 }